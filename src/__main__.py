@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+# ✅ Línea de comandos única: `python -m src <subcomando> [opciones]` (desde la raíz del repo).
+#
+#    cargar (load) ──► limpiar (clean) ──► transformar (transform) ──► modelar (train)
+#                                                  predecir (predict)    graficar (plot)
+#
+#    Cada subcomando importa su etapa (y con ella pandas, sklearn, xgboost o matplotlib)
+#    recién cuando se elige, como los `ejecutar_*` de pipeline.py: `python -m src --help`
+#    no carga ninguna librería pesada y `cargar` no paga por sklearn ni xgboost.
+#    Las opciones de cada subcomando las define su etapa (`agregar_argumentos`), así
+#    coinciden siempre con las de su script (`python src/<etapa>.py`).
+#
+#    `python -m src arranque` mide con `-X importtime` cuánto importa cada subcomando
+#    antes de empezar a trabajar, frente a importar todas las etapas de una vez.
+
+RUTA_SRC = os.path.dirname(os.path.abspath(__file__))
+RUTA_RAIZ = os.path.dirname(RUTA_SRC)
+
+# 🔹 Los scripts de src/ se importan entre sí por nombre (como al correr `python src/x.py`)
+if RUTA_SRC not in sys.path:
+    sys.path.insert(0, RUTA_SRC)
+
+# Módulos de etapa que importaría una línea de comandos que los cargue todos al arrancar
+MODULOS_ETAPAS = ["cargar_datos", "limpieza_datos", "transformacion", "modelado", "prediccion",
+                  "visualizacion_resultados"]
+REPETICIONES = 3
+
+
+# ---------- SUBCOMANDOS ----------
+# Las opciones las define cada etapa (`agregar_argumentos`), igual para su script y para acá
+def comando_cargar(parser, argumentos):
+    import cargar_datos
+    cargar_datos.agregar_argumentos(parser)
+    args = parser.parse_args(argumentos)
+    cargar_datos.configurar_desde_args(args)
+    cargar_datos.cargar_datos(n_workers=args.workers, incremental=args.incremental, formato=args.formato)
+
+
+def comando_limpiar(parser, argumentos):
+    import limpieza_datos
+    limpieza_datos.agregar_argumentos(parser)
+    args = parser.parse_args(argumentos)
+    limpieza_datos.configurar_desde_args(args)
+    limpieza_datos.limpiar_datos(formato=args.formato)
+
+
+def comando_transformar(parser, argumentos):
+    import transformacion
+    transformacion.agregar_argumentos(parser)
+    args = parser.parse_args(argumentos)
+    transformacion.configurar_desde_args(args)
+    transformacion.transformar_datos(formato=args.formato)
+
+
+def comando_modelar(parser, argumentos):
+    import modelado
+    modelado.agregar_argumentos(parser)
+    args = parser.parse_args(argumentos)
+    modelado.configurar_desde_args(args)
+    modelado.modelar_datos(paralelo=args.paralelo, n_cpus=args.cpus)
+
+
+def comando_predecir(parser, argumentos):
+    import prediccion
+    prediccion.agregar_argumentos(parser)
+    args = parser.parse_args(argumentos)
+    prediccion.configurar_desde_args(args)
+    if args.entrada:
+        prediccion.puntuar_archivo(args.entrada, args.salida, args.tam_lote)
+    else:
+        prediccion.predecir_resultados()
+
+
+def comando_graficar(parser, argumentos):
+    import visualizacion_resultados
+    visualizacion_resultados.agregar_argumentos(parser)
+    args = parser.parse_args(argumentos)
+    if args.lote:
+        visualizacion_resultados.visualizar_en_lote(args.workers, args.por_escuela, args.por_proceso, args.forzar)
+    else:
+        visualizacion_resultados.visualizar_resultados()
+
+
+# ---------- MEDICIÓN DE ARRANQUE ----------
+def medir_importaciones(comando, cwd, repeticiones):
+    """
+    (ms de importación, ms totales del proceso, {paquete: ms}) de `comando` con -X importtime.
+
+    Se queda con la corrida más rápida de `repeticiones`: el mínimo es lo que menos
+    depende de la carga de la máquina.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        salida = subprocess.run([sys.executable, "-X", "importtime", *comando], cwd=cwd,
+                                capture_output=True, text=True)
+        total_ms = (time.perf_counter() - inicio) * 1000
+        if salida.returncode != 0:
+            raise RuntimeError(f"Falló {' '.join(comando)}:\n{salida.stderr[-2000:]}")
+
+        # 🔹 "import time: self [us] | cumulative | módulo": el tiempo propio de cada módulo
+        #    se suma a su paquete raíz (pandas.core.frame → pandas)
+        paquetes = {}
+        for propio, nombre in re.findall(r"^import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)", salida.stderr, re.M):
+            raiz = nombre.split(".")[0]
+            paquetes[raiz] = paquetes.get(raiz, 0) + int(propio) / 1000
+        importacion_ms = sum(paquetes.values())
+        if mejor is None or importacion_ms < mejor[0]:
+            mejor = (importacion_ms, total_ms, paquetes)
+    return mejor
+
+
+def comando_arranque(parser, argumentos):
+    from instrumentacion import registrar
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES,
+                        help="corridas por subcomando (se informa la más rápida)")
+    args = parser.parse_args(argumentos)
+
+    # ✅ Cada subcomando hasta que termina de parsear sus opciones (--help: importa lo suyo y sale)
+    casos = [("(ayuda)", ["-m", "src", "--help"])]
+    casos += [(nombre, ["-m", "src", nombre, "--help"]) for nombre in SUBCOMANDOS if nombre != "arranque"]
+    # Referencia: todas las etapas importadas al arrancar, como haría una CLI sin imports diferidos
+    casos.append(("(todas las etapas)", ["-c", "import " + ", ".join(MODULOS_ETAPAS)]))
+
+    print(f"⏱️ Tiempo de arranque (mejor de {args.repeticiones} corridas, python -X importtime):")
+    print(f"   {'subcomando':<20} {'importación':>12} {'proceso':>10}   paquetes más pesados")
+    for nombre, comando in casos:
+        importacion_ms, total_ms, paquetes = medir_importaciones(
+            comando, RUTA_SRC if comando[0] == "-c" else RUTA_RAIZ, args.repeticiones)
+        pesados = sorted(paquetes.items(), key=lambda p: p[1], reverse=True)[:3]
+        print(f"   {nombre:<20} {importacion_ms:>9.0f} ms {total_ms:>7.0f} ms   "
+              + ", ".join(f"{paquete} {ms:.0f} ms" for paquete, ms in pesados))
+        registrar("arranque", subcomando=nombre, importacion_ms=round(importacion_ms, 1),
+                  proceso_ms=round(total_ms, 1), paquetes={p: round(ms, 1) for p, ms in pesados})
+
+
+# Subcomando → (alias en inglés, descripción, función)
+SUBCOMANDOS = {
+    "cargar": ("load", "Carga y unifica los CSV de admisión.", comando_cargar),
+    "limpiar": ("clean", "Limpia el archivo unificado.", comando_limpiar),
+    "transformar": ("transform", "Codifica, escala y divide los datos limpios.", comando_transformar),
+    "modelar": ("train", "Entrena y compara los modelos candidatos.", comando_modelar),
+    "predecir": ("predict", "Predice puntajes de admisión.", comando_predecir),
+    "graficar": ("plot", "Gráficos de evaluación de modelos y de puntajes.", comando_graficar),
+    "arranque": ("startup", "Mide el tiempo de importación de cada subcomando.", comando_arranque),
+}
+ALIAS = {alias: nombre for nombre, (alias, _, _) in SUBCOMANDOS.items()}
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+def main(argv=None):
+    lista = "\n".join(f"  {nombre:<12} {alias:<10} {descripcion}"
+                      for nombre, (alias, descripcion, _) in SUBCOMANDOS.items())
+    parser = argparse.ArgumentParser(
+        prog="python -m src", description="Etapas del proyecto de admisión.",
+        epilog=f"subcomandos (nombre o alias):\n{lista}\n\n"
+               "Opciones de cada uno: python -m src <subcomando> --help",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("subcomando", choices=list(SUBCOMANDOS) + list(ALIAS), metavar="subcomando",
+                        help="etapa a ejecutar (ver la lista de abajo)")
+    # 🔹 El resto se parsea después, cuando el subcomando ya importó lo que necesita
+    parser.add_argument("argumentos", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    nombre = ALIAS.get(args.subcomando, args.subcomando)
+    _, descripcion, funcion = SUBCOMANDOS[nombre]
+    funcion(argparse.ArgumentParser(prog=f"python -m src {nombre}", description=descripcion), args.argumentos)
+
+
+if __name__ == "__main__":
+    main()
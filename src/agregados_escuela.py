@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from fractions import Fraction
+
+# ✅ Agregados persistentes de PUNTAJE por escuela y por (escuela, proceso):
+#    conteo, suma y suma de cuadrados. Los usan transformacion.py (PROMEDIO_ESCUELA
+#    para entrenar) y prediccion.py (la misma variable al predecir), así la
+#    característica significa lo mismo en ambos lados y no se recalcula con un groupby.
+#
+#    Los puntajes tienen a lo sumo 4 decimales: se guardan como enteros (PUNTAJE ×
+#    10 000) y se suman con enteros de Python, que no se desbordan ni redondean.
+#    Por eso agregar un proceso nuevo, reemplazar uno corregido o reconstruir todo
+#    da exactamente los mismos números, sin importar el orden.
+#
+#    Archivo: `resultados/agregados_escuela.json`.
+
+ESCALA = 10_000
+NOMBRE_AGREGADOS = "agregados_escuela.json"
+
+
+def puntajes_enteros(puntajes):
+    """PUNTAJE × ESCALA como enteros; falla si algún puntaje tiene más de 4 decimales."""
+    escalados = puntajes.to_numpy(dtype="float64") * ESCALA
+    enteros = np.rint(escalados)
+    if len(escalados) and np.abs(escalados - enteros).max() > 1e-6:
+        raise ValueError(f"Hay puntajes con más decimales de los que admite la escala {ESCALA}.")
+    return enteros.astype("int64")
+
+
+def huella_proceso(df):
+    columnas = df[["ESCUELA PROFESIONAL", "PUNTAJE"]]
+    return hashlib.sha256(pd.util.hash_pandas_object(columnas, index=False).to_numpy().tobytes()).hexdigest()[:16]
+
+
+def sumar_por_escuela(df):
+    """{escuela: [conteo, suma, suma_cuadrados]} de un proceso, en enteros exactos."""
+    df = df[df["PUNTAJE"].notna()]  # 🔹 igual que groupby().mean(): los nulos no cuentan
+    enteros = pd.Series(puntajes_enteros(df["PUNTAJE"]), index=df.index)
+    grupos = df["ESCUELA PROFESIONAL"]
+    conteo = enteros.groupby(grupos, observed=True).count()
+    suma = enteros.groupby(grupos, observed=True).sum()  # 🔹 int64 alcanza: 2000 × 10⁴ × filas
+    suma_cuadrados = (enteros.astype(object) ** 2).groupby(grupos, observed=True).sum()  # enteros de Python
+    return {e: [int(conteo[e]), int(suma[e]), int(suma_cuadrados[e])] for e in conteo.index}
+
+
+def combinar(destino, origen, signo=1):
+    for escuela, (n, s, s2) in origen.items():
+        actual = destino.setdefault(escuela, [0, 0, 0])
+        actual[0] += signo * n
+        actual[1] += signo * s
+        actual[2] += signo * s2
+        if actual[0] == 0:
+            del destino[escuela]
+
+
+class AgregadosEscuela:
+
+    def __init__(self, ruta_resultados):
+        self.ruta = os.path.join(ruta_resultados, NOMBRE_AGREGADOS)
+        self.procesos = {}              # proceso → {"huella", "filas"}
+        self.por_escuela_proceso = {}   # proceso → {escuela: [n, suma, suma²]}
+        self.por_escuela = {}           # escuela → [n, suma, suma²]
+        if os.path.exists(self.ruta):
+            with open(self.ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+            if datos.get("escala") == ESCALA:
+                self.procesos = datos["procesos"]
+                self.por_escuela_proceso = datos["por_escuela_proceso"]
+                self.por_escuela = datos["por_escuela"]
+        self._promedios = None
+
+    def actualizar(self, df, completo=False):
+        """
+        Incorpora las filas de `df` (datos limpios, uno o varios procesos).
+
+        Solo se recalculan los procesos nuevos o cuyo contenido cambió; un proceso
+        cambiado primero se resta y luego se vuelve a sumar.
+        completo: `df` es todo el historial; los procesos que ya no están se quitan.
+        Devuelve los procesos que cambiaron.
+        """
+        cambiados = []
+        for proceso, df_proceso in df.groupby("PROCESO", sort=True, observed=True):
+            huella = huella_proceso(df_proceso)
+            if self.procesos.get(proceso, {}).get("huella") == huella:
+                continue
+            self.quitar_proceso(proceso)
+            sumas = sumar_por_escuela(df_proceso)
+            self.por_escuela_proceso[proceso] = sumas
+            combinar(self.por_escuela, sumas)
+            self.procesos[proceso] = {"huella": huella, "filas": len(df_proceso)}
+            self._promedios = None
+            cambiados.append(proceso)
+
+        if completo:
+            cambiados += self.conservar(df["PROCESO"].unique())
+        return cambiados
+
+    def conservar(self, procesos):
+        """Quita los procesos guardados que no estén en `procesos`; devuelve los quitados."""
+        quitados = [p for p in self.procesos if p not in set(procesos)]
+        for proceso in quitados:
+            self.quitar_proceso(proceso)
+        return quitados
+
+    def quitar_proceso(self, proceso):
+        if proceso in self.por_escuela_proceso:
+            combinar(self.por_escuela, self.por_escuela_proceso.pop(proceso), signo=-1)
+        self.procesos.pop(proceso, None)
+        self._promedios = None
+
+    # ---------- CONSULTAS ----------
+    def promedio(self, escuela, proceso=None):
+        """Promedio de PUNTAJE de la escuela (histórico, o de un proceso). None si no hay filas."""
+        fuente = self.por_escuela if proceso is None else self.por_escuela_proceso.get(proceso, {})
+        valores = fuente.get(escuela)
+        if valores is None:
+            return None
+        # ✅ Fraction → float redondea una sola vez: el promedio exacto más cercano
+        return float(Fraction(valores[1], valores[0] * ESCALA))
+
+    def promedios(self):
+        """Serie escuela → promedio histórico (se calcula una vez y se reutiliza)."""
+        if self._promedios is None:
+            self._promedios = pd.Series(
+                {e: self.promedio(e) for e in self.por_escuela}, dtype="float64", name="PROMEDIO_ESCUELA")
+        return self._promedios
+
+    def estadisticas(self, proceso=None):
+        """Conteo, promedio y desviación estándar muestral por escuela."""
+        fuente = self.por_escuela if proceso is None else self.por_escuela_proceso.get(proceso, {})
+        filas = {}
+        for escuela, (n, s, s2) in fuente.items():
+            varianza = Fraction(n * s2 - s * s, n * (n - 1) * ESCALA ** 2) if n > 1 else None
+            filas[escuela] = {"CONTEO": n, "PROMEDIO": float(Fraction(s, n * ESCALA)),
+                              "DESVIACION": float(varianza) ** 0.5 if varianza is not None else np.nan}
+        return pd.DataFrame.from_dict(filas, orient="index")
+
+    def guardar(self):
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"escala": ESCALA, "procesos": self.procesos, "por_escuela_proceso": self.por_escuela_proceso,
+                       "por_escuela": self.por_escuela}, f, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
+
+
+def cargar_promedios(ruta_resultados=None):
+    """Promedio histórico por escuela desde el almacén de agregados."""
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = ruta_resultados or os.path.join(os.path.dirname(ruta_actual), "resultados")
+    agregados = AgregadosEscuela(ruta_resultados)
+    if not agregados.por_escuela:
+        raise FileNotFoundError(f"No hay agregados por escuela en {agregados.ruta} (ejecuta transformacion.py).")
+    return agregados.promedios()
@@ -0,0 +1,233 @@
+import os
+import glob
+import json
+import time
+import shutil
+import argparse
+import joblib
+import pandas as pd
+
+# ✅ Almacén versionado de modelos en `resultados/modelos/`.
+#
+#    resultados/modelos/
+#      manifiesto.json            → una entrada por versión (modelo, formato, columnas, métricas)
+#      v0001/modelo.ubj           → XGBoost en su formato binario nativo
+#      v0002/modelo.joblib        → resto de modelos; sin comprimir (se lee con mmap, ver abajo)
+#      v0002/transformadores.joblib
+#    resultados/modelo_actual.json → versión que usa prediccion.py
+#
+#    Listar o comparar versiones solo lee el manifiesto: ningún modelo se
+#    deserializa hasta que se pide `VersionModelo.modelo`.
+#
+#    Cada publicación borra las versiones viejas: quedan la actual, las
+#    VERSIONES_RETENIDAS más recientes y las que apunta algún modelo_actual.json
+#    guardado en la caché de pipeline.py (al restaurarlo tiene que seguir existiendo).
+
+MANIFIESTO = "manifiesto.json"
+PUNTERO_ACTUAL = "modelo_actual.json"
+# Copias del puntero que guarda la etapa `modelar` de pipeline.py (cache_pipeline/<etapa>/<huella>/)
+PUNTEROS_EN_CACHE = os.path.join("cache_pipeline", "*", "*", PUNTERO_ACTUAL)
+
+# 🔹 Cuántas versiones recientes guardar además de la actual
+VERSIONES_RETENIDAS = 5
+
+
+def formato_nativo(modelo):
+    """Formato de guardado más rápido de cargar para cada tipo de modelo."""
+    if type(modelo).__name__ == "XGBRegressor":
+        return "xgboost"
+    return "joblib"
+
+
+def escribir_json(ruta, contenido):
+    # 🔹 Escritura atómica: un manifiesto a medio escribir no debe romper la carga
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+
+class VersionModelo:
+    """Una versión del almacén. Modelo y transformadores se cargan al primer acceso."""
+
+    def __init__(self, ruta_version, entrada):
+        self.ruta = ruta_version
+        self.entrada = entrada
+        self._modelo = None
+        self._transformadores = None
+
+    @property
+    def version(self):
+        return self.entrada["version"]
+
+    @property
+    def nombre(self):
+        return self.entrada["modelo"]
+
+    @property
+    def columnas(self):
+        return self.entrada["columnas"]
+
+    @property
+    def metricas(self):
+        return self.entrada["metricas"]
+
+    @property
+    def modelo(self):
+        if self._modelo is None:
+            ruta = os.path.join(self.ruta, self.entrada["archivo"])
+            if self.entrada["formato"] == "xgboost":
+                from xgboost import XGBRegressor
+                self._modelo = XGBRegressor()
+                self._modelo.load_model(ruta)
+            else:
+                # 🔹 mmap no ahorra memoria: sklearn copia los nodos de cada árbol al
+                #    deserializar (Tree.__setstate__), así que el RSS es el mismo. Solo evita
+                #    pasar los arreglos por un búfer de lectura intermedio: un Random Forest
+                #    de 910 MB carga en ~1.7-2.0 s con mmap frente a ~2.6-2.9 s sin él.
+                self._modelo = joblib.load(ruta, mmap_mode="r")
+        return self._modelo
+
+    @property
+    def transformadores(self):
+        if self._transformadores is None:
+            self._transformadores = joblib.load(os.path.join(self.ruta, "transformadores.joblib"))
+        return self._transformadores
+
+
+class AlmacenModelos:
+
+    def __init__(self, ruta_resultados):
+        self.ruta_resultados = ruta_resultados
+        self.ruta = os.path.join(ruta_resultados, "modelos")
+        self.ruta_manifiesto = os.path.join(self.ruta, MANIFIESTO)
+        self.ruta_actual = os.path.join(ruta_resultados, PUNTERO_ACTUAL)
+
+    def entradas(self):
+        if not os.path.exists(self.ruta_manifiesto):
+            return []
+        with open(self.ruta_manifiesto, encoding="utf-8") as f:
+            return json.load(f)["versiones"]
+
+    def listar(self):
+        """Tabla de versiones con sus métricas (sin cargar ningún modelo)."""
+        actual = self.version_actual()
+        filas = [{
+            "VERSION": e["version"],
+            "MODELO": e["modelo"],
+            "FORMATO": e["formato"],
+            "CREADO": e["creado"],
+            "TAMANO_MB": e["tamano_bytes"] / 1024 ** 2,
+            **e["metricas"],
+            "ACTUAL": e["version"] == actual,
+        } for e in self.entradas()]
+        return pd.DataFrame(filas)
+
+    def cargar(self, version=None):
+        """Devuelve la `VersionModelo` pedida (por defecto, la actual)."""
+        version = version or self.version_actual()
+        for entrada in self.entradas():
+            if entrada["version"] == version:
+                return VersionModelo(os.path.join(self.ruta, version), entrada)
+        raise KeyError(f"No existe la versión de modelo: {version}")
+
+    def publicar(self, modelo, nombre, columnas, transformadores, metricas, activar=True,
+                 conservar=VERSIONES_RETENIDAS):
+        """Guarda una versión nueva y, si `activar`, la marca como actual. Luego poda el almacén."""
+        entradas = self.entradas()
+        # 🔹 Siguiente al mayor número existente: tras podar, len(entradas) repetiría versiones
+        version = f"v{max((int(e['version'][1:]) for e in entradas), default=0) + 1:04d}"
+        ruta_version = os.path.join(self.ruta, version)
+        os.makedirs(ruta_version, exist_ok=True)
+
+        formato = formato_nativo(modelo)
+        if formato == "xgboost":
+            archivo = "modelo.ubj"
+            modelo.save_model(os.path.join(ruta_version, archivo))
+        else:
+            archivo = "modelo.joblib"
+            joblib.dump(modelo, os.path.join(ruta_version, archivo))  # sin compresión: mmap lo exige
+        joblib.dump(transformadores, os.path.join(ruta_version, "transformadores.joblib"))
+
+        entradas.append({
+            "version": version,
+            "modelo": nombre,
+            "formato": formato,
+            "archivo": archivo,
+            "columnas": list(columnas),
+            "metricas": {k: float(v) for k, v in metricas.items()},
+            "creado": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "tamano_bytes": os.path.getsize(os.path.join(ruta_version, archivo)),
+        })
+        escribir_json(self.ruta_manifiesto, {"versiones": entradas})
+        if activar:
+            self.activar(version)
+        self.podar(conservar)
+        return version
+
+    def versiones_en_cache(self):
+        """Versiones que apuntan los punteros guardados en la caché del pipeline."""
+        versiones = set()
+        for ruta in glob.glob(os.path.join(self.ruta_resultados, PUNTEROS_EN_CACHE)):
+            with open(ruta, encoding="utf-8") as f:
+                versiones.add(json.load(f)["version"])
+        return versiones
+
+    def podar(self, conservar=VERSIONES_RETENIDAS):
+        """Borra las versiones que no son la actual, ni una de las `conservar` más recientes, ni están en caché."""
+        entradas = self.entradas()
+        protegidas = {self.version_actual()} | self.versiones_en_cache()
+        if conservar > 0:
+            protegidas |= {e["version"] for e in entradas[-conservar:]}
+        quedan = [e for e in entradas if e["version"] in protegidas]
+        if len(quedan) == len(entradas):
+            return []
+        escribir_json(self.ruta_manifiesto, {"versiones": quedan})
+        borradas = [e["version"] for e in entradas if e not in quedan]
+        for version in borradas:
+            shutil.rmtree(os.path.join(self.ruta, version), ignore_errors=True)
+        return borradas
+
+    def version_actual(self):
+        if not os.path.exists(self.ruta_actual):
+            return None
+        with open(self.ruta_actual, encoding="utf-8") as f:
+            version = json.load(f)["version"]
+        existentes = [e["version"] for e in self.entradas()]
+        if version not in existentes:
+            # 🔹 Puntero a una versión borrada (ej: restaurado de una copia vieja): la más nueva
+            if not existentes:
+                return None
+            print(f"⚠️ La versión de modelo {version} ya no existe; se usa {existentes[-1]}.")
+            return existentes[-1]
+        return version
+
+    def activar(self, version):
+        if version not in {e["version"] for e in self.entradas()}:
+            raise KeyError(f"No existe la versión de modelo: {version}")
+        escribir_json(self.ruta_actual, {"version": version})
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta el almacén versionado de modelos.")
+    parser.add_argument("--activar", metavar="VERSION", help="marcar una versión como actual (ej: volver atrás)")
+    parser.add_argument("--podar", type=int, metavar="N",
+                        help="borrar las versiones viejas dejando la actual y las N más recientes")
+    args = parser.parse_args()
+
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    almacen = AlmacenModelos(os.path.join(os.path.dirname(ruta_actual), "resultados"))
+    if args.activar:
+        almacen.activar(args.activar)
+        print(f"✅ Versión actual: {args.activar}")
+    if args.podar is not None:
+        borradas = almacen.podar(args.podar)
+        print(f"🗑️ Versiones borradas: {', '.join(borradas) or 'ninguna'}")
+
+    versiones = almacen.listar()
+    if versiones.empty:
+        print("📭 El almacén de modelos está vacío (ejecuta modelado.py).")
+    else:
+        print("📦 Versiones de modelos:")
+        print(versiones.to_string(index=False))
@@ -0,0 +1,68 @@
+import os
+import pandas as pd
+
+# ✅ Formato de intercambio entre etapas del pipeline.
+#    Parquet conserva los tipos (numéricos y categóricos) y evita volver a
+#    inferirlos desde texto en cada etapa. CSV queda como opción de exportación.
+FORMATO_POR_DEFECTO = "parquet"
+FORMATOS = ("parquet", "csv", "ambos")
+
+EXTENSIONES = {"parquet": ".parquet", "csv": ".csv"}
+
+
+def ruta_tabla(ruta_resultados, nombre, formato):
+    """Ruta del archivo `nombre` (sin extensión) en el formato indicado."""
+    return os.path.join(ruta_resultados, nombre + EXTENSIONES[formato])
+
+
+def guardar_tabla(df, ruta_resultados, nombre, formato=FORMATO_POR_DEFECTO):
+    """
+    Guarda `df` como `resultados/<nombre>.parquet` y/o `.csv`.
+
+    formato: "parquet" (por defecto), "csv" o "ambos".
+    Devuelve la lista de rutas escritas.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (opciones: {', '.join(FORMATOS)})")
+
+    os.makedirs(ruta_resultados, exist_ok=True)
+    rutas = []
+
+    # 🔹 El CSV se escribe primero: con "ambos" el Parquet queda como el más reciente
+    if formato in ("csv", "ambos"):
+        ruta = ruta_tabla(ruta_resultados, nombre, "csv")
+        df.to_csv(ruta, index=False, encoding="utf-8-sig")
+        rutas.append(ruta)
+
+    if formato in ("parquet", "ambos"):
+        ruta = ruta_tabla(ruta_resultados, nombre, "parquet")
+        try:
+            df.to_parquet(ruta, index=False)
+            rutas.append(ruta)
+        except ImportError:
+            # ⚠️ Sin pyarrow no hay Parquet: se mantiene el comportamiento anterior
+            print("⚠️  pyarrow no está instalado, se guardará en CSV.")
+            if formato == "parquet":
+                ruta = ruta_tabla(ruta_resultados, nombre, "csv")
+                df.to_csv(ruta, index=False, encoding="utf-8-sig")
+                rutas.append(ruta)
+
+    return rutas
+
+
+def cargar_tabla(ruta_resultados, nombre):
+    """
+    Carga `resultados/<nombre>` en el formato disponible.
+
+    Si existen ambos formatos se usa el más reciente, para no leer una copia
+    desactualizada cuando una etapa se ejecutó solo con exportación CSV.
+    """
+    candidatas = [ruta_tabla(ruta_resultados, nombre, f) for f in ("parquet", "csv")]
+    existentes = [r for r in candidatas if os.path.exists(r)]
+    if not existentes:
+        raise FileNotFoundError(f"No se encontró el archivo: {candidatas[0]} (ni su versión .csv)")
+
+    ruta = max(existentes, key=os.path.getmtime)
+    if ruta.endswith(".parquet"):
+        return pd.read_parquet(ruta)
+    return pd.read_csv(ruta, encoding="utf-8-sig")
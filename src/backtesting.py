@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from sklearn.metrics import mean_squared_error, r2_score
+from threadpoolctl import threadpool_limits
+from almacenamiento import cargar_tabla
+from modelado import crear_modelo, MODELOS, X_COLS, Y_COL
+from prediccion import codificar_columna
+
+# ✅ Backtesting temporal con origen móvil (walk-forward) sobre PROCESO.
+#    En cada fold se entrena con todos los procesos anteriores y se prueba con el
+#    siguiente (ej: 2023-II..2024-II → 2025-I, 2023-II..2025-I → 2025-II, ...).
+#    Codificadores, promedios por escuela y escalador se ajustan SOLO con el pasado,
+#    a diferencia del train_test_split aleatorio de transformacion.py.
+#
+#    Las matrices codificadas de cada fold se guardan en `resultados/backtest/folds/`
+#    y se reutilizan mientras no cambien los datos limpios: probar otro modelo no
+#    obliga a reconstruirlas.
+
+# 🔸 Subir si cambia la forma de construir las variables de un fold (invalida la caché)
+VERSION_FOLDS = 1
+MIN_PROCESOS_TRAIN = 3
+
+
+def construir_fold(df_train, df_test):
+    """Codifica train y test usando solo información de train."""
+    le_escuela = LabelEncoder().fit(df_train["ESCUELA PROFESIONAL"])
+    le_obs = LabelEncoder().fit(df_train["OBSERVACION"])
+    promedios = df_train.groupby("ESCUELA PROFESIONAL", observed=True)["PUNTAJE"].mean()
+    promedio_global = df_train["PUNTAJE"].mean()
+
+    salidas = []
+    for df in (df_train, df_test):
+        X = pd.DataFrame(index=df.index)
+        # 🔹 Escuelas u observaciones que no existían en el pasado → -1 (como prediccion.py)
+        X["ESCUELA_COD"] = codificar_columna(df["ESCUELA PROFESIONAL"], le_escuela)
+        X["OBSERVACION_COD"] = codificar_columna(df["OBSERVACION"], le_obs)
+        X["PROMEDIO_ESCUELA"] = df["ESCUELA PROFESIONAL"].map(promedios).astype("float64").fillna(promedio_global)
+        X["DIFERENCIA_PROMEDIO"] = df["PUNTAJE"] - X["PROMEDIO_ESCUELA"]
+        X[Y_COL] = df[Y_COL]
+        salidas.append(X)
+
+    columnas_a_normalizar = ["PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
+    scaler = MinMaxScaler().fit(salidas[0][columnas_a_normalizar])
+    for X in salidas:
+        X[columnas_a_normalizar] = scaler.transform(X[columnas_a_normalizar])
+    return salidas[0].reset_index(drop=True), salidas[1].reset_index(drop=True)
+
+
+def preparar_folds(df, ruta_folds, min_procesos=MIN_PROCESOS_TRAIN):
+    """Construye (o reutiliza) los folds y devuelve [(proceso_test, procesos_train, ruta_train, ruta_test)]."""
+    os.makedirs(ruta_folds, exist_ok=True)
+    huella_df = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+    procesos = sorted(df["PROCESO"].unique())
+    folds = []
+    for i in range(min_procesos, len(procesos)):
+        procesos_train, proceso_test = procesos[:i], procesos[i]
+        clave = hashlib.sha1(json.dumps(
+            {"datos": huella_df, "version": VERSION_FOLDS, "train": procesos_train, "test": proceso_test}
+        ).encode("utf-8")).hexdigest()[:16]
+        ruta_train = os.path.join(ruta_folds, f"{proceso_test}_{clave}_train.parquet")
+        ruta_test = os.path.join(ruta_folds, f"{proceso_test}_{clave}_test.parquet")
+
+        if os.path.exists(ruta_train) and os.path.exists(ruta_test):
+            print(f"♻️ Fold {proceso_test}: matrices desde caché")
+        else:
+            print(f"🧱 Fold {proceso_test}: construyendo variables con {', '.join(procesos_train)}")
+            train, test = construir_fold(df[df["PROCESO"].isin(procesos_train)], df[df["PROCESO"] == proceso_test])
+            train.to_parquet(ruta_train, index=False)
+            test.to_parquet(ruta_test, index=False)
+        folds.append((proceso_test, procesos_train, ruta_train, ruta_test))
+    return folds
+
+
+def evaluar_fold(modelo_nombre, proceso_test, procesos_train, ruta_train, ruta_test, n_jobs=1):
+    """Entrena un modelo en un fold y devuelve sus métricas en el proceso de prueba."""
+    train = pd.read_parquet(ruta_train)
+    test = pd.read_parquet(ruta_test)
+    with threadpool_limits(limits=n_jobs):
+        modelo = crear_modelo(modelo_nombre, n_jobs=n_jobs)
+        modelo.fit(train[X_COLS], train[Y_COL])
+        pred = modelo.predict(test[X_COLS])
+    return {
+        "Modelo": modelo_nombre,
+        "PROCESO_TEST": proceso_test,
+        "PROCESOS_TRAIN": f"{procesos_train[0]}..{procesos_train[-1]}",
+        "N_TRAIN": len(train),
+        "N_TEST": len(test),
+        "R2": r2_score(test[Y_COL], pred),
+        "RMSE": float(np.sqrt(mean_squared_error(test[Y_COL], pred))),
+    }
+
+
+def ejecutar_backtest(modelos=None, min_procesos=MIN_PROCESOS_TRAIN, n_workers=None):
+    # ---------- 1. RUTAS Y DATOS ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_actual)
+    ruta_resultados = os.path.join(ruta_raiz, "resultados")
+    ruta_backtest = os.path.join(ruta_resultados, "backtest")
+    modelos = modelos or MODELOS
+    n_workers = n_workers or os.cpu_count() or 1
+
+    df = cargar_tabla(ruta_resultados, "datos_limpios")
+
+    # ---------- 2. FOLDS (con caché) ----------
+    folds = preparar_folds(df, os.path.join(ruta_backtest, "folds"), min_procesos)
+    if not folds:
+        raise ValueError(f"Se necesitan más de {min_procesos} procesos para el backtesting.")
+
+    # ---------- 3. ENTRENAMIENTO POR FOLD EN PARALELO ----------
+    tareas = [(m,) + fold for fold in folds for m in modelos]
+    print(f"\n⚡ Evaluando {len(tareas)} combinaciones modelo × fold con {n_workers} procesos...")
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futuros = [pool.submit(evaluar_fold, *t) for t in tareas]
+        filas = []
+        for futuro in futuros:
+            fila = futuro.result()
+            print(f"   • {fila['Modelo']:<17} {fila['PROCESO_TEST']:<8} R2={fila['R2']:.6f} RMSE={fila['RMSE']:.4f}")
+            filas.append(fila)
+
+    # ---------- 4. TABLAS POR FOLD Y AGREGADA ----------
+    df_folds = pd.DataFrame(filas)
+    df_agregado = df_folds.groupby("Modelo", sort=False).agg(
+        FOLDS=("PROCESO_TEST", "count"),
+        R2_PROMEDIO=("R2", "mean"),
+        R2_DESV=("R2", "std"),
+        RMSE_PROMEDIO=("RMSE", "mean"),
+        RMSE_DESV=("RMSE", "std"),
+    ).reset_index()
+
+    os.makedirs(ruta_backtest, exist_ok=True)
+    ruta_folds_csv = os.path.join(ruta_backtest, "backtest_por_fold.csv")
+    ruta_agregado_csv = os.path.join(ruta_backtest, "backtest_resumen.csv")
+    df_folds.to_csv(ruta_folds_csv, index=False, encoding="utf-8-sig")
+    df_agregado.to_csv(ruta_agregado_csv, index=False, encoding="utf-8-sig")
+
+    print("\n📊 Resumen del backtesting:")
+    print(df_agregado)
+    print(f"💾 Por fold: {ruta_folds_csv}")
+    print(f"💾 Resumen: {ruta_agregado_csv}")
+    return df_folds, df_agregado
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtesting temporal (walk-forward) por PROCESO.")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, help="modelos a evaluar (por defecto, todos)")
+    parser.add_argument("--min-procesos", type=int, default=MIN_PROCESOS_TRAIN,
+                        help="procesos de entrenamiento del primer fold")
+    parser.add_argument("--workers", type=int, default=None, help="procesos en paralelo (por defecto, todos los núcleos)")
+    args = parser.parse_args()
+
+    ejecutar_backtest(args.modelos, args.min_procesos, args.workers)
@@ -0,0 +1,217 @@
+import io
+import os
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import contextlib
+import tracemalloc
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datos_sinteticos import generar_arbol
+from instrumentacion import configurar, pico_rss_mb
+
+# ✅ Benchmark de las etapas del proyecto sobre datos sintéticos a 1x, 10x, 100x.
+#
+#    Por defecto solo 1x y 10x. 100x (~15 millones de filas) se pide con `--escalas 1 10 100`:
+#    a 1x modelar ya llega a ~2.4 GB de RSS y ~2 minutos (Random Forest con 200 árboles
+#    crece con las filas), así que 100x no entra en la memoria de una máquina de trabajo
+#    común y tarda horas. Conviene correrla en una máquina grande o con --etapas sin modelar.
+#
+#    - Cada etapa corre en un proceso nuevo (spawn), así el pico de RSS es solo suyo.
+#    - Las etapas leen y escriben en `resultados/benchmark/x<escala>/resultados/`,
+#      nunca en `resultados/` del proyecto.
+#    - Cada medición se agrega como una línea JSON a `resultados/benchmark/benchmark.jsonl`
+#      con el commit actual, para comparar antes y después de un cambio (--comparar).
+#    - El detalle por paso (instrumentacion.py) queda en `x<escala>/metricas.jsonl`.
+
+ETAPAS = ["cargar", "limpiar", "transformar", "modelar", "predecir"]
+ESCALAS = [1, 10]            # 🔸 100x fuera del default: ver arriba
+
+
+def commit_actual(ruta_raiz):
+    """Hash corto de HEAD (con '+' si hay cambios sin confirmar en src/)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ruta_raiz,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        sucio = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "src"], cwd=ruta_raiz).returncode != 0
+        return commit + ("+" if sucio else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def correr_etapa(etapa, ruta_datos, ruta_resultados, n_workers):
+    """Ejecuta una etapa leyendo y escribiendo en `ruta_resultados`; devuelve las filas procesadas."""
+    if etapa == "cargar":
+        from cargar_datos import cargar_datos
+        return len(cargar_datos(n_workers=n_workers, ruta_base=ruta_datos, ruta_resultados=ruta_resultados))
+    if etapa == "limpiar":
+        from limpieza_datos import limpiar_datos
+        return len(limpiar_datos(ruta_resultados=ruta_resultados))
+    if etapa == "transformar":
+        from transformacion import transformar_datos
+        return len(transformar_datos(ruta_resultados=ruta_resultados)[0])
+    if etapa == "modelar":
+        from modelado import modelar_datos
+        from almacenamiento import cargar_tabla
+        modelar_datos(ruta_resultados=ruta_resultados)
+        return len(cargar_tabla(ruta_resultados, "train"))
+    if etapa == "predecir":
+        from prediccion import predecir_resultados
+        predecir_resultados(ruta_resultados=ruta_resultados)
+        return len(pd.read_csv(os.path.join(ruta_resultados, "predicciones_detalladas_2026II.csv"),
+                               usecols=["PUNTAJE_PREDICTO"]))
+    raise ValueError(f"Etapa desconocida: {etapa}")
+
+
+def medir_etapa(etapa, ruta_datos, ruta_resultados, n_workers=1, con_tracemalloc=False):
+    """Corre en un proceso aparte: mide tiempo real, CPU (propia y de hijos) y memoria pico."""
+    configurar(archivo=os.path.join(os.path.dirname(ruta_resultados), "metricas.jsonl"),
+               con_tracemalloc=con_tracemalloc)
+    if con_tracemalloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # 🔹 sin los prints de la etapa
+        filas = correr_etapa(etapa, ruta_datos, ruta_resultados, n_workers)
+
+    tiempo = time.perf_counter() - inicio_real
+    cpu = time.process_time() - inicio_cpu
+    hijos = os.times()  # 🔹 CPU de los procesos hijos (en Windows queda en 0)
+    medicion = {
+        "filas": filas,
+        "tiempo_s": tiempo,
+        "cpu_s": cpu + hijos.children_user + hijos.children_system,
+        "pico_rss_mb": pico_rss_mb(),  # None si la plataforma no lo informa
+        "pico_tracemalloc_mb": None,
+    }
+    if con_tracemalloc:
+        medicion["pico_tracemalloc_mb"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return medicion
+
+
+def cuarentena_por_motivo(ruta_resultados):
+    """{"cuarentena_<MOTIVO>": filas} de la carga recién medida (ver validacion_esquema.py)."""
+    ruta = os.path.join(ruta_resultados, "cuarentena_resumen.csv")
+    if not os.path.exists(ruta):
+        return {}
+    resumen = pd.read_csv(ruta, encoding="utf-8-sig").groupby("MOTIVO")["FILAS"].sum()
+    return {f"cuarentena_{motivo}": int(n) for motivo, n in resumen.items()}
+
+
+def reportar_perdidas(registro):
+    """
+    Filas generadas que no llegaron a datos_unificados.
+
+    Los datos sintéticos solo traen puntajes vacíos (ausentes) y algún CODIGO repetido
+    por azar; cualquier otro motivo de cuarentena es un error de lectura (ej: un
+    encoding mal detectado que corre las columnas).
+    """
+    esperados = {"cuarentena_PUNTAJE_VACIO", "cuarentena_DUPLICADO"}
+    inesperadas = {k[len("cuarentena_"):]: n for k, n in registro.items()
+                   if k.startswith("cuarentena_") and k not in esperados}
+    perdidas = registro["filas_generadas"] - registro["filas"]
+    print(f"     {registro['filas_generadas']} generadas, {perdidas} sin cargar"
+          + (f"; ⚠️ cuarentena inesperada: {inesperadas}" if inesperadas else ""))
+
+
+def ejecutar_benchmark(escalas=None, etapas=None, n_workers=1, con_tracemalloc=False):
+    # ---------- 1. RUTAS ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_actual)
+    ruta_benchmark = os.path.join(ruta_raiz, "resultados", "benchmark")
+    ruta_registro = os.path.join(ruta_benchmark, "benchmark.jsonl")
+    escalas = escalas or ESCALAS
+    etapas = [e for e in ETAPAS if e in (etapas or ETAPAS)]  # 🔹 siempre en el orden del pipeline
+
+    commit = commit_actual(ruta_raiz)
+    fecha = time.strftime("%Y-%m-%d %H:%M:%S")
+    contexto = multiprocessing.get_context("spawn")
+    mediciones = []
+
+    for escala in escalas:
+        # ---------- 2. DATOS SINTÉTICOS ----------
+        ruta_datos = os.path.join(ruta_benchmark, f"datos_x{escala}")
+        filas_generadas = generar_arbol(ruta_datos, escala)
+
+        # ✅ Resultados limpios en cada corrida: sin cachés de corridas anteriores
+        ruta_resultados = os.path.join(ruta_benchmark, f"x{escala}", "resultados")
+        if etapas[0] == "cargar":
+            shutil.rmtree(ruta_resultados, ignore_errors=True)
+        os.makedirs(ruta_resultados, exist_ok=True)
+
+        if "predecir" in etapas and "modelar" not in etapas and \
+                not os.path.exists(os.path.join(ruta_resultados, "modelo_final.pkl")):
+            raise ValueError(f"'predecir' necesita un modelo en {ruta_resultados}: incluye también 'modelar'.")
+
+        # ---------- 3. UNA ETAPA POR PROCESO ----------
+        print(f"\n⏱️ Escala x{escala} ({commit})")
+        for etapa in etapas:
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+                medicion = pool.submit(medir_etapa, etapa, ruta_datos, ruta_resultados,
+                                       n_workers, con_tracemalloc).result()
+            registro = {"commit": commit, "fecha": fecha, "escala": escala, "etapa": etapa,
+                        "workers": n_workers, **medicion}
+            if etapa == "cargar":
+                registro.update(filas_generadas=filas_generadas, **cuarentena_por_motivo(ruta_resultados))
+            mediciones.append(registro)
+            with open(ruta_registro, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro) + "\n")
+            rss = "n/d" if medicion["pico_rss_mb"] is None else f"{medicion['pico_rss_mb']:.1f}"
+            print(f"   • {etapa:<12} {medicion['filas']:>10} filas  {medicion['tiempo_s']:8.2f} s  "
+                  f"CPU {medicion['cpu_s']:8.2f} s  RSS {rss:>8} MB")
+            if etapa == "cargar":
+                reportar_perdidas(registro)
+
+    print(f"\n💾 Mediciones agregadas a: {ruta_registro}")
+    return pd.DataFrame(mediciones)
+
+
+def comparar(ruta_registro, commit_base=None, commit_nuevo=None):
+    """Compara tiempo y memoria por (escala, etapa) entre dos commits (por defecto, los dos últimos)."""
+    df = pd.read_json(ruta_registro, lines=True, dtype={"commit": str})
+    commits = list(dict.fromkeys(df["commit"]))
+    if commit_nuevo is None:
+        commit_nuevo = commits[-1]
+    if commit_base is None:
+        anteriores = [c for c in commits if c != commit_nuevo]
+        if not anteriores:
+            raise ValueError("Se necesitan mediciones de al menos dos commits para comparar.")
+        commit_base = anteriores[-1]
+
+    # 🔹 Última medición de cada commit por (escala, etapa)
+    ultimas = df.groupby(["commit", "escala", "etapa"]).last()
+    base, nuevo = ultimas.loc[commit_base], ultimas.loc[commit_nuevo]
+    tabla = pd.DataFrame({
+        f"tiempo_s {commit_base}": base["tiempo_s"],
+        f"tiempo_s {commit_nuevo}": nuevo["tiempo_s"],
+        "razon_tiempo": nuevo["tiempo_s"] / base["tiempo_s"],
+        f"rss_mb {commit_base}": base["pico_rss_mb"],
+        f"rss_mb {commit_nuevo}": nuevo["pico_rss_mb"],
+    }).dropna(subset=["razon_tiempo"])
+    print(f"📊 {commit_nuevo} frente a {commit_base} (razón < 1 = más rápido):")
+    print(tabla.to_string(float_format=lambda x: f"{x:.2f}"))
+    return tabla
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide tiempo y memoria de cada etapa sobre datos sintéticos.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS, help="multiplicadores de tamaño (por defecto 1 10; 100x necesita decenas de GB para modelar)")
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, help="etapas a medir (por defecto, todas)")
+    parser.add_argument("--workers", type=int, default=1, help="procesos para la carga de archivos")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="medir también el pico de tracemalloc (agrega sobrecosto al tiempo)")
+    parser.add_argument("--comparar", nargs="*", metavar="COMMIT",
+                        help="no medir: comparar dos commits del registro (por defecto, los dos últimos)")
+    args = parser.parse_args()
+
+    if args.comparar is not None:
+        ruta_actual = os.path.dirname(os.path.abspath(__file__))
+        comparar(os.path.join(os.path.dirname(ruta_actual), "resultados", "benchmark", "benchmark.jsonl"),
+                 *args.comparar[:2])
+    else:
+        ejecutar_benchmark(args.escalas, args.etapas, args.workers, args.tracemalloc)
@@ -0,0 +1,222 @@
+import os
+import json
+import math
+import random
+import hashlib
+import argparse
+import itertools
+import joblib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+from almacenamiento import cargar_tabla
+from modelado import crear_modelo, MODELOS, X_COLS, Y_COL
+from almacen_modelos import AlmacenModelos, escribir_json
+
+# ✅ Búsqueda de hiperparámetros con "successive halving":
+#    cada ronda evalúa las configuraciones sobrevivientes con más filas de
+#    entrenamiento y se queda con la mejor 1/ETA parte. Las configuraciones débiles
+#    se descartan con pocas filas, que es lo barato.
+#
+#    - Los ensayos corren en paralelo (un proceso por ensayo, 1 hilo cada uno).
+#    - Cada ensayo terminado se guarda en `resultados/busqueda/ensayos/` y se
+#      reutiliza si la búsqueda se interrumpe o se repite con los mismos datos.
+#    - La selección usa una partición de validación sacada de train; test solo se
+#      usa al final para comparar a los ganadores, igual que modelado.py.
+#    - Solo el ganador se guarda en `modelo_final.pkl` y se publica en el almacén de modelos.
+
+ESPACIOS = {
+    "Regresión Lineal": {},
+    "Random Forest": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 12, 20],
+        "min_samples_leaf": [1, 2, 5],
+        "max_features": [1.0, 0.5],
+    },
+    "XGBoost": {
+        "n_estimators": [300, 600],
+        "learning_rate": [0.03, 0.05, 0.1],
+        "max_depth": [4, 6, 8],
+        "subsample": [0.8, 1.0],
+    },
+}
+
+ETA = 3                 # fracción que sobrevive a cada ronda: 1/ETA
+CONFIGURACIONES = 9     # configuraciones iniciales por modelo (muestreadas del espacio)
+FILAS_MINIMAS = 2000    # filas de la primera ronda como mínimo
+
+# Datos compartidos por cada proceso del pool (se envían una vez, no por ensayo)
+_DATOS = {}
+
+
+def _inicializar_datos(X_tr, y_tr, X_val, y_val):
+    _DATOS.update(X_tr=X_tr, y_tr=y_tr, X_val=X_val, y_val=y_val)
+
+
+def evaluar_ensayo(nombre, params, filas):
+    """Entrena `nombre` con `params` sobre las primeras `filas` filas y lo evalúa en validación."""
+    with threadpool_limits(limits=1):
+        modelo = crear_modelo(nombre, n_jobs=1, params=params)
+        modelo.fit(_DATOS["X_tr"].iloc[:filas], _DATOS["y_tr"].iloc[:filas])
+        pred = modelo.predict(_DATOS["X_val"])
+    return {
+        "R2": r2_score(_DATOS["y_val"], pred),
+        "RMSE": float(np.sqrt(mean_squared_error(_DATOS["y_val"], pred))),
+    }
+
+
+def huella_datos(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(pd.util.hash_pandas_object(parte, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def clave_ensayo(nombre, params, filas, huella):
+    contenido = json.dumps({"modelo": nombre, "params": params, "filas": filas, "datos": huella},
+                           sort_keys=True, default=str)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def muestrear_configuraciones(espacio, n, semilla=42):
+    """Hasta `n` combinaciones distintas del espacio (todas si hay menos)."""
+    claves = sorted(espacio)
+    todas = [dict(zip(claves, valores)) for valores in itertools.product(*(espacio[c] for c in claves))]
+    if len(todas) <= n:
+        return todas
+    return random.Random(semilla).sample(todas, n)
+
+
+def ejecutar_ensayos(pool, ensayos, ruta_ensayos, huella):
+    """Evalúa [(nombre, params, filas)] usando la caché en disco; devuelve métricas en el mismo orden."""
+    resultados = [None] * len(ensayos)
+    pendientes = {}
+    for i, (nombre, params, filas) in enumerate(ensayos):
+        ruta = os.path.join(ruta_ensayos, clave_ensayo(nombre, params, filas, huella) + ".json")
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                resultados[i] = json.load(f)
+        else:
+            pendientes[pool.submit(evaluar_ensayo, nombre, params, filas)] = (i, ruta)
+
+    print(f"   ♻️ {len(ensayos) - len(pendientes)} ensayos desde caché, {len(pendientes)} nuevos")
+    # 🔹 Cada ensayo se guarda apenas termina: si la búsqueda se corta, lo ya evaluado queda en caché
+    for futuro in as_completed(pendientes):
+        i, ruta = pendientes[futuro]
+        resultados[i] = futuro.result()
+        escribir_json(ruta, resultados[i])
+    return resultados
+
+
+def buscar_hiperparametros(n_workers=None, modelos=None, configuraciones=CONFIGURACIONES, eta=ETA):
+    # ---------- 1. RUTAS Y DATOS ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_actual)
+    ruta_resultados = os.path.join(ruta_raiz, "resultados")
+    ruta_busqueda = os.path.join(ruta_resultados, "busqueda")
+    ruta_ensayos = os.path.join(ruta_busqueda, "ensayos")
+    os.makedirs(ruta_ensayos, exist_ok=True)
+
+    train_df = cargar_tabla(ruta_resultados, "train")
+    test_df = cargar_tabla(ruta_resultados, "test")
+    modelos = modelos or MODELOS
+    n_workers = n_workers or os.cpu_count() or 1
+
+    # ✅ Validación separada de train; el orden barajado fija subconjuntos anidados por ronda
+    tr, val = train_test_split(train_df, test_size=0.2, random_state=42, shuffle=True)
+    X_tr, y_tr = tr[X_COLS], tr[Y_COL]
+    X_val, y_val = val[X_COLS], val[Y_COL]
+    huella = huella_datos(tr[X_COLS + [Y_COL]], val[X_COLS + [Y_COL]])
+    print(f"🔎 Búsqueda de hiperparámetros: {len(tr)} filas de entrenamiento, {len(val)} de validación, "
+          f"{n_workers} procesos (huella de datos {huella})")
+
+    # ---------- 2. SUCCESSIVE HALVING POR MODELO ----------
+    registros = []
+    mejores = {}
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_inicializar_datos,
+                             initargs=(X_tr, y_tr, X_val, y_val)) as pool:
+        vivos = {m: muestrear_configuraciones(ESPACIOS[m], configuraciones) for m in modelos}
+        rondas, restantes = 0, max(len(c) for c in vivos.values())
+        while restantes > 1:
+            restantes, rondas = math.ceil(restantes / eta), rondas + 1
+        rondas = max(rondas, 1)
+
+        for ronda in range(rondas):
+            # 🔹 Las filas crecen ETA veces por ronda; la última usa 1/ETA de train
+            #    (el ganador se reentrena después con todo train)
+            filas = min(len(tr), max(FILAS_MINIMAS, int(len(tr) / eta ** (rondas - ronda))))
+            ensayos = [(m, p, filas) for m in modelos for p in vivos[m]]
+            print(f"\n🏁 Ronda {ronda + 1}/{rondas}: {len(ensayos)} ensayos con {filas} filas")
+            metricas = ejecutar_ensayos(pool, ensayos, ruta_ensayos, huella)
+
+            for (m, p, _), met in zip(ensayos, metricas):
+                registros.append({"Modelo": m, "Ronda": ronda + 1, "Filas": filas,
+                                  "Parametros": json.dumps(p, sort_keys=True, default=str), **met})
+
+            # ✅ Sobreviven las mejores 1/eta configuraciones de cada modelo
+            for m in modelos:
+                puntuados = sorted(
+                    ((met["R2"], i) for i, ((mm, _, _), met) in enumerate(zip(ensayos, metricas)) if mm == m),
+                    reverse=True,
+                )
+                cupo = max(1, math.ceil(len(vivos[m]) / eta))
+                vivos[m] = [ensayos[i][1] for _, i in puntuados[:cupo]]
+
+        mejores = {m: vivos[m][0] for m in modelos}
+
+    df_registros = pd.DataFrame(registros)
+    ruta_registros = os.path.join(ruta_busqueda, "resultados_busqueda.csv")
+    df_registros.to_csv(ruta_registros, index=False, encoding="utf-8-sig")
+
+    # ---------- 3. REENTRENAMIENTO DE LOS GANADORES Y COMPARACIÓN EN TEST ----------
+    print("\n🤖 Reentrenando la mejor configuración de cada modelo con todo train...")
+    X_train, y_train = train_df[X_COLS], train_df[Y_COL]
+    X_test, y_test = test_df[X_COLS], test_df[Y_COL]
+
+    finales = []
+    mejor_r2, modelo_final, ganador = -np.inf, None, None
+    for m in modelos:
+        modelo = crear_modelo(m, n_jobs=n_workers, params=mejores[m])
+        modelo.fit(X_train, y_train)
+        pred = modelo.predict(X_test)
+        r2, rmse = r2_score(y_test, pred), float(np.sqrt(mean_squared_error(y_test, pred)))
+        finales.append({"Modelo": m, "R2": r2, "RMSE": rmse, "Parametros": json.dumps(mejores[m], default=str)})
+        print(f"   • {m}: R2={r2:.6f} RMSE={rmse:.4f} {mejores[m]}")
+        if r2 > mejor_r2:
+            mejor_r2, modelo_final, ganador = r2, modelo, m
+        del modelo  # 🔹 no acumular bosques grandes en memoria
+
+    df_finales = pd.DataFrame(finales)
+    df_finales.to_csv(os.path.join(ruta_busqueda, "mejores_configuraciones.csv"), index=False, encoding="utf-8-sig")
+    if ganador is None:
+        raise RuntimeError("Ningún modelo obtuvo un R2 finito en test: no hay ganador que publicar "
+                           f"(ver {os.path.join(ruta_busqueda, 'mejores_configuraciones.csv')}).")
+
+    # ---------- 4. GUARDAR SOLO EL GANADOR ----------
+    ruta_modelo = os.path.join(ruta_resultados, "modelo_final.pkl")
+    joblib.dump(modelo_final, ruta_modelo)
+    joblib.dump(X_COLS, os.path.join(ruta_resultados, "columnas_entrenamiento.pkl"))
+    transformadores = joblib.load(os.path.join(ruta_resultados, "transformadores.pkl"))
+    metricas = df_finales.set_index("Modelo").loc[ganador, ["R2", "RMSE"]].to_dict()
+    version = AlmacenModelos(ruta_resultados).publicar(modelo_final, ganador, X_COLS, transformadores, metricas)
+
+    print(f"\n🏆 Mejor modelo: {ganador} ({mejores[ganador]})")
+    print(f"💾 Modelo guardado en: {ruta_modelo} (versión {version})")
+    print(f"💾 Ensayos: {ruta_registros}")
+    return df_finales
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros con successive halving.")
+    parser.add_argument("--workers", type=int, default=None, help="procesos en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, help="modelos a explorar (por defecto, todos)")
+    parser.add_argument("--configuraciones", type=int, default=CONFIGURACIONES,
+                        help="configuraciones iniciales por modelo")
+    parser.add_argument("--eta", type=int, default=ETA, help="factor de descarte por ronda")
+    args = parser.parse_args()
+
+    buscar_hiperparametros(args.workers, args.modelos, args.configuraciones, args.eta)
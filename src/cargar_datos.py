@@ -1,25 +1,92 @@
 import pandas as pd
 import os
 import csv
-import chardet
+import argparse
+import codecs
+import hashlib
+import json
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from unidecode import unidecode
+import instrumentacion
+from instrumentacion import medir, registrar, instrumentar
+from almacenamiento import guardar_tabla, FORMATO_POR_DEFECTO, FORMATOS
+import esquema_compacto
+from reglas_ingesta import columnas_descartadas, aplicar_reglas_filas
+from validacion_esquema import separar, reportar, lineas_invalidas, Cuarentena
 
 # ✅ CONSERVAR: Este import es útil para limpiar tildes y caracteres especiales
 # ✅ chardet y csv.Sniffer ayudan a detectar codificación y delimitador automáticamente
+#    (chardet se importa recién en la ruta lenta: la mayoría de los archivos no la usa)
 
 
-# ---------- Función auxiliar para detectar y leer CSV correctamente ----------
-def cargar_csv_robusto(ruta_archivo):
-    """Lee un CSV detectando automáticamente encoding y delimitador."""
+# ---------- Detección rápida de encoding y delimitador ----------
+DELIMITADORES_COMUNES = [',', ';', '\t', '|']
+
+
+def decodifica(muestra, enc):
+    """True si la muestra decodifica con `enc` sin errores (tolera un carácter cortado al final)."""
+    try:
+        codecs.getincrementaldecoder(enc)().decode(muestra, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def es_utf8(muestra):
+    """True si la muestra decodifica como UTF-8 estricto."""
+    return decodifica(muestra, 'utf-8')
+
+
+# 🔹 Codificaciones posibles para un CSV en español que no es UTF-8. Con textos cortos,
+#    chardet confunde cp1252 con koi8, MacTurkish, Big5 o incluso EBCDIC (cp500), y el
+#    archivo se lee mal: columnas corridas y filas perdidas. Esas respuestas se descartan.
+ENCODINGS_PLAUSIBLES = {codecs.lookup(e).name for e in
+                        ('ascii', 'utf-8', 'utf-8-sig', 'cp1252', 'latin-1', 'iso-8859-15', 'cp850')}
+
+
+def detectar_encoding(muestra):
+    """chardet si su respuesta es plausible; si no, cp1252 (o latin-1, que decodifica cualquier byte)."""
+    import chardet
+    enc = chardet.detect(muestra)['encoding']
+    if enc and codecs.lookup(enc).name in ENCODINGS_PLAUSIBLES:
+        return enc
+    try:
+        muestra.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def delimitador_rapido(encabezado):
+    """Elige el delimitador común que más aparece en la línea de encabezado (None si ninguno)."""
+    conteos = {d: encabezado.count(d) for d in DELIMITADORES_COMUNES}
+    delim = max(conteos, key=conteos.get)
+    return delim if conteos[delim] > 0 else None
+
+
+def detectar_formato(ruta_archivo, muestra):
+    """
+    Devuelve (encoding, delimitador, rapida).
+
+    Ruta rápida: UTF-8 estricto + delimitador común en el encabezado.
+    Ruta lenta (la original): chardet + csv.Sniffer.
+    """
+    if es_utf8(muestra):
+        enc = 'utf-8-sig' if muestra.startswith(codecs.BOM_UTF8) else 'utf-8'
+        encabezado = muestra.decode(enc, errors='ignore').splitlines()[0] if muestra else ''
+        delim = delimitador_rapido(encabezado)
+        if delim:
+            return enc, delim, True
 
     # ✅ CONSERVAR: detección automática de encoding
-    with open(ruta_archivo, 'rb') as f:
-        enc = chardet.detect(f.read(20000))['encoding']
+    enc = detectar_encoding(muestra)
 
     # ✅ CONSERVAR: detección automática de delimitador
     with open(ruta_archivo, 'r', encoding=enc, errors='ignore') as f:
         sample = f.read(2000)
-        f.seek(0)
         try:
             dialect = csv.Sniffer().sniff(sample)
             delim = dialect.delimiter
@@ -27,105 +94,413 @@ def cargar_csv_robusto(ruta_archivo):
             delim = ';'  # 🔸 RECOMENDACIÓN: podrías probar primero con ',' antes que ';'
             # Ejemplo: delim = ',' if ',' in sample else ';'
 
+    return enc, delim, False
+
+
+def leer_csv(ruta_archivo, enc, delim):
+    """
+    Lectura segura del CSV con encoding y delimitador ya resueltos.
+
+    Las líneas que no se pueden leer se saltan como antes, pero quedan en
+    `df.attrs["lineas_invalidas"]` para la cuarentena (validacion_esquema.py).
+    """
     # ✅ CONSERVAR: lectura segura del archivo CSV
-    df = pd.read_csv(
-        ruta_archivo,
+    # ⚡ Se intenta primero el parser en C (mucho más rápido); si el dialecto
+    #    no lo permite se vuelve al parser de Python como antes.
+    opciones = dict(
         encoding=enc,
         delimiter=delim,
         quotechar='"',
         skip_blank_lines=True,
-        on_bad_lines='skip',
-        engine='python'
+        on_bad_lines='warn',
     )
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        try:
+            df = pd.read_csv(ruta_archivo, engine='c', **opciones)
+        except (pd.errors.ParserError, ValueError):
+            del avisos[:]
+            df = pd.read_csv(ruta_archivo, engine='python', **opciones)
+    df.attrs["lineas_invalidas"] = lineas_invalidas(avisos)
+    return df
 
-    # 🔸 MEJORAR: usa `df.columns.str.contains` para evitar errores con tipos
-    if df.shape[0] > 0 and df.columns.astype(str).str.contains("CODIGO", case=False).any():
-        # ⚠️ Tu condición actual revisa la primera fila, no las columnas.
-        # Se reemplaza por una validación correcta:
-        pass  # no eliminar filas aquí, esto se manejará después si es necesario
 
-    return df
+# ---------- Función auxiliar para detectar y leer CSV correctamente ----------
+def cargar_csv_robusto(ruta_archivo, muestra=None):
+    """
+    Lee un CSV detectando automáticamente encoding y delimitador.
 
+    Devuelve (df, encoding, delimitador, rapida) con los valores con que se pudo leer.
+    """
+    if muestra is None:
+        with open(ruta_archivo, 'rb') as f:
+            muestra = f.read(20000)
 
-# ---------- Función principal ----------
-def cargar_datos():
-    # ✅ Ruta raíz del proyecto
-    ruta_actual = os.path.dirname(os.path.abspath(__file__))
-    ruta_raiz = os.path.dirname(ruta_actual)
-    ruta_base = os.path.join(ruta_raiz, "datos_admision")
+    enc, delim, rapida = detectar_formato(ruta_archivo, muestra)
+    try:
+        df = leer_csv(ruta_archivo, enc, delim)
+    except UnicodeDecodeError:
+        # ⚠️ La muestra decodificaba pero el resto del archivo no: si era la ruta rápida
+        #    (UTF-8) se vuelve a la lenta; si ya era la lenta, latin-1 lee cualquier byte
+        enc = detectar_encoding(muestra) if rapida else 'latin-1'
+        rapida = False
+        df = leer_csv(ruta_archivo, enc, delim)
 
-    if not os.path.exists(ruta_base):
-        raise FileNotFoundError(f"No se encontró la carpeta de datos: {ruta_base}")
+    return df, enc, delim, rapida
 
-    df_total = pd.DataFrame()
 
-    # ✅ Función para limpiar nombres de columnas
-    def limpiar_nombre(col):
-        col = unidecode(str(col).strip().upper())
-        # 🔸 RECOMENDACIÓN: agrega una limpieza más genérica
-        col = (col.replace("&OACUTE", "O")
-                  .replace("(PRIMERA OPCION)", "")
-                  .replace("  ", " ")
-                  .strip())
-        return col
+# ---------- Limpieza de nombres de columnas ----------
+def limpiar_nombre(col):
+    col = unidecode(str(col).strip().upper())
+    # 🔸 RECOMENDACIÓN: agrega una limpieza más genérica
+    col = (col.replace("&OACUTE", "O")
+              .replace("(PRIMERA OPCION)", "")
+              .replace("  ", " ")
+              .strip())
+    return col
 
-    # ✅ Recorrer carpetas y archivos CSV
+
+# ---------- Estandarización de un archivo ----------
+def resolver_mapeo(columnas):
+    """Devuelve {columna_final: posición de la columna original o None}."""
+
+    # ✅ Limpieza de nombres de columnas
+    #    (las columnas que descarta una regla de ingesta, ej: segunda opción, no se mapean)
+    nombres = [limpiar_nombre(c) for c in columnas]
+    descartadas = columnas_descartadas(nombres)
+    nombres = ["" if i in descartadas else c for i, c in enumerate(nombres)]
+
+    # ✅ Mapeo flexible de columnas esperadas
+    columnas_validas = {
+        "CODIGO": [i for i, c in enumerate(nombres) if "COD" in c],
+        "APELLIDOS Y NOMBRES": [i for i, c in enumerate(nombres) if "APELL" in c],
+        "ESCUELA PROFESIONAL": [i for i, c in enumerate(nombres) if "ESCUELA" in c],
+        "PUNTAJE": [i for i, c in enumerate(nombres) if "PUNTAJE" in c or "PUNTAJ" in c],
+        "MERITOE.P": [i for i, c in enumerate(nombres) if "MERITO" in c],
+        "OBSERVACION": [i for i, c in enumerate(nombres) if "OBSERV" in c],
+    }
+    return {col_final: (posibles[0] if posibles else None)
+            for col_final, posibles in columnas_validas.items()}
+
+
+def estandarizar_columnas(df, carpeta, mapeo=None):
+    """Devuelve un DataFrame con las columnas finales del proyecto y el PROCESO."""
+    if mapeo is None:
+        mapeo = resolver_mapeo(df.columns)
+
+    # ✅ Crear DataFrame temporal estandarizado
+    df_temp = pd.DataFrame()
+    for col_final, posicion in mapeo.items():
+        if posicion is not None:
+            df_temp[col_final] = df.iloc[:, posicion]
+        else:
+            df_temp[col_final] = None  # Mantener consistencia de columnas
+
+    # ✅ Agregar columna del proceso (ej: 2023-II)
+    df_temp["PROCESO"] = carpeta
+
+    # ✅ Reglas de ingesta (reglas_ingesta.py): mérito vacío para ausentes, etc.
+    df_temp, conteos = aplicar_reglas_filas(df_temp)
+    df_temp.attrs["reglas"] = conteos
+    # 🔹 Las líneas ilegibles viajan con la partición (también en la caché incremental)
+    df_temp.attrs["lineas_invalidas"] = df.attrs.get("lineas_invalidas", [])
+    return df_temp
+
+
+# ---------- Registro de firmas de encabezado ----------
+# 🔹 La mayoría de archivos comparten 2 o 3 encabezados. Para cada línea de encabezado
+#    cruda (y si la muestra es UTF-8) se guarda el encoding, el delimitador y el mapeo
+#    de columnas ya resueltos, así los siguientes archivos no repiten la detección.
+#    Es por proceso: cada worker del pool arma el suyo.
+REGISTRO_ENCABEZADOS = {}
+
+
+def procesar_archivo(tarea):
+    """
+    Lee y estandariza un archivo. Recibe (carpeta, ruta) para poder usarse en un pool.
+
+    Devuelve (df_temp, via) con via en {"registro", "rapida", "lenta"}.
+    """
+    carpeta, ruta_archivo = tarea
+
+    with open(ruta_archivo, 'rb') as f:
+        muestra = f.read(20000)
+    clave = (muestra.split(b'\n', 1)[0].rstrip(b'\r'), es_utf8(muestra))
+
+    formato = REGISTRO_ENCABEZADOS.get(clave)
+    # 🔹 El encoding lo detectó otro archivo con el mismo encabezado: se usa solo si
+    #    también decodifica la muestra de este (si no, o si falla más adelante, se detecta)
+    if formato is not None and decodifica(muestra, formato[0]):
+        enc, delim, mapeo = formato
+        try:
+            df = leer_csv(ruta_archivo, enc, delim)
+            return estandarizar_columnas(df, carpeta, mapeo), "registro"
+        except UnicodeDecodeError:
+            pass  # se resuelve abajo por la ruta normal
+
+    df, enc, delim, rapida = cargar_csv_robusto(ruta_archivo, muestra)
+    mapeo = resolver_mapeo(df.columns)
+    REGISTRO_ENCABEZADOS[clave] = (enc, delim, mapeo)
+    return estandarizar_columnas(df, carpeta, mapeo), ("rapida" if rapida else "lenta")
+
+
+def procesar_archivo_cronometrado(tarea):
+    """procesar_archivo + segundos que tardó (medidos en el proceso que lo lee)."""
+    inicio = time.perf_counter()
+    df, via = procesar_archivo(tarea)
+    return df, via, time.perf_counter() - inicio
+
+
+def listar_archivos(ruta_base):
+    """Lista (carpeta, ruta) de todos los CSV en el mismo orden que el recorrido original."""
+    tareas = []
     for carpeta in os.listdir(ruta_base):
         ruta_carpeta = os.path.join(ruta_base, carpeta)
+        if carpeta.endswith("-limpio"):
+            # ⚠️ Copias que escribía "limpiar_datos del 2024.py": las reglas ya se aplican al cargar
+            print(f"⚠️ Se omite {ruta_carpeta} (copia limpia antigua, ya no se usa).")
+            continue
         if os.path.isdir(ruta_carpeta):
             for archivo in os.listdir(ruta_carpeta):
                 if archivo.lower().endswith(".csv"):
-                    ruta_archivo = os.path.join(ruta_carpeta, archivo)
-                    print(f"📂 Cargando {ruta_archivo}...")
-
-                    # ✅ Leer archivo de forma robusta
-                    df = cargar_csv_robusto(ruta_archivo)
-
-                    # ✅ Limpieza de nombres de columnas
-                    df.columns = [limpiar_nombre(c) for c in df.columns]
-
-                    # ✅ Mapeo flexible de columnas esperadas
-                    columnas_validas = {
-                        "CODIGO": [c for c in df.columns if "COD" in c],
-                        "APELLIDOS Y NOMBRES": [c for c in df.columns if "APELL" in c],
-                        "ESCUELA PROFESIONAL": [c for c in df.columns if "ESCUELA" in c],
-                        "PUNTAJE": [c for c in df.columns if "PUNTAJE" in c or "PUNTAJ" in c],
-                        "MERITOE.P": [c for c in df.columns if "MERITO" in c],
-                        "OBSERVACION": [c for c in df.columns if "OBSERV" in c],
-                    }
-
-                    # ✅ Crear DataFrame temporal estandarizado
-                    df_temp = pd.DataFrame()
-                    for col_final, posibles in columnas_validas.items():
-                        if posibles:
-                            df_temp[col_final] = df[posibles[0]]
-                        else:
-                            df_temp[col_final] = None  # Mantener consistencia de columnas
-
-                    # ✅ Agregar columna del proceso (ej: 2023-II)
-                    df_temp["PROCESO"] = carpeta
-
-                    # ✅ Concatenar al dataset total
-                    df_total = pd.concat([df_total, df_temp], ignore_index=True)
+                    tareas.append((carpeta, os.path.join(ruta_carpeta, archivo)))
+    return tareas
+
+
+def leer_archivos(tareas, n_workers=1):
+    """Lee y estandariza una lista de (carpeta, ruta), en serie o con un pool de procesos."""
+    if not n_workers:
+        n_workers = os.cpu_count() or 1
+
+    resultados = []
+    if n_workers > 1 and len(tareas) > 1:
+        # ⚡ Cada archivo se lee y estandariza en un proceso distinto;
+        #    `map` conserva el orden, así el resultado es idéntico al secuencial.
+        print(f"⚡ Cargando {len(tareas)} archivos con {n_workers} procesos...")
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            for (_, ruta_archivo), resultado in zip(tareas, pool.map(procesar_archivo_cronometrado, tareas,
+                                                                    chunksize=4)):
+                print(f"📂 Cargado {ruta_archivo}")
+                resultados.append(resultado)
+    else:
+        for tarea in tareas:
+            print(f"📂 Cargando {tarea[1]}...")
+            resultados.append(procesar_archivo_cronometrado(tarea))
+
+    # 📊 Reporte de la detección de formato
+    vias = Counter(via for _, via, _ in resultados)
+    if resultados:
+        print(f"🔎 Detección de formato: {vias['registro']} por registro de encabezados, "
+              f"{vias['rapida']} por ruta rápida (UTF-8), {vias['lenta']} por ruta lenta (chardet).")
+        segundos = Counter()
+        for _, via, tiempo in resultados:
+            segundos[via] += tiempo
+        registrar("cargar.cargar_csv_robusto", por_via={
+            via: {"archivos": vias[via], "tiempo_s": round(segundos[via], 6)} for via in vias
+        })
+
+        # 🧹 Filas afectadas por cada regla de ingesta (sumadas entre archivos)
+        reglas = Counter()
+        for df_temp, _, _ in resultados:
+            reglas.update(df_temp.attrs.get("reglas", {}))
+        print("🧹 Reglas de ingesta: " + ", ".join(f"{nombre} {filas}" for nombre, filas in reglas.items()))
+        registrar("cargar.reglas_ingesta", filas_por_regla=dict(reglas))
+
+    return [df_temp for df_temp, _, _ in resultados]
+
+
+# ---------- Carga por partes (streaming) ----------
+def iterar_procesos(n_workers=1):
+    """
+    Genera (proceso, df) leyendo un PROCESO (carpeta) a la vez.
+
+    Solo se mantiene en memoria la partición actual, así el consumo no crece
+    con la cantidad de semestres cargados.
+    """
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_base = os.path.join(os.path.dirname(ruta_actual), "datos_admision")
+    if not os.path.exists(ruta_base):
+        raise FileNotFoundError(f"No se encontró la carpeta de datos: {ruta_base}")
+
+    tareas_por_proceso = {}
+    for carpeta, ruta_archivo in listar_archivos(ruta_base):
+        tareas_por_proceso.setdefault(carpeta, []).append((carpeta, ruta_archivo))
+
+    # 🔹 Los duplicados (CODIGO, PROCESO) no cruzan procesos: basta con validar cada partición
+    with Cuarentena(os.path.join(os.path.dirname(ruta_actual), "resultados")) as cuarentena:
+        for carpeta, tareas in tareas_por_proceso.items():
+            partes = leer_archivos(tareas, n_workers)
+            yield carpeta, separar(partes, tareas, cuarentena)
+        reportar(cuarentena)
+
+
+# ---------- Carga incremental con manifiesto ----------
+# 🔸 Subir este número si cambia la forma de estandarizar (invalida toda la caché)
+VERSION_CACHE = 4
+
+
+def hash_archivo(ruta_archivo):
+    """SHA-256 del contenido del archivo."""
+    h = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def cargar_incremental(tareas, ruta_base, ruta_cache, n_workers=1):
+    """
+    Devuelve las particiones estandarizadas de `tareas` usando la caché en `ruta_cache`.
+
+    El manifiesto guarda por archivo: ruta relativa, tamaño, mtime, hash y la
+    partición ya estandarizada. Solo se vuelven a leer los archivos nuevos o modificados.
+    """
+    os.makedirs(ruta_cache, exist_ok=True)
+    ruta_manifiesto = os.path.join(ruta_cache, "manifiesto.json")
+
+    manifiesto = {}
+    if os.path.exists(ruta_manifiesto):
+        with open(ruta_manifiesto, encoding="utf-8") as f:
+            contenido = json.load(f)
+        if contenido.get("version") == VERSION_CACHE:
+            manifiesto = contenido.get("archivos", {})
+
+    nuevo_manifiesto = {}
+    pendientes = []
+    for carpeta, ruta_archivo in tareas:
+        rel = os.path.relpath(ruta_archivo, ruta_base).replace(os.sep, "/")
+        st = os.stat(ruta_archivo)
+        entrada = manifiesto.get(rel)
+        particion = os.path.join(ruta_cache, hashlib.sha1(rel.encode("utf-8")).hexdigest() + ".pkl")
+
+        if entrada and os.path.exists(particion):
+            # ✅ Mismo tamaño y mtime: se asume sin cambios (no hace falta leer el archivo)
+            if entrada["tamano"] == st.st_size and entrada["mtime"] == st.st_mtime:
+                nuevo_manifiesto[rel] = entrada
+                continue
+            # ✅ Cambió el mtime pero no el contenido (ej: copia o checkout)
+            contenido_hash = hash_archivo(ruta_archivo)
+            if entrada["hash"] == contenido_hash:
+                nuevo_manifiesto[rel] = dict(entrada, tamano=st.st_size, mtime=st.st_mtime)
+                continue
+        else:
+            contenido_hash = hash_archivo(ruta_archivo)
+
+        nuevo_manifiesto[rel] = {
+            "carpeta": carpeta,
+            "tamano": st.st_size,
+            "mtime": st.st_mtime,
+            "hash": contenido_hash,
+            "particion": os.path.basename(particion),
+        }
+        pendientes.append((carpeta, ruta_archivo))
+
+    print(f"♻️ Caché: {len(tareas) - len(pendientes)} archivos sin cambios, "
+          f"{len(pendientes)} nuevos o modificados.")
+
+    # ✅ Leer solo lo pendiente y guardar su partición estandarizada
+    for (carpeta, ruta_archivo), df_temp in zip(pendientes, leer_archivos(pendientes, n_workers)):
+        rel = os.path.relpath(ruta_archivo, ruta_base).replace(os.sep, "/")
+        df_temp.to_pickle(os.path.join(ruta_cache, nuevo_manifiesto[rel]["particion"]))
+
+    # ✅ Eliminar particiones de archivos que ya no existen
+    for rel, entrada in manifiesto.items():
+        if rel not in nuevo_manifiesto:
+            ruta_vieja = os.path.join(ruta_cache, entrada["particion"])
+            if os.path.exists(ruta_vieja):
+                os.remove(ruta_vieja)
+
+    with open(ruta_manifiesto, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION_CACHE, "archivos": nuevo_manifiesto}, f, ensure_ascii=False, indent=1)
+
+    # ✅ Reconstruir en el mismo orden del recorrido original
+    partes = []
+    for _, ruta_archivo in tareas:
+        rel = os.path.relpath(ruta_archivo, ruta_base).replace(os.sep, "/")
+        partes.append(pd.read_pickle(os.path.join(ruta_cache, nuevo_manifiesto[rel]["particion"])))
+    return partes
+
+
+# ---------- Función principal ----------
+@instrumentar("cargar")
+def cargar_datos(n_workers=1, incremental=False, formato=FORMATO_POR_DEFECTO, ruta_base=None, ruta_resultados=None):
+    """
+    Carga y unifica todos los CSV de `datos_admision/`.
+
+    n_workers:   número de procesos para leer archivos en paralelo
+                 (1 = secuencial, None o 0 = todos los núcleos disponibles).
+    incremental: si es True, reutiliza las particiones en `resultados/cache_ingesta/`
+                 y solo vuelve a leer los archivos nuevos o modificados.
+    formato:     "parquet" (por defecto), "csv" o "ambos" para `datos_unificados`.
+    ruta_base, ruta_resultados: otras carpetas de entrada y salida (ej: datos sintéticos del benchmark).
+    """
+    # ✅ Ruta raíz del proyecto
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_actual)
+    ruta_base = ruta_base or os.path.join(ruta_raiz, "datos_admision")
+    carpeta_resultados = ruta_resultados or os.path.join(ruta_raiz, "resultados")
+
+    if not os.path.exists(ruta_base):
+        raise FileNotFoundError(f"No se encontró la carpeta de datos: {ruta_base}")
+
+    # ✅ Recorrer carpetas y archivos CSV
+    tareas = listar_archivos(ruta_base)
+    with medir("cargar.leer_archivos", archivos=len(tareas), workers=n_workers, incremental=incremental) as m:
+        if incremental:
+            ruta_cache = os.path.join(carpeta_resultados, "cache_ingesta")
+            partes = cargar_incremental(tareas, ruta_base, ruta_cache, n_workers)
+        else:
+            partes = leer_archivos(tareas, n_workers)
+        m["filas"] = sum(len(p) for p in partes)
+
+    # ✅ Concatenar una sola vez al final (evita el costo cuadrático de concatenar en el bucle),
+    #    sin las filas rechazadas por la validación: esas van a `resultados/cuarentena.csv`
+    with medir("cargar.concatenar", partes=len(partes)) as m:
+        with Cuarentena(carpeta_resultados) as cuarentena:
+            df_total = separar(partes, tareas, cuarentena)
+        m["filas"] = len(df_total)
+    por_motivo, por_archivo = reportar(cuarentena)
+    registrar("cargar.validacion", filas_por_motivo=por_motivo, filas_por_archivo=por_archivo)
+    df_total = esquema_compacto.compactar_etapa(df_total, "cargar")
 
     # ✅ Mensaje final
     print(f"\n✅ Datos cargados y estandarizados: {df_total.shape[0]} registros totales.\n")
     print(f"Columnas finales: {list(df_total.columns)}")
 
     # ✅ Guardar archivo consolidado
-    carpeta_resultados = os.path.join(ruta_raiz, "resultados")
-    os.makedirs(carpeta_resultados, exist_ok=True)
-    ruta_salida = os.path.join(carpeta_resultados, "datos_unificados.csv")
-
-    df_total.to_csv(ruta_salida, index=False, encoding="utf-8-sig")
-    print(f"💾 Archivo unificado guardado en: {ruta_salida}")
+    with medir("cargar.guardar", filas=len(df_total)):
+        rutas_salida = guardar_tabla(df_total, carpeta_resultados, "datos_unificados", formato)
+    for ruta_salida in rutas_salida:
+        print(f"💾 Archivo unificado guardado en: {ruta_salida}")
 
     return df_total
 
 
+# ---------- Línea de comandos ----------
+def agregar_argumentos(parser):
+    """--workers, --incremental y --formato, más instrumentación y esquema compacto."""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para la lectura en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="solo vuelve a leer los archivos nuevos o modificados")
+    parser.add_argument("--formato", choices=FORMATOS, default=FORMATO_POR_DEFECTO,
+                        help="formato de salida de datos_unificados")
+    instrumentacion.agregar_argumentos(parser)
+    esquema_compacto.agregar_argumentos(parser)
+
+
+def configurar_desde_args(args):
+    instrumentacion.configurar_desde_args(args)
+    esquema_compacto.configurar_desde_args(args)
+
+
 # ---------- Ejecución directa ----------
 if __name__ == "__main__":
-    df = cargar_datos()
+    parser = argparse.ArgumentParser(description="Carga y unifica los CSV de admisión.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    df = cargar_datos(n_workers=args.workers, incremental=args.incremental, formato=args.formato)
     print("\nVista previa:")
     print(df.head())
-
@@ -0,0 +1,163 @@
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+
+# ✅ Generador de árboles `datos_admision/<PROCESO>/<ESCUELA>.csv` sintéticos para el benchmark.
+#    Copia la estructura del árbol real (procesos, escuelas y filas por archivo) y
+#    multiplica las filas por `escala`. Cada proceso conserva su variante real de
+#    encabezado (incluida la entidad HTML `OBSERVACI&OacuteN`), BOM, decimales y
+#    texto de vacante (el árbol real es todo UTF-8, con o sin BOM).
+#    Una fracción de archivos (FRACCION_CP1252) se escribe en cp1252 con `;`, como las
+#    exportaciones de Excel en Windows, para pasar también por la detección lenta
+#    (chardet + Sniffer). Se leen igual que su versión UTF-8: si no, benchmark.py
+#    lo informa como filas perdidas al cargar.
+#    No usa nombres ni códigos reales: todo sale de un generador con semilla.
+
+VARIANTES = {
+    "2023-II": dict(
+        cabecera=["CODIGO", "APELLIDOS Y NOMBRES", "ESCUELA PROFESIONAL", "PUNTAJE FINAL", "MERITOE.P", "OBSERVACI&OacuteN"],
+        bom=False, decimales=4, vacante="ALCANZO VACANTE"),
+    "2024-I": dict(
+        cabecera=["CODIGO", "APELLIDOS Y NOMBRES", "ESCUELA PROFESIONAL", "PUNTAJE FINAL",
+                  "MERITOE.P ALCANZA VACANTE", "OBSERVACIÓN"],
+        bom=True, decimales=4, vacante="ALCANZO VACANTE"),
+    "2024-II": dict(
+        cabecera=["CODIGO", "APELLIDOS Y NOMBRES", "ESCUELA PROFESIONAL (PRIMERA OPCIÓN)", "PUNTAJE", "MERITOE.P",
+                  "OBSERVACIÓN"],
+        bom=True, decimales=4, vacante="ALCANZO VACANTE PRIMERA OPCIÓN"),
+    "2025-I": dict(
+        cabecera=["CODIGO", "APELLIDOS Y NOMBRES", "ESCUELA PROFESIONAL", "PUNTAJE", "MERITOE.P", "OBSERVACI&OacuteN"],
+        bom=False, decimales=3, vacante="ALCANZO VACANTE"),
+    "2025-II": dict(
+        cabecera=["CODIGO", "APELLIDOS Y NOMBRES", "ESCUELA PROFESIONAL", "PUNTAJE", "MERITOE.P", "OBSERVACI&OacuteN"],
+        bom=False, decimales=3, vacante="ALCANZO VACANTE"),
+    "2026-I": dict(
+        cabecera=["Código", "Apellidos y Nombres", "Escuela", "Puntaje", "Mérito E.P", "Observación"],
+        bom=False, decimales=3, vacante="ALCANZÓ VACANTE"),
+}
+
+APELLIDOS = np.array([
+    "QUISPE", "FLORES", "SÁNCHEZ", "RODRÍGUEZ", "GARCÍA", "HUAMÁN", "ROJAS", "MENDOZA", "CHÁVEZ", "RAMOS",
+    "CASTILLO", "TORRES", "VARGAS", "PEÑA", "MUÑOZ", "ESPINOZA", "CÓRDOVA", "VILLANUEVA", "SALAZAR", "DE LA CRUZ",
+])
+NOMBRES = np.array([
+    "JOSÉ", "MARÍA", "LUIS", "ANA", "JUAN", "ROSA", "CARLOS", "LUCÍA", "MIGUEL", "ÁNGELA",
+    "JESÚS", "SOFÍA", "ANDRÉ", "VALERIA", "JOAQUÍN", "XIOMARA", "FERNANDO", "BELÉN", "NICOLÁS", "NOEMÍ",
+])
+
+TASA_AUSENTES = 0.012
+TASA_INGRESO = 0.12
+FRACCION_CP1252 = 0.2
+
+
+def estructura_real(ruta_datos):
+    """{proceso: [(escuela, filas)]} del árbol real (filas sin contar el encabezado)."""
+    estructura = {}
+    for proceso in sorted(os.listdir(ruta_datos)):
+        ruta_proceso = os.path.join(ruta_datos, proceso)
+        if not os.path.isdir(ruta_proceso):
+            continue
+        escuelas = []
+        for archivo in sorted(os.listdir(ruta_proceso)):
+            if archivo.lower().endswith(".csv"):
+                with open(os.path.join(ruta_proceso, archivo), "rb") as f:
+                    filas = max(sum(1 for _ in f) - 1, 0)
+                escuelas.append((os.path.splitext(archivo)[0], filas))
+        estructura[proceso] = escuelas
+    return estructura
+
+
+def generar_escuela(azar, escuela, n, variante):
+    """DataFrame de `n` postulantes de una escuela con el formato de `variante`."""
+    apellidos = azar.choice(APELLIDOS, size=(n, 2))
+    nombres = azar.choice(NOMBRES, size=(n, 2))
+    nombre_completo = (pd.Series(apellidos[:, 0]) + " " + apellidos[:, 1] + ", " + nombres[:, 0] + " " + nombres[:, 1])
+
+    # 🔹 Cada escuela tiene su propio nivel de exigencia
+    puntaje = np.clip(azar.normal(azar.uniform(600, 900), 200, size=n), 0, 1750).round(variante["decimales"])
+    ausente = azar.random(n) < TASA_AUSENTES
+    puntaje[ausente] = np.nan
+
+    # ✅ Ingresan los mejores puntajes; el mérito es su posición
+    orden = np.argsort(-np.nan_to_num(puntaje, nan=-1), kind="stable")
+    vacantes = min(max(1, int(round(n * TASA_INGRESO))), int((~ausente).sum()))
+    merito = np.full(n, np.nan)
+    merito[orden[:vacantes]] = np.arange(1, vacantes + 1)
+    observacion = np.full(n, "", dtype=object)
+    observacion[orden[:vacantes]] = variante["vacante"]
+    observacion[ausente] = "AUSENTE"
+
+    return pd.DataFrame({
+        variante["cabecera"][0]: azar.integers(100_000, 1_000_000, size=n),
+        variante["cabecera"][1]: nombre_completo,
+        variante["cabecera"][2]: escuela,
+        variante["cabecera"][3]: puntaje,
+        variante["cabecera"][4]: pd.array(merito, dtype="Int64"),
+        variante["cabecera"][5]: observacion,
+    })
+
+
+def generar_arbol(ruta_salida, escala=1, ruta_datos=None, semilla=42, fraccion_cp1252=FRACCION_CP1252):
+    """
+    Escribe un árbol sintético `escala` veces más grande que el real en `ruta_salida`.
+
+    Si ya existe uno generado con los mismos parámetros, se reutiliza.
+    Devuelve el total de filas generadas.
+    """
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_datos = ruta_datos or os.path.join(os.path.dirname(ruta_actual), "datos_admision")
+    parametros = {"escala": escala, "semilla": semilla, "fraccion_cp1252": fraccion_cp1252}
+
+    ruta_marca = os.path.join(ruta_salida, "generado.json")
+    if os.path.exists(ruta_marca):
+        with open(ruta_marca, encoding="utf-8") as f:
+            marca = json.load(f)
+        if marca["parametros"] == parametros:
+            print(f"♻️ Datos sintéticos x{escala} ya generados en: {ruta_salida}")
+            return marca["filas"]
+    shutil.rmtree(ruta_salida, ignore_errors=True)
+
+    azar = np.random.default_rng(semilla)
+    variantes = list(VARIANTES.values())
+    total = 0
+    print(f"🧪 Generando datos sintéticos x{escala} en: {ruta_salida}")
+    for i, (proceso, escuelas) in enumerate(estructura_real(ruta_datos).items()):
+        variante = VARIANTES.get(proceso, variantes[i % len(variantes)])
+        ruta_proceso = os.path.join(ruta_salida, proceso)
+        os.makedirs(ruta_proceso, exist_ok=True)
+
+        for escuela, filas in escuelas:
+            df = generar_escuela(azar, escuela, max(filas, 1) * escala, variante)
+            ruta_csv = os.path.join(ruta_proceso, escuela + ".csv")
+            formato_puntaje = f"%.{variante['decimales']}f"
+            if azar.random() < fraccion_cp1252:
+                df.to_csv(ruta_csv, index=False, sep=";", encoding="cp1252", errors="replace",
+                          float_format=formato_puntaje)
+            else:
+                df.to_csv(ruta_csv, index=False, encoding="utf-8-sig" if variante["bom"] else "utf-8",
+                          float_format=formato_puntaje)
+            total += len(df)
+        print(f"   • {proceso}: {len(escuelas)} archivos")
+
+    with open(ruta_marca, "w", encoding="utf-8") as f:
+        json.dump({"parametros": parametros, "filas": total}, f)
+    print(f"✅ {total} filas sintéticas generadas.")
+    return total
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un árbol datos_admision sintético para el benchmark.")
+    parser.add_argument("--escala", type=int, default=1, help="multiplicador de filas (1, 10, 100...)")
+    parser.add_argument("--salida", help="carpeta de salida (por defecto, resultados/benchmark/datos_x<escala>)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--fraccion-cp1252", type=float, default=FRACCION_CP1252,
+                        help="fracción de archivos en cp1252 separados por ';'")
+    args = parser.parse_args()
+
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    salida = args.salida or os.path.join(os.path.dirname(ruta_actual), "resultados", "benchmark", f"datos_x{args.escala}")
+    generar_arbol(salida, args.escala, semilla=args.semilla, fraccion_cp1252=args.fraccion_cp1252)
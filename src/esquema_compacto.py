@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from instrumentacion import registrar
+
+# ✅ Modo de esquema compacto (opcional, se activa con --compacto / --proyectar).
+#
+#    - Categóricas: ESCUELA PROFESIONAL, OBSERVACION y PROCESO tienen pocos valores
+#      distintos; como `category` ocupan un código por fila en lugar de un str de Python.
+#    - Numéricas: los enteros se reducen al tipo más chico que los contiene (CODIGO
+#      cabe en int32) y los float pasan a float32 solo si no cambia ningún valor
+#      (MERITOE.P sí; PUNTAJE y las variables escaladas se quedan en float64).
+#    - Proyección (--proyectar): se descartan columnas que ninguna etapa posterior
+#      usa (APELLIDOS Y NOMBRES) desde la carga, incluida la salida de predicción.
+#
+#    Cada etapa imprime la memoria de su salida antes y después, y la guarda en las
+#    métricas (paso "<etapa>.memoria") para seguir el ahorro a medida que crece el historial.
+
+CONFIG = {"compacto": False, "proyectar": False}
+
+COLUMNAS_CATEGORICAS = ["ESCUELA PROFESIONAL", "OBSERVACION", "PROCESO"]
+COLUMNAS_PROYECTABLES = ["APELLIDOS Y NOMBRES"]
+
+
+def configurar(compacto=None, proyectar=None):
+    if compacto is not None:
+        CONFIG["compacto"] = compacto
+    if proyectar is not None:
+        CONFIG["proyectar"] = proyectar
+
+
+def agregar_argumentos(parser):
+    """Agrega --compacto y --proyectar a la línea de comandos de un script."""
+    parser.add_argument("--compacto", action="store_true",
+                        help="categóricas y tipos numéricos reducidos en las tablas entre etapas")
+    parser.add_argument("--proyectar", action="store_true",
+                        help="descartar columnas que no usa ninguna etapa posterior (APELLIDOS Y NOMBRES)")
+
+
+def configurar_desde_args(args):
+    configurar(compacto=args.compacto, proyectar=args.proyectar)
+
+
+def memoria_columnas_mb(df):
+    return df.memory_usage(deep=True, index=False) / 1024 ** 2
+
+
+def reducir_numerica(serie):
+    """Tipo numérico más chico que conserva exactamente todos los valores."""
+    if pd.api.types.is_bool_dtype(serie) or not pd.api.types.is_numeric_dtype(serie):
+        return serie
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast="integer")
+    if pd.api.types.is_float_dtype(serie) and serie.dtype != np.float32:
+        reducida = serie.astype(np.float32)
+        # 🔹 NaN == NaN no se cumple: se comparan aparte
+        if np.array_equal(reducida.to_numpy(dtype="float64"), serie.to_numpy(), equal_nan=True):
+            return reducida
+    return serie
+
+
+def compactar(df, compacto=True, proyectar=False):
+    """Copia de `df` con el esquema compacto (y sin las columnas proyectables si `proyectar`)."""
+    if proyectar:
+        df = df.drop(columns=[c for c in COLUMNAS_PROYECTABLES if c in df.columns])
+    if not compacto:
+        return df
+    columnas = {}
+    for col in df.columns:
+        if col in COLUMNAS_CATEGORICAS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                columnas[col] = df[col].astype("category")
+        else:
+            serie = df[col]
+            reducida = reducir_numerica(serie)
+            if reducida is not serie:
+                columnas[col] = reducida
+    return df.assign(**columnas) if columnas else df
+
+
+def compactar_etapa(df, etapa):
+    """Aplica el modo configurado a la salida de `etapa` e imprime el reporte de memoria."""
+    if not (CONFIG["compacto"] or CONFIG["proyectar"]):
+        return df
+
+    antes = memoria_columnas_mb(df)
+    df = compactar(df, CONFIG["compacto"], CONFIG["proyectar"])
+    despues = memoria_columnas_mb(df).reindex(antes.index, fill_value=0.0)
+
+    total_antes, total_despues = antes.sum(), despues.sum()
+    ahorro = (1 - total_despues / total_antes) * 100 if total_antes else 0.0
+    print(f"🧮 Memoria de {etapa}: {total_antes:.1f} MB → {total_despues:.1f} MB ({ahorro:.0f}% menos)")
+    for col in antes.index:
+        if despues[col] != antes[col]:
+            destino = str(df[col].dtype) if col in df.columns else "descartada"
+            print(f"   • {col}: {antes[col]:.1f} → {despues[col]:.1f} MB ({destino})")
+
+    registrar(f"{etapa}.memoria", filas=len(df), antes_mb=round(total_antes, 3), despues_mb=round(total_despues, 3),
+              columnas={col: [round(antes[col], 3), round(despues[col], 3)] for col in antes.index})
+    return df
@@ -0,0 +1,118 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from almacenamiento import cargar_tabla
+
+# ✅ Historial de postulantes por CODIGO a lo largo de los procesos.
+#
+#    Una tabla de intentos (CODIGO, PROCESO, ESCUELA PROFESIONAL, PUNTAJE, OBSERVACION)
+#    ordenada por CODIGO y PROCESO, así los intentos de un postulante quedan
+#    contiguos y en orden. Un índice hash (pd.Index) lleva de CODIGO a su bloque:
+#    consultar un postulante no recorre la tabla ni hace merges.
+#
+#    `caracteristicas` calcula en una sola pasada vectorizada, para cualquier tabla
+#    con CODIGO y PROCESO:
+#      INTENTOS_PREVIOS      intentos del mismo CODIGO en procesos anteriores
+#      MEJOR_PUNTAJE_PREVIO  mejor PUNTAJE en esos intentos (NaN si no hay)
+#    No son variables del modelo (modelado.X_COLS): las consultas de predicción no
+#    siempre traen CODIGO.
+#
+#    transformacion.py lo guarda en `resultados/historial_postulantes.parquet`.
+
+NOMBRE_HISTORIAL = "historial_postulantes.parquet"
+COLUMNAS_INTENTO = ["CODIGO", "PROCESO", "ESCUELA PROFESIONAL", "PUNTAJE", "OBSERVACION"]
+CARACTERISTICAS = ["INTENTOS_PREVIOS", "MEJOR_PUNTAJE_PREVIO"]
+
+
+class HistorialPostulantes:
+
+    def __init__(self, intentos):
+        """`intentos` ya ordenado por CODIGO y PROCESO (ver `construir`)."""
+        self.intentos = intentos.reset_index(drop=True)
+        codigos = self.intentos["CODIGO"].to_numpy()
+        self.procesos = np.array(sorted(self.intentos["PROCESO"].astype(str).unique()), dtype=object)
+
+        # 🔹 Inicio de cada bloque de CODIGO y el índice hash CODIGO → bloque
+        cambios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]]) if len(codigos) else np.array([], int)
+        self.inicios = np.r_[cambios, len(codigos)]
+        self.indice = pd.Index(codigos[cambios])
+        bloque = np.repeat(np.arange(len(cambios)), np.diff(self.inicios))
+
+        # ✅ Clave ordenable (bloque, proceso): la tabla ya está ordenada por ella
+        self._base = len(self.procesos) + 1
+        self.claves = bloque * self._base + np.searchsorted(self.procesos, self.intentos["PROCESO"].astype(str))
+        # Mejor puntaje hasta cada intento (inclusive) dentro de su bloque
+        self.mejor_hasta = self.intentos["PUNTAJE"].groupby(bloque).cummax().to_numpy(dtype="float64")
+
+    @classmethod
+    def construir(cls, df):
+        intentos = df[COLUMNAS_INTENTO].copy()
+        intentos["PROCESO"] = intentos["PROCESO"].astype(str)
+        return cls(intentos.sort_values(["CODIGO", "PROCESO"], kind="stable"))
+
+    @classmethod
+    def cargar(cls, ruta_resultados):
+        ruta = os.path.join(ruta_resultados, NOMBRE_HISTORIAL)
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se encontró el historial: {ruta} (ejecuta transformacion.py).")
+        return cls(pd.read_parquet(ruta))
+
+    def guardar(self, ruta_resultados):
+        ruta = os.path.join(ruta_resultados, NOMBRE_HISTORIAL)
+        self.intentos.to_parquet(ruta, index=False)
+        return ruta
+
+    def intentos_de(self, codigo):
+        """Intentos de un postulante en orden de PROCESO (vacío si no figura)."""
+        posicion = self.indice.get_indexer([codigo])[0]
+        if posicion < 0:
+            return self.intentos.iloc[0:0]
+        return self.intentos.iloc[self.inicios[posicion]:self.inicios[posicion + 1]]
+
+    def caracteristicas(self, df):
+        """
+        INTENTOS_PREVIOS y MEJOR_PUNTAJE_PREVIO para cada fila (CODIGO, PROCESO) de `df`.
+
+        Solo cuentan los intentos del historial en procesos anteriores al de la fila,
+        así que sirve igual para filas del historial y para un proceso nuevo.
+        """
+        bloque = self.indice.get_indexer(df["CODIGO"])
+        conocido = bloque >= 0
+        proceso = np.searchsorted(self.procesos, df["PROCESO"].astype(str).to_numpy())
+
+        # ✅ Posición de la fila dentro de la tabla ordenada: lo anterior en su bloque son sus intentos previos
+        posicion = np.searchsorted(self.claves, np.where(conocido, bloque, 0) * self._base + proceso)
+        previos = np.where(conocido, posicion - self.inicios[np.where(conocido, bloque, 0)], 0)
+        mejor = np.full(len(df), np.nan)
+        con_previos = previos > 0
+        mejor[con_previos] = self.mejor_hasta[posicion[con_previos] - 1]
+
+        return pd.DataFrame({"INTENTOS_PREVIOS": previos.astype("int64"), "MEJOR_PUNTAJE_PREVIO": mejor},
+                            index=df.index)
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historial de intentos de un postulante por CODIGO.")
+    parser.add_argument("codigo", type=int, nargs="?", help="CODIGO a consultar")
+    parser.add_argument("--reconstruir", action="store_true", help="volver a armarlo desde datos_limpios")
+    args = parser.parse_args()
+
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = os.path.join(os.path.dirname(ruta_actual), "resultados")
+    if args.reconstruir or not os.path.exists(os.path.join(ruta_resultados, NOMBRE_HISTORIAL)):
+        historial = HistorialPostulantes.construir(cargar_tabla(ruta_resultados, "datos_limpios"))
+        print(f"💾 Historial guardado en: {historial.guardar(ruta_resultados)}")
+    else:
+        historial = HistorialPostulantes.cargar(ruta_resultados)
+
+    repetidos = int((np.diff(historial.inicios) > 1).sum())
+    print(f"🗂️ {len(historial.indice)} postulantes, {len(historial.intentos)} intentos "
+          f"({repetidos} con más de un intento).")
+    if args.codigo is not None:
+        intentos = historial.intentos_de(args.codigo)
+        if intentos.empty:
+            print(f"⚠️ El CODIGO {args.codigo} no figura en el historial.")
+        else:
+            print(intentos.to_string(index=False))
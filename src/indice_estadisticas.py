@@ -0,0 +1,196 @@
+import os
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from almacenamiento import cargar_tabla
+from almacen_modelos import AlmacenModelos
+
+# ✅ Índice precalculado de estadísticas por (ESCUELA PROFESIONAL, PROCESO).
+#    Una fila por escuela y proceso con:
+#      - postulantes, ingresantes y tasa de ingreso
+#      - puntaje real: mínimo, promedio, máximo, percentiles y último ingresante (corte)
+#      - puntaje predicho: lo mismo, con el modelo vigente
+#    Se guarda en `resultados/indice_estadisticas.parquet` y se consulta con un
+#    diccionario (O(1) por escuela y proceso).
+#
+#    Cada proceso se calcula solo con sus filas: al llegar un proceso nuevo se
+#    agrega su bloque sin recorrer el historial. Un proceso se recalcula si cambia
+#    su contenido (HUELLA: hash de sus filas) o la versión del modelo con que se predijo.
+
+NOMBRE_INDICE = "indice_estadisticas.parquet"
+PERCENTILES = [10, 25, 50, 75, 90]
+# Columnas de las que dependen las estadísticas y la predicción
+COLUMNAS_HUELLA = ["CODIGO", "ESCUELA PROFESIONAL", "PUNTAJE", "OBSERVACION"]
+
+
+def es_ingresante(observacion):
+    """Mismo criterio que resumir_por_escuela en prediccion.py."""
+    return (observacion.str.contains("ALCANZO", case=False, na=False) |
+            observacion.str.contains("VACANTE", case=False, na=False))
+
+
+def huella_proceso(df_proceso):
+    """
+    Hash del contenido de las filas de un proceso.
+
+    pd.util.hash_pandas_object da un hash por fila (igual para texto y categorías; los
+    números se llevan a 64 bits por si vienen reducidos por esquema_compacto); se
+    ordenan para que el orden de las filas no cuente.
+    """
+    columnas = df_proceso[COLUMNAS_HUELLA].astype({"CODIGO": "int64", "PUNTAJE": "float64"})
+    por_fila = pd.util.hash_pandas_object(columnas, index=False).to_numpy()
+    return hashlib.sha256(np.sort(por_fila).tobytes()).hexdigest()[:16]
+
+
+def describir(puntajes, grupos, prefijo):
+    """Mínimo, promedio, máximo y percentiles de `puntajes` por grupo."""
+    g = puntajes.groupby(grupos, observed=True)
+    tabla = pd.DataFrame({f"{prefijo}_MIN": g.min(), f"{prefijo}_PROMEDIO": g.mean(), f"{prefijo}_MAX": g.max()})
+    cuantiles = g.quantile([p / 100 for p in PERCENTILES]).unstack()
+    cuantiles.columns = [f"{prefijo}_P{p}" for p in PERCENTILES]
+    return tabla.join(cuantiles)
+
+
+def estadisticas_proceso(df_pred, proceso, version_modelo, huella):
+    """Filas del índice para un proceso ya puntuado (con PUNTAJE_PREDICTO)."""
+    escuelas = df_pred["ESCUELA PROFESIONAL"]
+    if isinstance(escuelas.dtype, pd.CategoricalDtype):
+        escuelas = escuelas.cat.remove_unused_categories()  # 🔹 value_counts cuenta también las categorías vacías
+    ingresa = es_ingresante(df_pred["OBSERVACION"])
+
+    tabla = pd.DataFrame({
+        "TOTAL_POSTULANTES": escuelas.value_counts(),
+        "INGRESANTES": escuelas[ingresa].value_counts(),
+    }).fillna({"INGRESANTES": 0}).astype("int64")
+    tabla["TASA_INGRESO"] = tabla["INGRESANTES"] / tabla["TOTAL_POSTULANTES"] * 100
+
+    tabla = tabla.join(describir(df_pred["PUNTAJE"], escuelas, "REAL"))
+    tabla["ULTIMO_INGRESANTE_REAL"] = df_pred.loc[ingresa, "PUNTAJE"].groupby(escuelas[ingresa], observed=True).min()
+    tabla = tabla.join(describir(df_pred["PUNTAJE_PREDICTO"], escuelas, "PREDICHO"))
+    tabla["ULTIMO_INGRESANTE_PREDICHO"] = df_pred.loc[ingresa, "PUNTAJE_PREDICTO"].groupby(escuelas[ingresa], observed=True).min()
+
+    tabla.index.name = "ESCUELA PROFESIONAL"
+    tabla = tabla.reset_index()
+    tabla.insert(1, "PROCESO", proceso)
+    tabla["VERSION_MODELO"] = version_modelo
+    tabla["HUELLA"] = huella
+    return tabla
+
+
+class IndiceEstadisticas:
+
+    def __init__(self, ruta_resultados):
+        self.ruta = os.path.join(ruta_resultados, NOMBRE_INDICE)
+        if os.path.exists(self.ruta):
+            self.tabla = pd.read_parquet(self.ruta)
+            # 🔹 Las categorías vuelven a texto: el índice en memoria se arma con str
+            for col in ["ESCUELA PROFESIONAL", "PROCESO", "VERSION_MODELO", "HUELLA"]:
+                if col in self.tabla:
+                    self.tabla[col] = self.tabla[col].astype(str)
+        else:
+            self.tabla = pd.DataFrame()
+        self._indexar()
+
+    def _indexar(self):
+        self._filas = {}
+        self._ultimo = {}
+        if self.tabla.empty:
+            return
+        for fila in self.tabla.to_dict("records"):
+            clave = (fila["ESCUELA PROFESIONAL"], fila["PROCESO"])
+            self._filas[clave] = fila
+            if fila["PROCESO"] > self._ultimo.get(fila["ESCUELA PROFESIONAL"], ""):
+                self._ultimo[fila["ESCUELA PROFESIONAL"]] = fila["PROCESO"]
+
+    def consultar(self, escuela, proceso=None):
+        """Estadísticas de una escuela en un proceso (por defecto, el último en que aparece)."""
+        proceso = proceso or self._ultimo.get(escuela)
+        return self._filas.get((escuela, proceso))
+
+    def procesos(self):
+        return sorted(self.tabla["PROCESO"].unique()) if not self.tabla.empty else []
+
+    def reemplazar_proceso(self, filas):
+        """Inserta (o reemplaza) el bloque de un proceso."""
+        if not self.tabla.empty:
+            self.tabla = self.tabla[~self.tabla["PROCESO"].isin(filas["PROCESO"].unique())]
+        self.tabla = pd.concat([self.tabla, filas], ignore_index=True) if not self.tabla.empty else filas
+        self.tabla = self.tabla.sort_values(["PROCESO", "ESCUELA PROFESIONAL"], ignore_index=True)
+        self.tabla = self.tabla.astype({"TOTAL_POSTULANTES": "int64", "INGRESANTES": "int64"})
+        self._indexar()
+
+    def desactualizados(self, huellas, version_modelo):
+        """Procesos sin bloque, con otro contenido o predichos con otro modelo."""
+        # 🔹 Un índice guardado antes de existir HUELLA se recalcula entero
+        if self.tabla.empty or "HUELLA" not in self.tabla:
+            return sorted(huellas)
+        guardado = self.tabla.groupby("PROCESO").agg(
+            huella=("HUELLA", "first"), version=("VERSION_MODELO", "first"))
+        return sorted(
+            p for p, h in huellas.items()
+            if p not in guardado.index or guardado.at[p, "huella"] != h or guardado.at[p, "version"] != version_modelo
+        )
+
+    def actualizar(self, df, modelo, X_cols, transformadores, version_modelo, forzar=False):
+        """Calcula solo los procesos nuevos o cambiados de `df` (datos limpios) y guarda."""
+        from prediccion import puntuar_lote
+        from agregados_escuela import cargar_promedios
+
+        huellas = {str(p): huella_proceso(g) for p, g in df.groupby("PROCESO", observed=True)}
+        pendientes = sorted(huellas) if forzar else self.desactualizados(huellas, version_modelo)
+        promedios = cargar_promedios(os.path.dirname(self.ruta)) if pendientes else None
+        for proceso in pendientes:
+            # ✅ Cada proceso se puntúa solo, igual que el último proceso en prediccion.py
+            df_pred = puntuar_lote(df[df["PROCESO"] == proceso], modelo, X_cols, transformadores,
+                                   promedios=promedios)
+            self.reemplazar_proceso(estadisticas_proceso(df_pred, proceso, version_modelo, huellas[proceso]))
+        if pendientes:
+            self.guardar()
+        return pendientes
+
+    def guardar(self):
+        compacta = self.tabla.astype({"ESCUELA PROFESIONAL": "category", "PROCESO": "category",
+                                      "VERSION_MODELO": "category", "HUELLA": "category"})
+        compacta.to_parquet(self.ruta, index=False)
+
+
+def version_modelo_actual(ruta_resultados):
+    return AlmacenModelos(ruta_resultados).version_actual() or "modelo_final.pkl"
+
+
+def actualizar_indice(forzar=False, ruta_resultados=None):
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = ruta_resultados or os.path.join(os.path.dirname(ruta_actual), "resultados")
+    from prediccion import cargar_artefactos
+
+    modelo, X_cols, transformadores = cargar_artefactos(ruta_resultados)
+    df = cargar_tabla(ruta_resultados, "datos_limpios")
+    indice = IndiceEstadisticas(ruta_resultados)
+    actualizados = indice.actualizar(df, modelo, X_cols, transformadores,
+                                     version_modelo_actual(ruta_resultados), forzar)
+
+    if actualizados:
+        print(f"🗂️ Índice actualizado para: {', '.join(actualizados)}")
+    else:
+        print("♻️ Índice de estadísticas al día.")
+    print(f"💾 {len(indice.tabla)} filas (escuela × proceso) en: {indice.ruta}")
+    return indice
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de estadísticas por escuela y proceso.")
+    parser.add_argument("--reconstruir", action="store_true", help="recalcular todos los procesos")
+    parser.add_argument("--escuela", help="consultar una escuela después de actualizar")
+    parser.add_argument("--proceso", help="proceso a consultar (por defecto, el último de la escuela)")
+    args = parser.parse_args()
+
+    indice = actualizar_indice(forzar=args.reconstruir)
+    if args.escuela:
+        fila = indice.consultar(args.escuela.strip().upper(), args.proceso)
+        if fila is None:
+            print(f"⚠️ Sin estadísticas para {args.escuela} ({args.proceso or 'último proceso'}).")
+        else:
+            for clave, valor in fila.items():
+                print(f"   • {clave}: {valor}")
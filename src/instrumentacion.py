@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import functools
+import contextlib
+import tracemalloc
+
+try:
+    import resource  # 🔸 solo existe en Unix
+except ImportError:
+    resource = None
+
+# ✅ Métricas estructuradas por etapa y por paso.
+#
+#    with medir("limpiar.normalizar_texto") as m:
+#        ...
+#        m["filas"] = len(df)
+#
+#    Cada bloque agrega una línea JSON a `resultados/metricas/metricas.jsonl` con
+#    tiempo real, CPU, RSS actual y pico, filas y (si se activa) el pico de
+#    tracemalloc del bloque. `@instrumentar("etapa")` hace lo mismo con una función
+#    completa y, con el perfilado activo, guarda un volcado de cProfile por etapa
+#    en `resultados/metricas/perfiles/` (se lee con `python -m pstats archivo.prof`).
+#
+#    Los prints con emoji se mantienen: esto es para medir, no para reemplazarlos.
+#    El RSS sale de /proc y `resource` (Unix); en Windows, de psutil si está instalado
+#    y, si no, queda en null: la medición de memoria nunca impide correr una etapa.
+
+_ruta_actual = os.path.dirname(os.path.abspath(__file__))
+RUTA_METRICAS = os.path.join(os.path.dirname(_ruta_actual), "resultados", "metricas")
+
+CONFIG = {
+    "archivo": os.path.join(RUTA_METRICAS, "metricas.jsonl"),
+    "perfiles": os.path.join(RUTA_METRICAS, "perfiles"),
+    "activo": True,
+    "tracemalloc": False,
+    "perfil": False,
+    "corrida": time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}",
+}
+
+# Pila de bloques abiertos: permite anidar pasos sin perder el pico de tracemalloc del padre
+_PILA = []
+
+
+def configurar(archivo=None, activo=None, con_tracemalloc=None, perfil=None):
+    """Cambia dónde y qué se mide (los valores None se dejan como están)."""
+    if archivo is not None:
+        CONFIG["archivo"] = archivo
+        CONFIG["perfiles"] = os.path.join(os.path.dirname(archivo), "perfiles")
+    if activo is not None:
+        CONFIG["activo"] = activo
+    if con_tracemalloc is not None:
+        CONFIG["tracemalloc"] = con_tracemalloc
+        if con_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    if perfil is not None:
+        CONFIG["perfil"] = perfil
+
+
+def agregar_argumentos(parser):
+    """Agrega --perfil y --tracemalloc a la línea de comandos de un script."""
+    parser.add_argument("--perfil", action="store_true",
+                        help="guardar un volcado de cProfile por etapa en resultados/metricas/perfiles/")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="medir el pico de memoria de Python por paso (agrega sobrecosto)")
+
+
+def configurar_desde_args(args):
+    configurar(con_tracemalloc=args.tracemalloc, perfil=args.perfil)
+
+
+def memoria_psutil():
+    """memory_info() de psutil, si está instalado (opcional: es la vía en Windows)."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info()
+
+
+def pico_rss_mb():
+    """Pico de RSS del proceso en MB (None si la plataforma no lo informa)."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024  # bytes en macOS, KB en Linux
+    info = memoria_psutil()
+    return getattr(info, "peak_wset", None) and info.peak_wset / 1024 ** 2  # Windows: pico del working set
+
+
+def memoria_rss_mb():
+    """(RSS actual, pico de RSS del proceso) en MB; None donde no se puede medir."""
+    try:
+        with open("/proc/self/statm") as f:
+            actual = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        info = memoria_psutil()
+        actual = info.rss / 1024 ** 2 if info is not None else None
+    return actual, pico_rss_mb()
+
+
+def escribir_registro(registro):
+    os.makedirs(os.path.dirname(CONFIG["archivo"]), exist_ok=True)
+    # 🔹 Una sola escritura por línea: varios procesos pueden agregar al mismo archivo
+    with open(CONFIG["archivo"], "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+
+def registrar(nombre, **datos):
+    """Agrega un registro sin medir un bloque (ej: tiempos ya sumados por otro lado)."""
+    if CONFIG["activo"]:
+        escribir_registro({
+            "corrida": CONFIG["corrida"],
+            "paso": nombre,
+            "padre": _PILA[-1]["nombre"] if _PILA else None,
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "pid": os.getpid(),
+            **datos,
+        })
+
+
+@contextlib.contextmanager
+def medir(nombre, **extra):
+    """Mide un bloque; lo que se guarde en el dict devuelto (ej: "filas") va al registro."""
+    if not CONFIG["activo"]:
+        yield dict(extra)
+        return
+
+    datos = dict(extra)
+    con_traza = CONFIG["tracemalloc"] and tracemalloc.is_tracing()
+    if con_traza:
+        # ✅ El pico acumulado hasta ahora pertenece al bloque padre: se lo guardamos antes de reiniciar
+        if _PILA:
+            _PILA[-1]["pico"] = max(_PILA[-1]["pico"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    marco = {"nombre": nombre, "pico": 0}
+    _PILA.append(marco)
+
+    inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+    estado = "ok"
+    try:
+        yield datos
+    except BaseException:
+        estado = "error"
+        raise
+    finally:
+        tiempo = time.perf_counter() - inicio_real
+        cpu = time.process_time() - inicio_cpu
+        _PILA.pop()
+        pico_traza = None
+        if con_traza:
+            pico_traza = max(marco["pico"], tracemalloc.get_traced_memory()[1])
+            if _PILA:
+                _PILA[-1]["pico"] = max(_PILA[-1]["pico"], pico_traza)
+            pico_traza /= 1024 ** 2
+        rss, pico_rss = memoria_rss_mb()
+
+        escribir_registro({
+            "corrida": CONFIG["corrida"],
+            "paso": nombre,
+            "padre": _PILA[-1]["nombre"] if _PILA else None,
+            "estado": estado,
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "pid": os.getpid(),
+            "tiempo_s": round(tiempo, 6),
+            "cpu_s": round(cpu, 6),
+            "rss_mb": rss,
+            "pico_rss_mb": pico_rss,
+            "pico_tracemalloc_mb": pico_traza,
+            **datos,
+        })
+
+
+def contar_filas(resultado):
+    """Filas del resultado de una etapa: DataFrame, o el primero de una tupla."""
+    if isinstance(resultado, tuple) and resultado:
+        resultado = resultado[0]
+    return len(resultado) if hasattr(resultado, "__len__") else None
+
+
+def instrumentar(etapa):
+    """Decorador: mide la función completa como una etapa (y la perfila si está activo)."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(etapa) as m:
+                if CONFIG["perfil"]:
+                    perfil = cProfile.Profile()
+                    resultado = perfil.runcall(funcion, *args, **kwargs)
+                    os.makedirs(CONFIG["perfiles"], exist_ok=True)
+                    ruta = os.path.join(CONFIG["perfiles"], f"{etapa}-{CONFIG['corrida']}.prof")
+                    perfil.dump_stats(ruta)
+                    m["perfil"] = ruta
+                else:
+                    resultado = funcion(*args, **kwargs)
+                m["filas"] = contar_filas(resultado)
+            return resultado
+        return envoltura
+    return decorador
+
+
+def resumen_corrida(corrida=None, archivo=None):
+    """Tabla de la última corrida (o de `corrida`) leída del archivo de métricas."""
+    import pandas as pd
+    df = pd.read_json(archivo or CONFIG["archivo"], lines=True, dtype={"corrida": str})
+    corrida = corrida or df["corrida"].iloc[-1]
+    columnas = ["paso", "padre", "filas", "tiempo_s", "cpu_s", "rss_mb", "pico_rss_mb", "pico_tracemalloc_mb"]
+    return df.loc[df["corrida"] == corrida, [c for c in columnas if c in df.columns]]
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Muestra las métricas registradas de una corrida.")
+    parser.add_argument("--corrida", help="identificador de la corrida (por defecto, la última)")
+    parser.add_argument("--archivo", help="archivo de métricas (por defecto, resultados/metricas/metricas.jsonl)")
+    args = parser.parse_args()
+
+    print(resumen_corrida(args.corrida, args.archivo).to_string(index=False))
@@ -1,69 +1,140 @@
 import pandas as pd
+import numpy as np
 import os
+import json
+import argparse
 from unidecode import unidecode
+import instrumentacion
+from instrumentacion import medir, instrumentar
+from almacenamiento import cargar_tabla, guardar_tabla, FORMATO_POR_DEFECTO, FORMATOS
+import esquema_compacto
+
+
+# ---------- NORMALIZACIÓN DE TEXTO ----------
+def normalizar_texto(serie):
+    """
+    Versión vectorizada de la limpieza de texto:
+      - nulo o vacío             -> "SIN OBSERVACION"
+      - MAYÚSCULAS, sin espacios extremos y sin tildes (unidecode)
+      - contiene ALCANZO/VACANTE -> "ALCANZO VACANTE"
+      - contiene NO INGRESO      -> "NO ALCANZO VACANTE"
+      - contiene EXONER          -> "EXONERADO"
+    """
+    serie = pd.Series(serie, dtype=object)
+    nulos = serie.isna().to_numpy()
+    txt = serie.astype(str).str.strip().str.upper()
+
+    # unidecode solo hace falta en los textos con caracteres no ASCII
+    no_ascii = txt.str.contains(r"[^\x00-\x7f]", regex=True).to_numpy()
+    if no_ascii.any():
+        txt[no_ascii] = txt[no_ascii].map(unidecode)
+
+    # 🔍 Unificar las observaciones relacionadas con ingreso o vacante
+    #    (el orden replica las reglas originales: "NO ALCANZO" cae en "ALCANZO VACANTE")
+    condiciones = [
+        nulos | (txt == "").to_numpy(),
+        txt.str.contains("ALCANZO|VACANTE", regex=True).to_numpy(),
+        txt.str.contains("NO INGRESO", regex=False).to_numpy(),
+        txt.str.contains("EXONER", regex=False).to_numpy(),
+    ]
+    valores = ["SIN OBSERVACION", "ALCANZO VACANTE", "NO ALCANZO VACANTE", "EXONERADO"]
+    return pd.Series(np.select(condiciones, valores, default=txt.to_numpy()),
+                     index=serie.index, dtype=object)
+
+
+def normalizar_por_unicos(serie, memo):
+    """Normaliza solo los valores distintos de `serie` y los vuelve a mapear a cada fila."""
+    codigos, unicos = pd.factorize(serie)
+    unicos = [str(u) for u in unicos]  # la clave del memo es el texto original
+
+    pendientes = [u for u in unicos if u not in memo]
+    if pendientes:
+        memo.update(zip(pendientes, normalizar_texto(pd.Series(pendientes, dtype=object))))
+
+    normalizados = np.array([memo[u] for u in unicos] + ["SIN OBSERVACION"], dtype=object)
+    # factorize marca los nulos con -1, que apunta al último elemento ("SIN OBSERVACION")
+    return pd.Series(normalizados[codigos], index=serie.index, dtype=object)
+
+
+# 🔸 Subir este número si cambian las reglas de normalizar_texto (invalida el memo guardado)
+VERSION_MEMO_TEXTO = 1
+
+
+def cargar_memo_texto(ruta_memo):
+    """Memo texto original → normalizado; vacío si no existe o es de otra versión de las reglas."""
+    if os.path.exists(ruta_memo):
+        with open(ruta_memo, encoding="utf-8") as f:
+            contenido = json.load(f)
+        if contenido.get("version") == VERSION_MEMO_TEXTO:
+            return contenido.get("textos", {})
+    return {}
+
+
+def guardar_memo_texto(ruta_memo, memo):
+    os.makedirs(os.path.dirname(ruta_memo), exist_ok=True)
+    with open(ruta_memo, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION_MEMO_TEXTO, "textos": memo}, f, ensure_ascii=False)
+
+
+def limpiar_particion(df, memo):
+    """
+    Aplica las reglas de limpieza a un DataFrame unificado (completo o de un solo PROCESO).
+
+    Las filas con PUNTAJE no numérico o fuera de rango y los duplicados (CODIGO, PROCESO)
+    ya no llegan aquí: los rechaza la validación de esquema al cargar (validacion_esquema.py)
+    y quedan en `resultados/cuarentena.csv` con su motivo.
+    """
+    # ---------- 2. LIMPIEZA Y NORMALIZACIÓN DE TEXTO ----------
+    # ✅ Escuela y observación tienen pocos valores distintos: se normalizan solo
+    #    los valores únicos (con memo entre columnas y ejecuciones). Los nombres
+    #    son texto libre y van por la ruta vectorizada directa.
+    columnas_texto = ["ESCUELA PROFESIONAL", "OBSERVACION", "APELLIDOS Y NOMBRES"]
+    columnas_categoricas = ["ESCUELA PROFESIONAL", "OBSERVACION"]
+    for col in columnas_texto:
+        if col in df.columns:
+            with medir(f"limpiar.texto.{col}", filas=len(df)):
+                if col in columnas_categoricas:
+                    df[col] = normalizar_por_unicos(df[col], memo)
+                else:
+                    df[col] = normalizar_texto(df[col])
+        elif col not in esquema_compacto.COLUMNAS_PROYECTABLES:  # las proyectables se descartan a propósito
+            df[col] = "SIN OBSERVACION"  # 🔹 evita errores si alguna columna faltara
+
+    # ---------- 3. NORMALIZAR NOMBRES DE COLUMNAS ----------
+    df.columns = [unidecode(c.strip().upper()) for c in df.columns]
+
+    return df
 
 
-def limpiar_datos():
+@instrumentar("limpiar")
+def limpiar_datos(formato=FORMATO_POR_DEFECTO, df=None, ruta_resultados=None):
+    """
+    Limpia el archivo unificado.
+
+    df: DataFrame unificado ya en memoria (si es None se lee de `resultados/`).
+    ruta_resultados: carpeta de entrada y salida (por defecto, `resultados/`).
+    """
     # ---------- 1. RUTAS DEL PROYECTO ----------
     ruta_actual = os.path.dirname(os.path.abspath(__file__))
     ruta_raiz = os.path.dirname(ruta_actual)
-    ruta_resultados = os.path.join(ruta_raiz, "resultados")
-    ruta_entrada = os.path.join(ruta_resultados, "datos_unificados.csv")
-    ruta_salida = os.path.join(ruta_resultados, "datos_limpios.csv")
-
-    if not os.path.exists(ruta_entrada):
-        raise FileNotFoundError(f"No se encontró el archivo unificado: {ruta_entrada}")
+    ruta_resultados = ruta_resultados or os.path.join(ruta_raiz, "resultados")
+    ruta_memo = os.path.join(ruta_resultados, "cache_texto.json")
 
-    print(f"📂 Cargando archivo: {ruta_entrada}")
-    df = pd.read_csv(ruta_entrada, encoding="utf-8-sig")
+    if df is None:
+        print(f"📂 Cargando archivo unificado desde: {ruta_resultados}")
+        with medir("limpiar.leer_entrada") as m:
+            df = cargar_tabla(ruta_resultados, "datos_unificados")
+            m["filas"] = len(df)
 
     print(f"Registros iniciales: {len(df)}")
     print(f"Columnas detectadas: {list(df.columns)}")
 
-    # ---------- 2. ELIMINAR DUPLICADOS ----------
-    # ✅ Conserva el primer registro por combinación de CODIGO y PROCESO
-    df = df.drop_duplicates(subset=["CODIGO", "PROCESO"], keep="first")
-
-    # ---------- 3. CONVERTIR PUNTAJE A NUMÉRICO ----------
-    # ✅ Reemplaza caracteres erróneos y convierte
-    df["PUNTAJE"] = pd.to_numeric(df["PUNTAJE"], errors="coerce")
-    df = df.dropna(subset=["PUNTAJE"])  # elimina registros sin puntaje válido
-
-    # ---------- 4. VERIFICAR RANGO VÁLIDO ----------
-    # ✅ Mantén solo valores dentro del rango oficial (0–2000)
-    df = df[(df["PUNTAJE"] >= 0) & (df["PUNTAJE"] <= 2000)]
-
-    # ---------- 5. LIMPIEZA Y NORMALIZACIÓN DE TEXTO ----------
-    def limpiar_texto(txt):
-        if pd.isna(txt) or str(txt).strip() == "":
-            return "SIN OBSERVACION"
-
-        txt = unidecode(str(txt).strip().upper())
-        txt = txt.replace("Ã", "A").replace("Â", "")
-
-        # 🔍 Unificar las observaciones relacionadas con ingreso o vacante
-        if "ALCANZO" in txt or "ALCANZO VACANTE" in txt or "VACANTE" in txt:
-            return "ALCANZO VACANTE"
-        elif "NO ALCANZO" in txt or "NO INGRESO" in txt:
-            return "NO ALCANZO VACANTE"
-        elif "EXONER" in txt:
-            return "EXONERADO"
-        else:
-            return txt
+    # ---------- 2 y 3. LIMPIEZA ----------
+    memo = cargar_memo_texto(ruta_memo)
+    df = limpiar_particion(df, memo)
+    guardar_memo_texto(ruta_memo, memo)
 
-
-    # ✅ Aplica la limpieza a las columnas textuales principales
-    columnas_texto = ["ESCUELA PROFESIONAL", "OBSERVACION", "APELLIDOS Y NOMBRES"]
-    for col in columnas_texto:
-        if col in df.columns:
-            df[col] = df[col].apply(limpiar_texto)
-        else:
-            df[col] = "SIN OBSERVACION"  # 🔹 evita errores si alguna columna faltara
-
-    # ---------- 6. NORMALIZAR NOMBRES DE COLUMNAS ----------
-    df.columns = [unidecode(c.strip().upper()) for c in df.columns]
-
-    # ---------- 7. VALIDACIÓN FINAL ----------
+    # ---------- 4. VALIDACIÓN FINAL ----------
     # 🔹 Revisa si existen valores nulos en columnas críticas
     columnas_clave = ["CODIGO", "ESCUELA PROFESIONAL", "PUNTAJE"]
     nulos = df[columnas_clave].isnull().sum()
@@ -71,21 +142,41 @@ def limpiar_datos():
         print("\n⚠️  Advertencia: se detectaron valores nulos en columnas clave:")
         print(nulos[nulos > 0])
 
-    # ---------- 8. GUARDAR ARCHIVO LIMPIO ----------
+    # ---------- 5. GUARDAR ARCHIVO LIMPIO ----------
+    df = esquema_compacto.compactar_etapa(df, "limpiar")
     print(f"\n✅ Registros finales limpios: {len(df)}")
     print(f"Columnas finales: {list(df.columns)}")
 
-    os.makedirs(ruta_resultados, exist_ok=True)
-    df.to_csv(ruta_salida, index=False, encoding="utf-8-sig")
-
-    print(f"💾 Archivo limpio guardado en: {ruta_salida}")
+    with medir("limpiar.guardar", filas=len(df)):
+        rutas_salida = guardar_tabla(df, ruta_resultados, "datos_limpios", formato)
+    for ruta_salida in rutas_salida:
+        print(f"💾 Archivo limpio guardado en: {ruta_salida}")
 
     return df
 
 
+# ---------- LÍNEA DE COMANDOS ----------
+def agregar_argumentos(parser):
+    """--formato de datos_limpios, más instrumentación y esquema compacto."""
+    parser.add_argument("--formato", choices=FORMATOS, default=FORMATO_POR_DEFECTO,
+                        help="formato de salida de datos_limpios")
+    instrumentacion.agregar_argumentos(parser)
+    esquema_compacto.agregar_argumentos(parser)
+
+
+def configurar_desde_args(args):
+    instrumentacion.configurar_desde_args(args)
+    esquema_compacto.configurar_desde_args(args)
+
+
 # ---------- EJECUCIÓN DIRECTA ----------
 if __name__ == "__main__":
-    df_limpio = limpiar_datos()
+    parser = argparse.ArgumentParser(description="Limpia el archivo unificado.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    df_limpio = limpiar_datos(formato=args.formato)
     print("\nVista previa:")
     print(df_limpio.head())
 
@@ -1,75 +1,175 @@
 import pandas as pd
 import os
+import time
+import shutil
+import argparse
 import joblib
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error, r2_score
-
-
-def modelar_datos():
+from threadpoolctl import threadpool_limits
+from concurrent.futures import ProcessPoolExecutor
+from almacenamiento import cargar_tabla
+from almacen_modelos import AlmacenModelos
+import instrumentacion
+from instrumentacion import medir, instrumentar
+
+
+# ---------- MODELOS CANDIDATOS ----------
+MODELOS = ["Regresión Lineal", "Random Forest", "XGBoost"]
+
+MENSAJES = {
+    "Regresión Lineal": "\n🤖 Entrenando modelo: Regresión Lineal...",
+    "Random Forest": "🌲 Entrenando modelo: Random Forest...",
+    "XGBoost": "⚡ Entrenando modelo: XGBoost...",
+}
+
+COLUMNAS_PREDICCION = {"Regresión Lineal": "PRED_LR", "Random Forest": "PRED_RF", "XGBoost": "PRED_XGB"}
+
+# 🔹 Variables del modelo: la búsqueda, el backtesting y el reentrenamiento importan estas mismas
+# ⚠️ Eliminamos "PUNTAJE_NORM" porque fue removido del pipeline anterior
+X_COLS = ["ESCUELA_COD", "OBSERVACION_COD", "PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
+Y_COL = "PUNTAJE"
+
+
+def crear_modelo(nombre, n_jobs=None, params=None):
+    """
+    Crea el estimador `nombre` usando como máximo `n_jobs` hilos.
+
+    params: hiperparámetros que reemplazan a los valores por defecto (ver busqueda_hiperparametros.py).
+    Cada librería se importa recién acá: importar este módulo (ej: por MODELOS) no carga
+    sklearn.ensemble ni xgboost.
+    """
+    params = params or {}
+    if nombre == "Regresión Lineal":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression(**params)
+    if nombre == "Random Forest":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(**{"n_estimators": 200, "random_state": 42, "n_jobs": n_jobs, **params})
+    if nombre == "XGBoost":
+        from xgboost import XGBRegressor
+        return XGBRegressor(**{
+            "n_estimators": 300,
+            "learning_rate": 0.05,  # 🔸 más estable
+            "max_depth": 6,
+            "random_state": 42,
+            "verbosity": 0,
+            "n_jobs": n_jobs,
+            **params
+        })
+    raise ValueError(f"Modelo desconocido: {nombre}")
+
+
+def entrenar_modelo(nombre, X_train, y_train, X_test, y_test, n_jobs=None, ruta_modelo=None):
+    """
+    Entrena y evalúa un modelo midiendo tiempo real y tiempo de CPU del ajuste.
+
+    Si se indica `ruta_modelo`, el modelo se guarda ahí y no se devuelve (útil en
+    un proceso aparte: evita enviar un bosque de cientos de MB entre procesos).
+    """
+    print(MENSAJES[nombre])
+    with threadpool_limits(limits=n_jobs):
+        modelo = crear_modelo(nombre, n_jobs)
+        with medir(f"modelar.fit.{nombre}", filas=len(X_train), hilos=n_jobs):
+            inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+            modelo.fit(X_train, y_train)
+            tiempo_real = time.perf_counter() - inicio_real
+            tiempo_cpu = time.process_time() - inicio_cpu
+        with medir(f"modelar.predict.{nombre}", filas=len(X_test)):
+            pred = modelo.predict(X_test)
+
+    r2 = r2_score(y_test, pred)
+    rmse = np.sqrt(mean_squared_error(y_test, pred))
+    print(f"   ⏱️ {nombre}: {tiempo_real:.1f} s reales, {tiempo_cpu:.1f} s de CPU")
+
+    if ruta_modelo:
+        joblib.dump(modelo, ruta_modelo)
+        modelo = None
+
+    return {"Modelo": nombre, "R2": r2, "RMSE": rmse,
+            "TIEMPO_ENTRENAMIENTO_S": tiempo_real, "CPU_ENTRENAMIENTO_S": tiempo_cpu,
+            "pred": pred, "modelo": modelo}
+
+
+def repartir_cpus(n_cpus, modelos):
+    """
+    Reparte el presupuesto de CPU entre modelos que se entrenan a la vez.
+
+    La regresión lineal usa 1 hilo; el resto se divide entre los modelos de
+    ensamble, con al menos 1 hilo cada uno. El total nunca pasa de `n_cpus`,
+    así que el presupuesto debe alcanzar para un hilo por modelo.
+    """
+    if n_cpus < len(modelos):
+        raise ValueError(f"Presupuesto de {n_cpus} CPU insuficiente para {len(modelos)} modelos a la vez.")
+    hilos = {m: 1 for m in modelos}
+    ensambles = [m for m in modelos if m != "Regresión Lineal"]
+    disponibles = n_cpus - (len(modelos) - len(ensambles))
+    for i, m in enumerate(ensambles):
+        hilos[m] = max(1, disponibles // len(ensambles) + (1 if i < disponibles % len(ensambles) else 0))
+    return hilos
+
+
+@instrumentar("modelar")
+def modelar_datos(train_df=None, test_df=None, paralelo=False, n_cpus=None, ruta_resultados=None):
+    """
+    Entrena y compara los modelos candidatos y guarda el mejor.
+
+    train_df, test_df: conjuntos ya en memoria (si son None se leen de `resultados/`).
+    paralelo:          entrena los modelos a la vez, cada uno en su propio proceso.
+    n_cpus:            presupuesto total de CPU (por defecto, todos los núcleos).
+                       En modo secuencial cada modelo usa el presupuesto completo;
+                       en paralelo se reparte para no sobresuscribir la máquina
+                       (con menos CPU que modelos, se entrena en secuencia).
+    ruta_resultados:   carpeta de entrada y salida (por defecto, `resultados/`).
+    """
     # ---------- 1. RUTAS DEL PROYECTO ----------
     ruta_actual = os.path.dirname(os.path.abspath(__file__))
     ruta_raiz = os.path.dirname(ruta_actual)
-    ruta_resultados = os.path.join(ruta_raiz, "resultados")
-    ruta_train = os.path.join(ruta_resultados, "train.csv")
-    ruta_test = os.path.join(ruta_resultados, "test.csv")
+    ruta_resultados = ruta_resultados or os.path.join(ruta_raiz, "resultados")
 
     # ---------- 2. CARGA DE DATOS ----------
-    print("📂 Cargando conjuntos de datos de entrenamiento y prueba...")
-    train_df = pd.read_csv(ruta_train, encoding="utf-8-sig")
-    test_df = pd.read_csv(ruta_test, encoding="utf-8-sig")
+    if train_df is None or test_df is None:
+        print("📂 Cargando conjuntos de datos de entrenamiento y prueba...")
+        train_df = cargar_tabla(ruta_resultados, "train")
+        test_df = cargar_tabla(ruta_resultados, "test")
 
     print(f"Entrenamiento: {len(train_df)} registros")
     print(f"Prueba: {len(test_df)} registros")
 
     # ---------- 3. SELECCIÓN DE VARIABLES ----------
-    # ⚠️ Eliminamos "PUNTAJE_NORM" porque fue removido del pipeline anterior
-    X_cols = ["ESCUELA_COD", "OBSERVACION_COD", "PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
-    y_col = "PUNTAJE"
+    X_cols, y_col = X_COLS, Y_COL
 
     X_train, y_train = train_df[X_cols], train_df[y_col]
     X_test, y_test = test_df[X_cols], test_df[y_col]
 
-    resultados = []
+    n_cpus = n_cpus or os.cpu_count() or 1
 
     # ---------- 4. ENTRENAMIENTO DE MODELOS ----------
-    # 4.1 Regresión Lineal
-    print("\n🤖 Entrenando modelo: Regresión Lineal...")
-    modelo_lr = LinearRegression()
-    modelo_lr.fit(X_train, y_train)
-    pred_lr = modelo_lr.predict(X_test)
-    r2_lr = r2_score(y_test, pred_lr)
-    rmse_lr = np.sqrt(mean_squared_error(y_test, pred_lr))
-    resultados.append(["Regresión Lineal", r2_lr, rmse_lr])
-
-    # 4.2 Random Forest
-    print("🌲 Entrenando modelo: Random Forest...")
-    modelo_rf = RandomForestRegressor(n_estimators=200, random_state=42)
-    modelo_rf.fit(X_train, y_train)
-    pred_rf = modelo_rf.predict(X_test)
-    r2_rf = r2_score(y_test, pred_rf)
-    rmse_rf = np.sqrt(mean_squared_error(y_test, pred_rf))
-    resultados.append(["Random Forest", r2_rf, rmse_rf])
-
-    # 4.3 XGBoost
-    print("⚡ Entrenando modelo: XGBoost...")
-    modelo_xgb = XGBRegressor(
-        n_estimators=300,
-        learning_rate=0.05,  # 🔸 más estable
-        max_depth=6,
-        random_state=42,
-        verbosity=0
-    )
-    modelo_xgb.fit(X_train, y_train)
-    pred_xgb = modelo_xgb.predict(X_test)
-    r2_xgb = r2_score(y_test, pred_xgb)
-    rmse_xgb = np.sqrt(mean_squared_error(y_test, pred_xgb))
-    resultados.append(["XGBoost", r2_xgb, rmse_xgb])
+    if paralelo and n_cpus < len(MODELOS):
+        # ⚠️ Con menos CPU que modelos, entrenarlos a la vez pasaría el presupuesto
+        print(f"⚠️ {n_cpus} CPU no alcanzan para {len(MODELOS)} modelos en paralelo: se entrenan uno tras otro.")
+        paralelo = False
+    if paralelo:
+        hilos = repartir_cpus(n_cpus, MODELOS)
+        print(f"\n⚡ Entrenando {len(MODELOS)} modelos en paralelo con {n_cpus} CPU: "
+              + ", ".join(f"{m}={h}" for m, h in hilos.items()))
+        ruta_candidatos = os.path.join(ruta_resultados, "candidatos")
+        os.makedirs(ruta_candidatos, exist_ok=True)
+        rutas_candidatos = {m: os.path.join(ruta_candidatos, f"{COLUMNAS_PREDICCION[m]}.pkl") for m in MODELOS}
+
+        with ProcessPoolExecutor(max_workers=len(MODELOS)) as pool:
+            futuros = {
+                m: pool.submit(entrenar_modelo, m, X_train, y_train, X_test, y_test,
+                               hilos[m], rutas_candidatos[m])
+                for m in MODELOS
+            }
+            entrenados = {m: f.result() for m, f in futuros.items()}
+    else:
+        entrenados = {m: entrenar_modelo(m, X_train, y_train, X_test, y_test, n_cpus) for m in MODELOS}
 
     # ---------- 5. COMPARACIÓN DE RESULTADOS ----------
-    df_resultados = pd.DataFrame(resultados, columns=["Modelo", "R2", "RMSE"])
+    columnas_resultados = ["Modelo", "R2", "RMSE", "TIEMPO_ENTRENAMIENTO_S", "CPU_ENTRENAMIENTO_S"]
+    df_resultados = pd.DataFrame([{c: entrenados[m][c] for c in columnas_resultados} for m in MODELOS])
     ruta_resultados_csv = os.path.join(ruta_resultados, "resultados_modelos.csv")
     df_resultados.to_csv(ruta_resultados_csv, index=False, encoding="utf-8-sig")
 
@@ -78,12 +178,9 @@ def modelar_datos():
     print(f"💾 Resultados exportados en: {ruta_resultados_csv}")
 
     # ---------- 6. GUARDAR PREDICCIONES ----------
-    predicciones = pd.DataFrame({
-        "REAL": y_test,
-        "PRED_LR": pred_lr,
-        "PRED_RF": pred_rf,
-        "PRED_XGB": pred_xgb
-    })
+    predicciones = pd.DataFrame({"REAL": y_test})
+    for m in MODELOS:
+        predicciones[COLUMNAS_PREDICCION[m]] = entrenados[m]["pred"]
     ruta_predicciones_csv = os.path.join(ruta_resultados, "predicciones_modelos.csv")
     predicciones.to_csv(ruta_predicciones_csv, index=False, encoding="utf-8-sig")
     print(f"💾 Predicciones exportadas en: {ruta_predicciones_csv}")
@@ -92,15 +189,15 @@ def modelar_datos():
     mejor_modelo = df_resultados.loc[df_resultados["R2"].idxmax(), "Modelo"]
     print(f"\n🏆 Mejor modelo: {mejor_modelo}")
 
-    if mejor_modelo == "Regresión Lineal":
-        modelo_final = modelo_lr
-    elif mejor_modelo == "Random Forest":
-        modelo_final = modelo_rf
-    else:
-        modelo_final = modelo_xgb
-
     ruta_modelo = os.path.join(ruta_resultados, "modelo_final.pkl")
-    joblib.dump(modelo_final, ruta_modelo)
+    if paralelo:
+        # ✅ El ganador ya está serializado por su proceso: basta con moverlo
+        os.replace(rutas_candidatos[mejor_modelo], ruta_modelo)
+        shutil.rmtree(ruta_candidatos, ignore_errors=True)
+        modelo_final = joblib.load(ruta_modelo)
+    else:
+        modelo_final = entrenados[mejor_modelo]["modelo"]
+        joblib.dump(modelo_final, ruta_modelo)
     ruta_columnas = os.path.join(ruta_resultados, "columnas_entrenamiento.pkl")
     joblib.dump(X_cols, ruta_columnas)
     print(f"📄 Columnas de entrenamiento guardadas en: {ruta_columnas}")
@@ -108,10 +205,36 @@ def modelar_datos():
 
     print(f"💾 Modelo guardado en: {ruta_modelo}")
 
-    # ---------- 8. RETORNAR RESULTADOS ----------
+    # ---------- 8. PUBLICAR EN EL ALMACÉN VERSIONADO ----------
+    # 🔹 Modelo, columnas, transformadores y métricas quedan juntos en una versión
+    transformadores = joblib.load(os.path.join(ruta_resultados, "transformadores.pkl"))
+    metricas = df_resultados.set_index("Modelo").loc[mejor_modelo, ["R2", "RMSE"]].to_dict()
+    version = AlmacenModelos(ruta_resultados).publicar(modelo_final, mejor_modelo, X_cols, transformadores, metricas)
+    print(f"📦 Versión publicada en el almacén de modelos: {version}")
+
+    # ---------- 9. RETORNAR RESULTADOS ----------
     return df_resultados
 
 
+# ---------- LÍNEA DE COMANDOS ----------
+def agregar_argumentos(parser):
+    """--paralelo y --cpus, más las opciones de instrumentación."""
+    parser.add_argument("--paralelo", action="store_true",
+                        help="entrenar los modelos a la vez repartiendo el presupuesto de CPU")
+    parser.add_argument("--cpus", type=int, default=None,
+                        help="presupuesto total de CPU (por defecto, todos los núcleos)")
+    instrumentacion.agregar_argumentos(parser)
+
+
+def configurar_desde_args(args):
+    instrumentacion.configurar_desde_args(args)
+
+
 # ---------- EJECUCIÓN DIRECTA ----------
 if __name__ == "__main__":
-    modelar_datos()
+    parser = argparse.ArgumentParser(description="Entrena y compara los modelos candidatos.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    modelar_datos(paralelo=args.paralelo, n_cpus=args.cpus)
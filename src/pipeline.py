@@ -0,0 +1,287 @@
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import pandas as pd
+
+# ✅ Ejecuta las etapas del proyecto como un DAG:
+#
+#    cargar ──► limpiar ──► transformar ──► modelar
+#                  │              │             │
+#                  └──────────────┴─────────────┴──► predecir
+#
+#    Los DataFrames pasan en memoria de una etapa a la siguiente. Cada etapa tiene
+#    una huella (hash) de su código, sus parámetros y las huellas de sus entradas;
+#    si la huella ya está en `resultados/cache_pipeline/` la etapa no se ejecuta y
+#    sus salidas se cargan (solo si alguna etapa posterior las necesita).
+
+ORDEN = ["cargar", "limpiar", "transformar", "modelar", "predecir"]
+
+# 🔹 Parámetros que no cambian el resultado (no entran en la huella)
+PARAMETROS_SIN_EFECTO = {"n_workers", "incremental", "paralelo", "n_cpus"}
+
+# 🔹 Cuántas versiones guardar por etapa en la caché
+VERSIONES_EN_CACHE = 3
+
+
+def ejecutar_cargar(entradas, params):
+    from cargar_datos import cargar_datos
+    df = cargar_datos(**params)
+    return {"datos_unificados": df}
+
+
+def ejecutar_limpiar(entradas, params):
+    from limpieza_datos import limpiar_datos
+    df = limpiar_datos(df=entradas["cargar"]["datos_unificados"], **params)
+    return {"datos_limpios": df}
+
+
+def ejecutar_transformar(entradas, params):
+    from transformacion import transformar_datos
+    df, train_df, test_df = transformar_datos(df=entradas["limpiar"]["datos_limpios"], **params)
+    return {"datos_transformados": df, "train": train_df, "test": test_df}
+
+
+def ejecutar_modelar(entradas, params):
+    from modelado import modelar_datos
+    salidas = entradas["transformar"]
+    df_resultados = modelar_datos(train_df=salidas["train"], test_df=salidas["test"], **params)
+    return {"resultados_modelos": df_resultados}
+
+
+def ejecutar_predecir(entradas, params):
+    from prediccion import predecir_resultados
+    resumen = predecir_resultados(df=entradas["limpiar"]["datos_limpios"], **params)
+    return {"prediccion_por_escuela": resumen}
+
+
+# Para cada etapa:
+#   modulos:    archivos de código cuya modificación invalida la caché
+#   entradas:   etapas de las que depende
+#   usa_datos:  etapas cuyas salidas en memoria necesita (el resto solo aporta artefactos)
+#   artefactos: archivos que la etapa deja en `resultados/` y que se restauran desde la caché
+ETAPAS = {
+    "cargar": dict(
+        funcion=ejecutar_cargar,
+        modulos=["cargar_datos.py", "almacenamiento.py", "esquema_compacto.py", "reglas_ingesta.py",
+                 "validacion_esquema.py"],
+        entradas=[],
+        usa_datos=[],
+        artefactos=["cuarentena.csv", "cuarentena_resumen.csv"],
+    ),
+    "limpiar": dict(
+        funcion=ejecutar_limpiar,
+        modulos=["limpieza_datos.py", "almacenamiento.py", "esquema_compacto.py"],
+        entradas=["cargar"],
+        usa_datos=["cargar"],
+        artefactos=[],
+    ),
+    "transformar": dict(
+        funcion=ejecutar_transformar,
+        modulos=["transformacion.py", "almacenamiento.py", "agregados_escuela.py", "esquema_compacto.py",
+                 "historial_postulantes.py"],
+        entradas=["limpiar"],
+        usa_datos=["limpiar"],
+        artefactos=["transformadores.pkl", "agregados_escuela.json", "historial_postulantes.parquet"],
+    ),
+    "modelar": dict(
+        funcion=ejecutar_modelar,
+        modulos=["modelado.py", "almacenamiento.py", "almacen_modelos.py"],
+        entradas=["transformar"],
+        usa_datos=["transformar"],
+        # 🔹 modelos/ no se copia: AlmacenModelos.podar no borra las versiones que apuntan
+        #    los modelo_actual.json guardados acá
+        artefactos=["modelo_final.pkl", "columnas_entrenamiento.pkl", "modelo_actual.json",
+                    "resultados_modelos.csv", "predicciones_modelos.csv"],
+    ),
+    "predecir": dict(
+        funcion=ejecutar_predecir,
+        modulos=["prediccion.py", "almacenamiento.py", "almacen_modelos.py", "indice_estadisticas.py",
+                 "agregados_escuela.py", "esquema_compacto.py"],
+        entradas=["limpiar", "transformar", "modelar"],
+        usa_datos=["limpiar"],
+        artefactos=["predicciones_detalladas_2026II.csv", "prediccion_por_escuela_2026II.csv"],
+    ),
+}
+
+
+# ---------- HUELLAS ----------
+def hash_archivos(rutas):
+    """SHA-256 conjunto del contenido de varios archivos (en el orden dado)."""
+    h = hashlib.sha256()
+    for ruta in rutas:
+        h.update(os.path.basename(ruta).encode("utf-8"))
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+    return h.hexdigest()
+
+
+def huella_datos_fuente(ruta_datos):
+    """Huella del contenido de todos los CSV de `datos_admision/`."""
+    h = hashlib.sha256()
+    for carpeta in sorted(os.listdir(ruta_datos)):
+        ruta_carpeta = os.path.join(ruta_datos, carpeta)
+        if not os.path.isdir(ruta_carpeta):
+            continue
+        for archivo in sorted(os.listdir(ruta_carpeta)):
+            if archivo.lower().endswith(".csv"):
+                h.update(f"{carpeta}/{archivo}".encode("utf-8"))
+                h.update(hash_archivos([os.path.join(ruta_carpeta, archivo)]).encode("ascii"))
+    return h.hexdigest()
+
+
+def huella_etapa(nombre, params, huellas_entradas, ruta_src, huella_fuente=None):
+    from esquema_compacto import CONFIG as esquema
+    etapa = ETAPAS[nombre]
+    contenido = {
+        "etapa": nombre,
+        "codigo": hash_archivos([os.path.join(ruta_src, m) for m in etapa["modulos"]]),
+        "parametros": {k: v for k, v in sorted(params.items()) if k not in PARAMETROS_SIN_EFECTO},
+        "entradas": {e: huellas_entradas[e] for e in etapa["entradas"]},
+        "fuente": huella_fuente,
+        "esquema": esquema,  # 🔹 --compacto / --proyectar cambian los tipos y columnas de las salidas
+    }
+    return hashlib.sha256(json.dumps(contenido, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+# ---------- CACHÉ ----------
+def guardar_en_cache(ruta_cache, nombre, huella, salidas, ruta_resultados):
+    destino = os.path.join(ruta_cache, nombre, huella)
+    os.makedirs(destino, exist_ok=True)
+
+    for clave, df in salidas.items():
+        df.to_parquet(os.path.join(destino, clave + ".parquet"), index=False)
+    for artefacto in ETAPAS[nombre]["artefactos"]:
+        origen = os.path.join(ruta_resultados, artefacto)
+        if os.path.exists(origen):
+            shutil.copy2(origen, os.path.join(destino, artefacto))
+
+    with open(os.path.join(destino, "salidas.json"), "w", encoding="utf-8") as f:
+        json.dump(sorted(salidas), f)
+
+    # ✅ Conservar solo las versiones más recientes de la etapa
+    carpeta_etapa = os.path.join(ruta_cache, nombre)
+    versiones = sorted(
+        (os.path.join(carpeta_etapa, v) for v in os.listdir(carpeta_etapa)),
+        key=os.path.getmtime, reverse=True,
+    )
+    for vieja in versiones[VERSIONES_EN_CACHE:]:
+        shutil.rmtree(vieja, ignore_errors=True)
+
+
+def en_cache(ruta_cache, nombre, huella):
+    return os.path.exists(os.path.join(ruta_cache, nombre, huella, "salidas.json"))
+
+
+def restaurar_artefactos(ruta_cache, nombre, huella, ruta_resultados):
+    """Copia a `resultados/` los artefactos de la versión en caché."""
+    origen = os.path.join(ruta_cache, nombre, huella)
+    for artefacto in ETAPAS[nombre]["artefactos"]:
+        ruta = os.path.join(origen, artefacto)
+        if os.path.exists(ruta):
+            shutil.copy2(ruta, os.path.join(ruta_resultados, artefacto))
+
+
+def cargar_de_cache(ruta_cache, nombre, huella):
+    origen = os.path.join(ruta_cache, nombre, huella)
+    with open(os.path.join(origen, "salidas.json"), encoding="utf-8") as f:
+        claves = json.load(f)
+    return {c: pd.read_parquet(os.path.join(origen, c + ".parquet")) for c in claves}
+
+
+# ---------- EJECUCIÓN ----------
+def ejecutar_pipeline(desde=None, hasta=None, usar_cache=True, parametros=None):
+    """
+    Ejecuta el pipeline completo o un tramo.
+
+    desde:      vuelve a ejecutar esta etapa y las siguientes sin mirar la caché.
+    hasta:      última etapa a ejecutar.
+    usar_cache: si es False se ejecutan todas las etapas necesarias.
+    parametros: {etapa: {parámetro: valor}} que se pasan a cada función.
+    """
+    ruta_src = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_src)
+    ruta_resultados = os.path.join(ruta_raiz, "resultados")
+    ruta_cache = os.path.join(ruta_resultados, "cache_pipeline")
+    parametros = parametros or {}
+
+    i_desde = ORDEN.index(desde) if desde else 0
+    i_hasta = ORDEN.index(hasta) if hasta else len(ORDEN) - 1
+    etapas = ORDEN[:i_hasta + 1]
+
+    # ---------- 1. HUELLAS ----------
+    huella_fuente = huella_datos_fuente(os.path.join(ruta_raiz, "datos_admision"))
+    huellas = {}
+    for nombre in etapas:
+        huellas[nombre] = huella_etapa(
+            nombre, parametros.get(nombre, {}), huellas, ruta_src,
+            huella_fuente if nombre == "cargar" else None,
+        )
+
+    # ---------- 2. QUÉ ETAPAS SE EJECUTAN ----------
+    ejecutar = {}
+    for i, nombre in enumerate(etapas):
+        forzada = i >= i_desde and desde is not None
+        ejecutar[nombre] = forzada or not usar_cache or not en_cache(ruta_cache, nombre, huellas[nombre])
+
+    # 🔹 Una etapa en caché solo se carga en memoria si otra que sí se ejecuta la necesita
+    necesita_datos = {e for n in etapas if ejecutar[n] for e in ETAPAS[n]["usa_datos"]}
+
+    # ---------- 3. EJECUCIÓN EN ORDEN ----------
+    salidas = {}
+    resumen = []
+    for nombre in etapas:
+        if not ejecutar[nombre]:
+            print(f"♻️ [{nombre}] sin cambios (huella {huellas[nombre]}), se usa la caché.")
+            restaurar_artefactos(ruta_cache, nombre, huellas[nombre], ruta_resultados)
+            if nombre in necesita_datos:
+                salidas[nombre] = cargar_de_cache(ruta_cache, nombre, huellas[nombre])
+            resumen.append((nombre, "caché", huellas[nombre]))
+            continue
+
+        print(f"\n▶️ [{nombre}] ejecutando (huella {huellas[nombre]})...")
+        salidas[nombre] = ETAPAS[nombre]["funcion"](salidas, parametros.get(nombre, {}))
+        guardar_en_cache(ruta_cache, nombre, huellas[nombre], salidas[nombre], ruta_resultados)
+        resumen.append((nombre, "ejecutada", huellas[nombre]))
+
+    print("\n📋 Resumen del pipeline:")
+    for nombre, estado, huella in resumen:
+        print(f"   • {nombre:<12} {estado:<10} {huella}")
+
+    return salidas
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    from almacenamiento import FORMATO_POR_DEFECTO, FORMATOS
+    from instrumentacion import agregar_argumentos, configurar_desde_args
+    import esquema_compacto
+
+    parser = argparse.ArgumentParser(description="Ejecuta el pipeline de admisión con caché por etapa.")
+    parser.add_argument("--from", dest="desde", choices=ORDEN,
+                        help="volver a ejecutar desde esta etapa (ignora su caché y la de las siguientes)")
+    parser.add_argument("--until", dest="hasta", choices=ORDEN,
+                        help="detenerse después de esta etapa")
+    parser.add_argument("--sin-cache", action="store_true", help="ejecutar todas las etapas")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para la carga de archivos (0 = todos los núcleos)")
+    parser.add_argument("--formato", choices=FORMATOS, default=FORMATO_POR_DEFECTO,
+                        help="formato de las tablas intermedias en resultados/")
+    agregar_argumentos(parser)
+    esquema_compacto.agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+    esquema_compacto.configurar_desde_args(args)
+
+    ejecutar_pipeline(
+        desde=args.desde,
+        hasta=args.hasta,
+        usar_cache=not args.sin_cache,
+        parametros={
+            "cargar": {"n_workers": args.workers, "formato": args.formato},
+            "limpiar": {"formato": args.formato},
+            "transformar": {"formato": args.formato},
+        },
+    )
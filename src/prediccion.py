@@ -1,74 +1,129 @@
 import pandas as pd
 import os
+import argparse
 import joblib
 import numpy as np
+from almacenamiento import cargar_tabla
+from almacen_modelos import AlmacenModelos
+from agregados_escuela import cargar_promedios
+import esquema_compacto
+from indice_estadisticas import IndiceEstadisticas, estadisticas_proceso, huella_proceso, version_modelo_actual
+import instrumentacion
+from instrumentacion import medir, instrumentar
 
-def predecir_resultados():
-    # ---------- 1. RUTAS ----------
-    ruta_actual = os.path.dirname(os.path.abspath(__file__))
-    ruta_raiz = os.path.dirname(ruta_actual)
-    ruta_resultados = os.path.join(ruta_raiz, "resultados")
+
+# Tamaño por defecto de cada lote de `model.predict` en la puntuación por lotes
+TAM_LOTE = 50_000
+
+
+# ---------- CODIFICACIÓN VECTORIZADA ----------
+def codificar_columna(serie, encoder):
+    """
+    Codifica toda la columna en una sola pasada con las clases del LabelEncoder.
+
+    Equivale a `encoder.transform([x])[0]` fila por fila, pero las categorías
+    no vistas en el entrenamiento (o nulas) reciben -1 en lugar de un error.
+    """
+    return pd.Index(encoder.classes_).get_indexer(serie)
+
+
+def cargar_artefactos(ruta_resultados):
+    """
+    Devuelve (modelo, X_cols, transformadores).
+
+    Usa la versión actual del almacén de modelos (formato nativo, carga rápida);
+    si el almacén está vacío, los .pkl sueltos de modelado y transformacion.
+    """
+    almacen = AlmacenModelos(ruta_resultados)
+    if almacen.version_actual() is not None:
+        version = almacen.cargar()
+        return version.modelo, version.columnas, version.transformadores
 
     ruta_modelo = os.path.join(ruta_resultados, "modelo_final.pkl")
     ruta_columnas = os.path.join(ruta_resultados, "columnas_entrenamiento.pkl")
-    ruta_datos = os.path.join(ruta_resultados, "datos_limpios.csv")
     ruta_transformadores = os.path.join(ruta_resultados, "transformadores.pkl")
 
-    # ---------- 2. VALIDACIONES ----------
-    for ruta in [ruta_modelo, ruta_columnas, ruta_datos, ruta_transformadores]:
+    for ruta in [ruta_modelo, ruta_columnas, ruta_transformadores]:
         if not os.path.exists(ruta):
             raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
 
-    # ---------- 3. CARGA DE MODELO Y TRANSFORMADORES ----------
-    modelo = joblib.load(ruta_modelo)
-    X_cols = joblib.load(ruta_columnas)
-    transformadores = joblib.load(ruta_transformadores)
-
-    le_escuela = transformadores["le_escuela"]
-    le_obs = transformadores["le_obs"]
-    scaler = transformadores["scaler"]
+    return joblib.load(ruta_modelo), joblib.load(ruta_columnas), joblib.load(ruta_transformadores)
 
-    print(f"📦 Modelo y transformadores cargados correctamente.")
 
-    # ---------- 4. CARGA DE DATOS ----------
-    df = pd.read_csv(ruta_datos, encoding="utf-8-sig")
-    procesos = sorted(df["PROCESO"].unique())
-    proceso_base = procesos[-1]  # Ejemplo: 2026-I
-    df_pred = df[df["PROCESO"] == proceso_base].copy()
-    print(f"🔍 Usando datos del proceso {proceso_base} como base para predecir 2026-II.")
+def preparar_caracteristicas(df, transformadores, promedios):
+    """
+    Agrega a una copia de `df` las columnas que usa el modelo (codificadas y escaladas).
 
-    # ---------- 5. TRANSFORMACIONES ----------
-    print("🔢 Aplicando codificadores...")
-    df_pred["ESCUELA_COD"] = df_pred["ESCUELA PROFESIONAL"].map(
-        lambda x: le_escuela.transform([x])[0] if x in le_escuela.classes_ else -1
-    )
-    df_pred["OBSERVACION_COD"] = df_pred["OBSERVACION"].map(
-        lambda x: le_obs.transform([x])[0] if x in le_obs.classes_ else -1
-    )
+    promedios: Serie escuela → promedio histórico (agregados_escuela.py), el mismo
+    PROMEDIO_ESCUELA con que se entrenó. Las escuelas que no figuran usan el
+    promedio de sus filas dentro de `df`.
+    """
+    df = df.copy()
+    df["ESCUELA_COD"] = codificar_columna(df["ESCUELA PROFESIONAL"], transformadores["le_escuela"])
+    df["OBSERVACION_COD"] = codificar_columna(df["OBSERVACION"], transformadores["le_obs"])
 
-    print("🧮 Calculando variables derivadas...")
-    df_pred["PROMEDIO_ESCUELA"] = df_pred.groupby("ESCUELA PROFESIONAL")["PUNTAJE"].transform("mean")
-    df_pred["DIFERENCIA_PROMEDIO"] = df_pred["PUNTAJE"] - df_pred["PROMEDIO_ESCUELA"]
+    df["PROMEDIO_ESCUELA"] = df["ESCUELA PROFESIONAL"].map(promedios).astype("float64")
+    sin_historial = df["PROMEDIO_ESCUELA"].isna()
+    if sin_historial.any():
+        df.loc[sin_historial, "PROMEDIO_ESCUELA"] = (
+            df[sin_historial].groupby("ESCUELA PROFESIONAL", observed=True)["PUNTAJE"].transform("mean"))
+    df["DIFERENCIA_PROMEDIO"] = df["PUNTAJE"] - df["PROMEDIO_ESCUELA"]
 
     # Escalar igual que en entrenamiento
     columnas_a_normalizar = ["PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
-    df_pred[columnas_a_normalizar] = scaler.transform(df_pred[columnas_a_normalizar])
-
-    # ---------- 6. PREDICCIÓN ----------
-    X_pred = df_pred[X_cols]
-    print("🤖 Realizando predicciones...")
-    df_pred["PUNTAJE_PREDICTO"] = modelo.predict(X_pred)
-    df_pred["PUNTAJE_PREDICTO"] = np.clip(df_pred["PUNTAJE_PREDICTO"], 0, 2000)
-
-    # ---------- 7. RESUMEN POR ESCUELA (solo ingresantes) ----------
-    print("📊 Calculando estadísticas solo para alumnos que consiguieron vacante...")
-
+    df[columnas_a_normalizar] = transformadores["scaler"].transform(df[columnas_a_normalizar])
+    return df
+
+
+def puntuar_lote(df, modelo=None, X_cols=None, transformadores=None, tam_lote=TAM_LOTE, promedios=None):
+    """
+    Puntúa cualquier DataFrame de postulantes (no solo el último PROCESO).
+
+    Necesita las columnas de datos_limpios (ESCUELA PROFESIONAL, OBSERVACION, PUNTAJE).
+    Las variables se calculan sobre todo `df` y `model.predict` se llama por lotes
+    de `tam_lote` filas, para acotar la memoria con lotes grandes.
+    promedios: promedio histórico por escuela (por defecto, el de `resultados/agregados_escuela.json`).
+    Devuelve una copia de `df` con las variables del modelo y PUNTAJE_PREDICTO.
+    """
+    ruta_resultados = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
+    if modelo is None or X_cols is None or transformadores is None:
+        modelo, X_cols, transformadores = cargar_artefactos(ruta_resultados)
+    if promedios is None:
+        promedios = cargar_promedios(ruta_resultados)
+
+    df = preparar_caracteristicas(df, transformadores, promedios)
+    X = df[X_cols]
+
+    predicciones = np.empty(len(df), dtype="float64")
+    for inicio in range(0, len(df), tam_lote):
+        fin = inicio + tam_lote
+        predicciones[inicio:fin] = modelo.predict(X.iloc[inicio:fin])
+
+    df["PUNTAJE_PREDICTO"] = np.clip(predicciones, 0, 2000)
+    return df
+
+
+def puntuar_archivo(ruta_entrada, ruta_salida=None, tam_lote=TAM_LOTE):
+    """Puntúa un CSV o Parquet de postulantes y guarda el CSV resultante (por defecto, <entrada>_puntuado.csv)."""
+    if ruta_entrada.endswith(".parquet"):
+        df_entrada = pd.read_parquet(ruta_entrada)
+    else:
+        df_entrada = pd.read_csv(ruta_entrada, encoding="utf-8-sig")
+    df_salida = puntuar_lote(df_entrada, tam_lote=tam_lote)
+    ruta_salida = ruta_salida or os.path.splitext(ruta_entrada)[0] + "_puntuado.csv"
+    df_salida.to_csv(ruta_salida, index=False, encoding="utf-8-sig")
+    print(f"💾 {len(df_salida)} postulantes puntuados en: {ruta_salida}")
+    return ruta_salida
+
+
+def resumir_por_escuela(df_pred):
+    """Mínimo, promedio y máximo predicho de los ingresantes, vacantes y tasa de ingreso por escuela."""
     # Filtramos únicamente los que fueron admitidos según la columna OBSERVACION
     df_ingresantes = df_pred[df_pred["OBSERVACION"].str.contains("ALCANZO", case=False, na=False) |
                             df_pred["OBSERVACION"].str.contains("VACANTE", case=False, na=False)].copy()
 
     # Agrupar por escuela profesional y calcular estadísticas solo de ingresantes
-    resumen = df_ingresantes.groupby("ESCUELA PROFESIONAL").agg(
+    resumen = df_ingresantes.groupby("ESCUELA PROFESIONAL", observed=True).agg(
         MINIMO_PREDICHO=("PUNTAJE_PREDICTO", "min"),
         PROMEDIO_PREDICHO=("PUNTAJE_PREDICTO", "mean"),
         MAXIMO_PREDICHO=("PUNTAJE_PREDICTO", "max"),
@@ -76,7 +131,7 @@ def predecir_resultados():
     ).reset_index()
 
     # Calcular el total de postulantes (de todos) para luego obtener tasa
-    totales = df_pred.groupby("ESCUELA PROFESIONAL")["OBSERVACION"].count().reset_index(name="TOTAL_POSTULANTES")
+    totales = df_pred.groupby("ESCUELA PROFESIONAL", observed=True)["OBSERVACION"].count().reset_index(name="TOTAL_POSTULANTES")
 
     # Unir ambos dataframes
     resumen = resumen.merge(totales, on="ESCUELA PROFESIONAL", how="left")
@@ -84,21 +139,98 @@ def predecir_resultados():
     # Calcular tasa de ingreso estimada (%)
     resumen["TASA_INGRESO_ESTIMADA"] = (resumen["VACANTES_ESTIMADAS"] / resumen["TOTAL_POSTULANTES"]) * 100
 
+    return resumen
+
+
+@instrumentar("predecir")
+def predecir_resultados(df=None, ruta_resultados=None):
+    """
+    Predice los puntajes de 2026-II a partir del último proceso disponible.
+
+    df: datos limpios ya en memoria (si es None se leen de `resultados/`).
+    ruta_resultados: carpeta de entrada y salida (por defecto, `resultados/`).
+    """
+    # ---------- 1. RUTAS ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_actual)
+    ruta_resultados = ruta_resultados or os.path.join(ruta_raiz, "resultados")
+
+    # ---------- 2 y 3. VALIDACIONES Y CARGA DE MODELO Y TRANSFORMADORES ----------
+    with medir("predecir.cargar_artefactos"):
+        modelo, X_cols, transformadores = cargar_artefactos(ruta_resultados)
+        promedios = cargar_promedios(ruta_resultados)
+
+    print(f"📦 Modelo y transformadores cargados correctamente.")
+
+    # ---------- 4. CARGA DE DATOS ----------
+    if df is None:
+        df = cargar_tabla(ruta_resultados, "datos_limpios")
+    procesos = sorted(df["PROCESO"].unique())
+    proceso_base = procesos[-1]  # Ejemplo: 2026-I
+    df_pred = df[df["PROCESO"] == proceso_base]
+    huella = huella_proceso(df_pred)  # 🔹 contenido del proceso, para el índice de estadísticas
+    print(f"🔍 Usando datos del proceso {proceso_base} como base para predecir 2026-II.")
+
+    # ---------- 5 y 6. TRANSFORMACIONES Y PREDICCIÓN ----------
+    print("🔢 Aplicando codificadores y calculando variables derivadas...")
+    print("🤖 Realizando predicciones...")
+    with medir("predecir.puntuar", filas=len(df_pred)):
+        df_pred = puntuar_lote(df_pred, modelo, X_cols, transformadores, promedios=promedios)
+
+    # ---------- 7. RESUMEN POR ESCUELA (solo ingresantes) ----------
+    print("📊 Calculando estadísticas solo para alumnos que consiguieron vacante...")
+    with medir("predecir.resumir", filas=len(df_pred)):
+        resumen = resumir_por_escuela(df_pred)
 
     # ---------- 8. GUARDAR RESULTADOS ----------
+    df_pred = esquema_compacto.compactar_etapa(df_pred, "predecir")
     ruta_pred_detalle = os.path.join(ruta_resultados, "predicciones_detalladas_2026II.csv")
     ruta_pred_resumen = os.path.join(ruta_resultados, "prediccion_por_escuela_2026II.csv")
 
-    df_pred.to_csv(ruta_pred_detalle, index=False, encoding="utf-8-sig")
-    resumen.to_csv(ruta_pred_resumen, index=False, encoding="utf-8-sig")
+    with medir("predecir.guardar", filas=len(df_pred)):
+        df_pred.to_csv(ruta_pred_detalle, index=False, encoding="utf-8-sig")
+        resumen.to_csv(ruta_pred_resumen, index=False, encoding="utf-8-sig")
+
+    # ✅ El proceso recién puntuado se guarda en el índice de estadísticas sin volver a predecir
+    with medir("predecir.indice", filas=len(df_pred)):
+        indice = IndiceEstadisticas(ruta_resultados)
+        indice.reemplazar_proceso(estadisticas_proceso(df_pred, proceso_base, version_modelo_actual(ruta_resultados),
+                                                       huella))
+        indice.guardar()
 
     print(f"💾 Resultados guardados:")
     print(f"   • {ruta_pred_detalle}")
     print(f"   • {ruta_pred_resumen}")
+    print(f"   • {indice.ruta} (proceso {proceso_base})")
     print("✅ Proceso de predicción completado correctamente.")
 
     return resumen
 
 
+# ---------- LÍNEA DE COMANDOS ----------
+def agregar_argumentos(parser):
+    """--entrada/--salida/--tam-lote para puntuar un archivo, más instrumentación y esquema compacto."""
+    parser.add_argument("--entrada", help="CSV o Parquet de postulantes a puntuar por lotes "
+                                          "(si se omite, se predice 2026-II desde el último proceso)")
+    parser.add_argument("--salida", help="archivo CSV de salida para --entrada")
+    parser.add_argument("--tam-lote", type=int, default=TAM_LOTE, help="filas por llamada a predict")
+    instrumentacion.agregar_argumentos(parser)
+    esquema_compacto.agregar_argumentos(parser)
+
+
+def configurar_desde_args(args):
+    instrumentacion.configurar_desde_args(args)
+    esquema_compacto.configurar_desde_args(args)
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
 if __name__ == "__main__":
-    predecir_resultados()
+    parser = argparse.ArgumentParser(description="Predice puntajes de admisión.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    if args.entrada:
+        puntuar_archivo(args.entrada, args.salida, args.tam_lote)
+    else:
+        predecir_resultados()
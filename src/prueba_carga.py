@@ -0,0 +1,86 @@
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.request
+from urllib.parse import urlencode
+
+# ✅ Prueba de carga para servicio_prediccion.py.
+#    Lanza N clientes concurrentes durante unos segundos contra /predecir y
+#    reporta latencia p50/p99 y consultas por segundo.
+
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def prueba_carga(url_base="http://127.0.0.1:8000", clientes=16, duracion=10.0):
+    with urllib.request.urlopen(f"{url_base}/escuelas") as r:
+        escuelas = json.load(r)
+    if not escuelas:
+        raise RuntimeError("El servicio no devolvió escuelas.")
+
+    latencias = []
+    errores = [0]
+    candado = threading.Lock()
+    fin = time.perf_counter() + duracion
+
+    def cliente(semilla):
+        azar = random.Random(semilla)
+        propias, fallas = [], 0
+        while time.perf_counter() < fin:
+            consulta = urlencode({"escuela": azar.choice(escuelas), "puntaje": azar.uniform(300, 1500)})
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(f"{url_base}/predecir?{consulta}") as r:
+                    r.read()
+                propias.append((time.perf_counter() - inicio) * 1000)
+            except Exception:
+                fallas += 1
+        with candado:
+            latencias.extend(propias)
+            errores[0] += fallas
+
+    print(f"🔥 Prueba de carga: {clientes} clientes durante {duracion:.0f} s contra {url_base}")
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    transcurrido = time.perf_counter() - inicio
+
+    with urllib.request.urlopen(f"{url_base}/estado") as r:
+        estado = json.load(r)
+
+    resultado = {
+        "consultas": len(latencias),
+        "errores": errores[0],
+        "rendimiento_qps": len(latencias) / transcurrido,
+        "p50_ms": percentil(latencias, 50),
+        "p99_ms": percentil(latencias, 99),
+        "consultas_por_lote": estado["consultas"] / max(estado["lotes"], 1),
+    }
+
+    print(f"   • Consultas:        {resultado['consultas']} ({resultado['errores']} errores)")
+    print(f"   • Rendimiento:      {resultado['rendimiento_qps']:.1f} consultas/s")
+    print(f"   • Latencia p50:     {resultado['p50_ms']:.2f} ms")
+    print(f"   • Latencia p99:     {resultado['p99_ms']:.2f} ms")
+    print(f"   • Consultas/lote:   {resultado['consultas_por_lote']:.1f} (promedio desde el inicio del servicio)")
+    return resultado
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de predicción.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos")
+    args = parser.parse_args()
+
+    prueba_carga(args.url, args.clientes, args.duracion)
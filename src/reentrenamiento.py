@@ -0,0 +1,262 @@
+import os
+import json
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error, r2_score
+from threadpoolctl import threadpool_limits
+from almacenamiento import cargar_tabla
+from almacen_modelos import AlmacenModelos, escribir_json
+from agregados_escuela import cargar_promedios
+from modelado import crear_modelo, X_COLS, Y_COL
+from prediccion import preparar_caracteristicas
+from backtesting import preparar_folds, evaluar_fold
+from instrumentacion import medir, instrumentar, agregar_argumentos, configurar_desde_args
+
+# ✅ Reentrenamiento incremental cuando llega un PROCESO nuevo.
+#
+#    En lugar de volver a entrenar todo el historial (modelado.py), se guarda una
+#    base con Random Forest y XGBoost ya entrenados y, por cada proceso nuevo:
+#      - XGBoost sigue haciendo boosting desde el modelo guardado (RONDAS_XGB rondas);
+#      - Random Forest agrega ARBOLES_RF árboles con warm_start.
+#    Ambos se ajustan solo con las filas de entrenamiento de los procesos nuevos, así
+#    que el costo no crece con el historial.
+#
+#    Los codificadores y el escalador quedan fijos desde que se crea la base (los
+#    códigos de ESCUELA_COD no pueden cambiar bajo árboles ya entrenados); escuelas
+#    nuevas reciben -1, como en prediccion.py.
+#
+#    Antes de publicar se compara, en el último fold del backtesting (prueba = proceso
+#    más reciente), el mismo atajo contra un reentrenamiento completo: si el
+#    incremental pierde más de TOLERANCIA_R2 de R2, no se publica. La comparación se
+#    guarda por fold y no se repite mientras no cambien los datos.
+#
+#    Todo vive en `resultados/incremental/` (estado.json + modelos + transformadores).
+
+MODELOS_INCREMENTALES = ["Random Forest", "XGBoost"]
+ARCHIVOS = {"Random Forest": "random_forest.joblib", "XGBoost": "xgboost.ubj"}
+ARBOLES_RF = 20      # árboles nuevos del bosque por cada actualización
+RONDAS_XGB = 50      # rondas de boosting nuevas por cada actualización
+TOLERANCIA_R2 = 0.01
+
+
+def continuar_modelo(nombre, modelo, X, y, n_jobs=None):
+    """Sigue entrenando `modelo` solo con (X, y): agrega árboles sin tocar los anteriores."""
+    with threadpool_limits(limits=n_jobs):
+        if nombre == "XGBoost":
+            nuevo = crear_modelo(nombre, n_jobs, {"n_estimators": RONDAS_XGB})
+            nuevo.fit(X, y, xgb_model=modelo.get_booster())
+            return nuevo
+        if nombre == "Random Forest":
+            modelo.set_params(warm_start=True, n_estimators=modelo.n_estimators + ARBOLES_RF, n_jobs=n_jobs)
+            modelo.fit(X, y)
+            return modelo
+    raise ValueError(f"Modelo sin entrenamiento incremental: {nombre}")
+
+
+def metricas(y, pred):
+    return {"R2": r2_score(y, pred), "RMSE": float(np.sqrt(mean_squared_error(y, pred)))}
+
+
+class BaseIncremental:
+
+    def __init__(self, ruta_resultados):
+        self.ruta = os.path.join(ruta_resultados, "incremental")
+        self.ruta_estado = os.path.join(self.ruta, "estado.json")
+        self.estado = {"procesos": [], "comparaciones": {}}
+        if os.path.exists(self.ruta_estado):
+            with open(self.ruta_estado, encoding="utf-8") as f:
+                self.estado = json.load(f)
+
+    def existe(self):
+        return bool(self.estado["procesos"])
+
+    @property
+    def procesos(self):
+        return self.estado["procesos"]
+
+    def transformadores(self):
+        return joblib.load(os.path.join(self.ruta, "transformadores.joblib"))
+
+    def cargar_modelo(self, nombre):
+        ruta = os.path.join(self.ruta, ARCHIVOS[nombre])
+        if nombre == "XGBoost":
+            from xgboost import XGBRegressor
+            modelo = XGBRegressor()
+            modelo.load_model(ruta)
+            return modelo
+        return joblib.load(ruta)
+
+    def guardar(self, modelos, procesos, transformadores=None):
+        os.makedirs(self.ruta, exist_ok=True)
+        for nombre, modelo in modelos.items():
+            ruta = os.path.join(self.ruta, ARCHIVOS[nombre])
+            if nombre == "XGBoost":
+                modelo.save_model(ruta)
+            else:
+                joblib.dump(modelo, ruta)
+        if transformadores is not None:
+            joblib.dump(transformadores, os.path.join(self.ruta, "transformadores.joblib"))
+        self.estado["procesos"] = sorted(procesos)
+        self.guardar_estado()
+
+    def guardar_estado(self):
+        os.makedirs(self.ruta, exist_ok=True)
+        escribir_json(self.ruta_estado, self.estado)
+
+
+def comparar_en_backtest(nombre, df_limpios, ruta_resultados, n_jobs=None, base=None):
+    """
+    R2/RMSE del atajo incremental y de un reentrenamiento completo en el último fold.
+
+    Fold: entrenamiento = todos los procesos menos el último, prueba = el último.
+    Incremental: se entrena con los procesos anteriores al penúltimo y se continúa
+    con el penúltimo (lo mismo que hará la actualización real, un proceso antes).
+    Completo: se entrena con todo el entrenamiento del fold, como backtesting.py.
+    """
+    procesos = sorted(df_limpios["PROCESO"].astype(str).unique())
+    if len(procesos) < 3:
+        raise ValueError("Se necesitan al menos 3 procesos para comparar en el backtesting.")
+    ruta_backtest = os.path.join(ruta_resultados, "backtest")
+    proceso_test, procesos_train, ruta_train, ruta_test = preparar_folds(
+        df_limpios, os.path.join(ruta_backtest, "folds"), len(procesos) - 1)[0]
+
+    # 🔹 El nombre del archivo del fold lleva la huella de los datos: sirve de clave de caché
+    clave = f"{nombre}|{os.path.basename(ruta_test)}"
+    if base is not None and clave in base.estado["comparaciones"]:
+        print(f"♻️ {nombre}: comparación en el fold {proceso_test} desde caché")
+        return base.estado["comparaciones"][clave]
+
+    train = pd.read_parquet(ruta_train)
+    test = pd.read_parquet(ruta_test)
+
+    # Completo: se reutiliza el resultado de backtesting.py si es del mismo fold
+    completo = None
+    ruta_por_fold = os.path.join(ruta_backtest, "backtest_por_fold.csv")
+    if os.path.exists(ruta_por_fold):
+        previos = pd.read_csv(ruta_por_fold)
+        fila = previos[(previos["Modelo"] == nombre) & (previos["PROCESO_TEST"] == proceso_test)
+                       & (previos["PROCESOS_TRAIN"] == f"{procesos_train[0]}..{procesos_train[-1]}")
+                       & (previos["N_TRAIN"] == len(train)) & (previos["N_TEST"] == len(test))]
+        if not fila.empty:
+            completo = fila.iloc[0][["R2", "RMSE"]].astype(float).to_dict()
+    if completo is None:
+        with medir(f"reentrenar.comparar.completo.{nombre}", filas=len(train)):
+            completo = evaluar_fold(nombre, proceso_test, procesos_train, ruta_train, ruta_test, n_jobs or 1)
+        completo = {k: completo[k] for k in ("R2", "RMSE")}
+
+    # Incremental: las filas del fold conservan el orden de df_limpios (ver construir_fold)
+    proceso_fila = df_limpios.loc[df_limpios["PROCESO"].astype(str).isin(procesos_train), "PROCESO"].astype(str)
+    ultimo = proceso_fila.to_numpy() == procesos_train[-1]
+    with medir(f"reentrenar.comparar.incremental.{nombre}", filas=len(train)):
+        with threadpool_limits(limits=n_jobs):
+            modelo = crear_modelo(nombre, n_jobs)
+            modelo.fit(train.loc[~ultimo, X_COLS], train.loc[~ultimo, Y_COL])
+        modelo = continuar_modelo(nombre, modelo, train.loc[ultimo, X_COLS], train.loc[ultimo, Y_COL], n_jobs)
+        incremental = metricas(test[Y_COL], modelo.predict(test[X_COLS]))
+
+    comparacion = {
+        "PROCESO_TEST": proceso_test,
+        "R2_COMPLETO": completo["R2"], "RMSE_COMPLETO": completo["RMSE"],
+        "R2_INCREMENTAL": incremental["R2"], "RMSE_INCREMENTAL": incremental["RMSE"],
+    }
+    if base is not None:
+        base.estado["comparaciones"][clave] = comparacion
+        base.guardar_estado()
+    return comparacion
+
+
+@instrumentar("reentrenar")
+def reentrenar_incremental(n_cpus=None, tolerancia=TOLERANCIA_R2, reiniciar=False, hasta=None, ruta_resultados=None):
+    """
+    Actualiza la base incremental con los procesos nuevos y publica si pasa la comparación.
+
+    n_cpus:      hilos para el ajuste (por defecto, todos los núcleos).
+    tolerancia:  pérdida de R2 aceptada frente al reentrenamiento completo.
+    reiniciar:   volver a crear la base desde cero (entrenamiento completo, una vez).
+    hasta:       al crear la base, incluir solo los procesos hasta este (inclusive).
+    """
+    # ---------- 1. RUTAS Y DATOS ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = ruta_resultados or os.path.join(os.path.dirname(ruta_actual), "resultados")
+    n_cpus = n_cpus or os.cpu_count() or 1
+    base = BaseIncremental(ruta_resultados)
+    promedios = cargar_promedios(ruta_resultados)
+
+    train_df = cargar_tabla(ruta_resultados, "train")
+    proceso_fila = train_df["PROCESO"].astype(str)
+    procesos = sorted(proceso_fila.unique())
+
+    # ---------- 2. BASE INICIAL (entrenamiento completo, solo la primera vez) ----------
+    if reiniciar or not base.existe():
+        incluidos = [p for p in procesos if hasta is None or p <= hasta]
+        transformadores = joblib.load(os.path.join(ruta_resultados, "transformadores.pkl"))
+        filas = preparar_caracteristicas(train_df[proceso_fila.isin(incluidos)], transformadores, promedios)
+        print(f"🧱 Creando la base incremental con {len(filas)} filas ({incluidos[0]}..{incluidos[-1]})...")
+        modelos = {}
+        for nombre in MODELOS_INCREMENTALES:
+            with threadpool_limits(limits=n_cpus), medir(f"reentrenar.base.{nombre}", filas=len(filas)):
+                modelos[nombre] = crear_modelo(nombre, n_cpus).fit(filas[X_COLS], filas[Y_COL])
+        base.guardar(modelos, incluidos, transformadores)
+        print(f"💾 Base incremental guardada en: {base.ruta}")
+        if len(incluidos) == len(procesos):
+            return None
+
+    # ---------- 3. PROCESOS NUEVOS ----------
+    nuevos = [p for p in procesos if p not in base.procesos]
+    if not nuevos:
+        print(f"✅ La base incremental ya incluye todos los procesos ({base.procesos[-1]}).")
+        return None
+    transformadores = base.transformadores()
+    filas = preparar_caracteristicas(train_df[proceso_fila.isin(nuevos)], transformadores, promedios)
+    print(f"🆕 Procesos nuevos: {', '.join(nuevos)} ({len(filas)} filas de entrenamiento)")
+
+    # ---------- 4. ACTUALIZACIÓN INCREMENTAL ----------
+    modelos = {}
+    for nombre in MODELOS_INCREMENTALES:
+        with medir(f"reentrenar.actualizar.{nombre}", filas=len(filas), hilos=n_cpus):
+            modelos[nombre] = continuar_modelo(nombre, base.cargar_modelo(nombre), filas[X_COLS], filas[Y_COL], n_cpus)
+
+    # ---------- 5. COMPARACIÓN CON UN REENTRENAMIENTO COMPLETO (BACKTESTING) ----------
+    df_limpios = cargar_tabla(ruta_resultados, "datos_limpios")
+    test_df = preparar_caracteristicas(cargar_tabla(ruta_resultados, "test"), transformadores, promedios)
+    tabla = []
+    for nombre in MODELOS_INCREMENTALES:
+        comparacion = comparar_en_backtest(nombre, df_limpios, ruta_resultados, n_cpus, base)
+        tabla.append({"Modelo": nombre, **comparacion,
+                      "APROBADO": comparacion["R2_INCREMENTAL"] >= comparacion["R2_COMPLETO"] - tolerancia,
+                      **metricas(test_df[Y_COL], modelos[nombre].predict(test_df[X_COLS]))})
+    df_tabla = pd.DataFrame(tabla)
+    print("\n📊 Incremental vs. completo (backtesting) y métricas en prueba:")
+    print(df_tabla)
+
+    # ---------- 6. PUBLICAR (solo si pasa la comparación) ----------
+    aprobados = df_tabla[df_tabla["APROBADO"]]
+    if aprobados.empty:
+        print(f"⚠️ Ningún modelo incremental queda a menos de {tolerancia} de R2 del reentrenamiento completo: "
+              "no se publica. Ejecuta modelado.py y luego este script con --reiniciar.")
+        return df_tabla
+
+    mejor = aprobados.loc[aprobados["R2"].idxmax(), "Modelo"]
+    base.guardar(modelos, base.procesos + nuevos)
+    version = AlmacenModelos(ruta_resultados).publicar(
+        modelos[mejor], mejor, X_COLS, transformadores, aprobados.set_index("Modelo").loc[mejor, ["R2", "RMSE"]].to_dict())
+    print(f"🏆 Modelo incremental publicado: {mejor}")
+    print(f"📦 Versión publicada en el almacén de modelos: {version}")
+    return df_tabla
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reentrenamiento incremental cuando llega un PROCESO nuevo.")
+    parser.add_argument("--cpus", type=int, default=None, help="hilos para el ajuste (por defecto, todos los núcleos)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_R2,
+                        help="pérdida de R2 aceptada frente al reentrenamiento completo")
+    parser.add_argument("--reiniciar", action="store_true", help="volver a crear la base desde cero")
+    parser.add_argument("--hasta", metavar="PROCESO", help="al crear la base, incluir solo hasta este proceso")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    reentrenar_incremental(args.cpus, args.tolerancia, args.reiniciar, args.hasta)
@@ -0,0 +1,89 @@
+import html
+import numpy as np
+import pandas as pd
+
+# ✅ Reglas de ingesta declarativas (reemplazan "limpiar_datos del 2024.py").
+#
+#    Se aplican dentro de cargar_datos.py a cada archivo, en el mismo proceso del
+#    pool que lo lee: una sola pasada, para cualquier PROCESO, sin escribir copias
+#    `<PROCESO>-limpio/` de las carpetas.
+#
+#    - REGLAS_COLUMNAS: columnas del CSV que se descartan antes de mapearlas.
+#    - REGLAS_FILAS: condición sobre columnas ya estandarizadas → columnas a vaciar.
+#      Las condiciones se evalúan sobre el texto normalizado (sin entidades HTML,
+#      sin tildes, MAYÚSCULAS, espacios simples; nulo = "") y en orden: cada regla
+#      ve lo que vaciaron las anteriores.
+#
+#    Para agregar una regla basta con sumar una entrada a estas listas.
+
+
+def contiene_todas(*palabras):
+    def condicion(texto):
+        mascara = np.ones(len(texto), dtype=bool)
+        for palabra in palabras:
+            mascara &= texto.str.contains(palabra, regex=False).to_numpy()
+        return mascara
+    return condicion
+
+
+def es_uno_de(*valores):
+    return lambda texto: texto.isin(valores).to_numpy()
+
+
+REGLAS_COLUMNAS = [
+    # La segunda opción no se usa: si se mapeara, podría tomarse como ESCUELA PROFESIONAL
+    dict(nombre="sin_segunda_opcion",
+         descartar=lambda col: "ESCUELA" in col and "SEGUNDA" in col and "OPCION" in col),
+]
+
+REGLAS_FILAS = [
+    # Alcanzó vacante en segunda opción: no es mérito de la escuela del archivo. La
+    # OBSERVACION se conserva: sigue siendo un ingresante (limpieza_datos la lleva a ALCANZO VACANTE)
+    dict(nombre="vacante_segunda_opcion",
+         columna="OBSERVACION", si=contiene_todas("ALCANZO", "VACANTE", "SEGUND"),  # SEGUND* = SEGUNDO/SEGUNDA
+         vaciar=["MERITOE.P"]),
+    # Ausente o sin observación: no tiene mérito
+    dict(nombre="ausente_sin_merito",
+         columna="OBSERVACION", si=es_uno_de("AUSENTE", ""),
+         vaciar=["MERITOE.P"]),
+]
+
+
+def normalizar_condicion(serie):
+    """Texto para evaluar condiciones; se normalizan solo los valores distintos."""
+    codigos, unicos = pd.factorize(serie)
+    unicos = pd.Series([html.unescape(str(u)) for u in unicos] + [""], dtype=object)
+    unicos = (unicos.str.normalize("NFD").str.replace(r"[̀-ͯ]", "", regex=True)
+                    .str.split().str.join(" ").str.upper())
+    # factorize marca los nulos con -1, que apunta al último elemento ("")
+    return pd.Series(unicos.to_numpy()[codigos], index=serie.index, dtype=object)
+
+
+def columnas_descartadas(nombres):
+    """Posiciones de `nombres` (ya limpios con limpiar_nombre) que descarta alguna regla."""
+    return {i for i, nombre in enumerate(nombres) for regla in REGLAS_COLUMNAS if regla["descartar"](nombre)}
+
+
+def aplicar_reglas_filas(df):
+    """Aplica REGLAS_FILAS a un DataFrame estandarizado; devuelve (df, {regla: filas afectadas})."""
+    normalizadas = {}
+    conteos = {}
+    for regla in REGLAS_FILAS:
+        columna = regla["columna"]
+        if columna not in df.columns:
+            continue
+        if columna not in normalizadas:
+            normalizadas[columna] = normalizar_condicion(df[columna])
+
+        mascara = regla["si"](normalizadas[columna])
+        destinos = [d for d in regla["vaciar"] if d in df.columns]
+        # 🔹 Se cuentan las filas que cambian (con algo que vaciar), no solo las que cumplen la condición
+        conteos[regla["nombre"]] = int((mascara & df[destinos].notna().any(axis=1).to_numpy()).sum())
+        if not mascara.any():
+            continue
+        for destino in regla["vaciar"]:
+            if destino in df.columns:
+                df.loc[mascara, destino] = np.nan
+            if destino in normalizadas:
+                normalizadas[destino] = normalizadas[destino].mask(mascara, "")
+    return df, conteos
@@ -0,0 +1,240 @@
+import os
+import json
+import math
+import time
+import queue
+import argparse
+import threading
+from functools import lru_cache
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from almacenamiento import cargar_tabla
+from prediccion import cargar_artefactos, codificar_columna, puntuar_lote, resumir_por_escuela
+from agregados_escuela import cargar_promedios
+from indice_estadisticas import IndiceEstadisticas, version_modelo_actual
+from limpieza_datos import normalizar_texto
+
+# ✅ Servicio local de predicción para la ventana de admisión.
+#    El modelo, los transformadores y los datos limpios se cargan UNA vez al iniciar.
+#    Las consultas concurrentes se juntan en micro-lotes y se resuelven con una sola
+#    llamada a `model.predict`.
+#
+#    Endpoints (GET, respuesta JSON):
+#      /escuelas                                   → escuelas disponibles
+#      /corte?escuela=X                            → resumen precalculado (mínimo predicho, etc.)
+#      /predecir?escuela=X&puntaje=Y[&observacion=Z] → puntaje predicho de un postulante
+#      /estadisticas?escuela=X[&proceso=P]         → índice por escuela y proceso (real y predicho)
+#    También acepta POST /predecir con {"escuela": ..., "puntaje": ..., "observacion": ...}.
+#    `escuela` y `observacion` pasan por la misma normalización que datos_limpios
+#    (tildes, mayúsculas, "Alcanzó vacante" → ALCANZO VACANTE).
+
+TAM_MAX_LOTE = 256       # consultas máximas por llamada a predict
+ESPERA_MAX_MS = 2.0      # cuánto espera el lote a que lleguen más consultas
+
+
+@lru_cache(maxsize=4096)
+def normalizar_consulta(texto):
+    """normalizar_texto de limpieza_datos.py para un solo valor ("" o None → SIN OBSERVACION)."""
+    return normalizar_texto(pd.Series([texto], dtype=object))[0]
+
+
+class MicroLotes:
+    """Junta consultas de varios hilos y las predice en una sola llamada al modelo."""
+
+    def __init__(self, funcion_lote, tam_max=TAM_MAX_LOTE, espera_max_ms=ESPERA_MAX_MS):
+        self.funcion_lote = funcion_lote
+        self.tam_max = tam_max
+        self.espera_max = espera_max_ms / 1000
+        self.cola = queue.Queue()
+        self.lotes = 0
+        self.consultas = 0
+        hilo = threading.Thread(target=self._bucle, daemon=True)
+        hilo.start()
+
+    def enviar(self, consulta):
+        """Encola una consulta y devuelve un Future con su resultado."""
+        futuro = Future()
+        self.cola.put((consulta, futuro))
+        return futuro
+
+    def _bucle(self):
+        while True:
+            pendientes = [self.cola.get()]
+            limite = time.perf_counter() + self.espera_max
+            while len(pendientes) < self.tam_max:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    pendientes.append(self.cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            self._resolver(pendientes)
+            self.lotes += 1
+            self.consultas += len(pendientes)
+
+    def _resolver(self, pendientes):
+        try:
+            resultados = self.funcion_lote([c for c, _ in pendientes])
+        except Exception as e:
+            if len(pendientes) == 1:
+                pendientes[0][1].set_exception(e)
+                return
+            # ⚠️ Una consulta inválida no debe tumbar a las demás del lote: se reintenta de a una
+            for pendiente in pendientes:
+                self._resolver([pendiente])
+            return
+        for (_, futuro), resultado in zip(pendientes, resultados):
+            futuro.set_result(resultado)
+
+
+def preparar_servicio(ruta_resultados):
+    """Carga artefactos y precalcula las variables por escuela del último proceso."""
+    modelo, X_cols, transformadores = cargar_artefactos(ruta_resultados)
+    df = cargar_tabla(ruta_resultados, "datos_limpios")
+
+    proceso_base = sorted(df["PROCESO"].unique())[-1]
+    df_base = df[df["PROCESO"] == proceso_base]
+
+    # 🔹 Mismas variables que prediccion.py: promedio histórico de la escuela (agregados persistentes)
+    promedios = cargar_promedios(ruta_resultados)
+    por_escuela = df_base.groupby("ESCUELA PROFESIONAL", observed=True)["PUNTAJE"].mean().rename("PROMEDIO_ESCUELA").to_frame()
+    por_escuela["PROMEDIO_ESCUELA"] = por_escuela.index.to_series().map(promedios).fillna(por_escuela["PROMEDIO_ESCUELA"])
+    por_escuela["ESCUELA_COD"] = codificar_columna(por_escuela.index, transformadores["le_escuela"])
+
+    # 🔹 Resumen de cortes precalculado (igual a prediccion_por_escuela_2026II.csv)
+    resumen = resumir_por_escuela(puntuar_lote(df_base, modelo, X_cols, transformadores, promedios=promedios))
+    resumen = resumen.set_index("ESCUELA PROFESIONAL")
+
+    def predecir_lote(consultas):
+        lote = pd.DataFrame(consultas)
+        base = por_escuela.loc[lote["escuela"]]
+        X = pd.DataFrame({
+            "ESCUELA_COD": base["ESCUELA_COD"].to_numpy(),
+            "OBSERVACION_COD": codificar_columna(lote["observacion"], transformadores["le_obs"]),
+            "PROMEDIO_ESCUELA": base["PROMEDIO_ESCUELA"].to_numpy(),
+            "DIFERENCIA_PROMEDIO": lote["puntaje"].to_numpy(dtype="float64") - base["PROMEDIO_ESCUELA"].to_numpy(),
+        })
+        columnas_a_normalizar = ["PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
+        X[columnas_a_normalizar] = transformadores["scaler"].transform(X[columnas_a_normalizar])
+        return np.clip(modelo.predict(X[X_cols]), 0, 2000).tolist()
+
+    # 🔹 Índice por escuela y proceso: solo se calculan los procesos que falten
+    indice = IndiceEstadisticas(ruta_resultados)
+    indice.actualizar(df, modelo, X_cols, transformadores, version_modelo_actual(ruta_resultados))
+
+    print(f"📦 Servicio listo con el proceso {proceso_base}: {len(por_escuela)} escuelas.")
+    return por_escuela, resumen, indice, MicroLotes(predecir_lote)
+
+
+class ServidorPrediccion(ThreadingHTTPServer):
+    daemon_threads = True
+    # 🔹 La cola por defecto (5) descarta conexiones con muchos clientes y dispara
+    #    reintentos TCP de ~1 s que arruinan el p99.
+    request_queue_size = 128
+
+
+def crear_manejador(por_escuela, resumen, indice, lotes):
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, formato, *args):
+            pass  # 🔹 sin un print por consulta: afectaría la latencia
+
+        def responder(self, estado, cuerpo):
+            datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(estado)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def predecir(self, escuela, puntaje, observacion):
+            if escuela not in por_escuela.index:
+                return self.responder(404, {"error": f"Escuela desconocida: {escuela}"})
+            try:
+                puntaje = float(puntaje)
+            except (TypeError, ValueError):
+                puntaje = math.nan
+            if not math.isfinite(puntaje):
+                return self.responder(400, {"error": "El parámetro 'puntaje' debe ser numérico y finito."})
+
+            consulta = {"escuela": escuela, "puntaje": puntaje, "observacion": normalizar_consulta(observacion)}
+            try:
+                prediccion = lotes.enviar(consulta).result()
+            except Exception as e:
+                # 🔹 Siempre se responde: sin esto el hilo muere y el cliente ve la conexión cerrada
+                return self.responder(500, {"error": f"No se pudo predecir: {e}"})
+            self.responder(200, dict(consulta, puntaje_predicho=prediccion))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            escuela = params.get("escuela", "").strip()
+            escuela = normalizar_consulta(escuela) if escuela else ""
+
+            if url.path == "/escuelas":
+                self.responder(200, sorted(por_escuela.index))
+            elif url.path == "/corte":
+                if escuela not in resumen.index:
+                    return self.responder(404, {"error": f"Sin resumen para la escuela: {escuela}"})
+                fila = json.loads(resumen.loc[[escuela]].to_json(orient="records", double_precision=15))[0]
+                self.responder(200, dict(fila, escuela=escuela))
+            elif url.path == "/estadisticas":
+                fila = indice.consultar(escuela, params.get("proceso", "").strip().upper() or None)
+                if fila is None:
+                    return self.responder(404, {"error": f"Sin estadísticas para la escuela: {escuela}"})
+                self.responder(200, json.loads(pd.Series(fila).to_json(double_precision=15)))
+            elif url.path == "/predecir":
+                self.predecir(escuela, params.get("puntaje"), params.get("observacion"))
+            elif url.path == "/estado":
+                self.responder(200, {"lotes": lotes.lotes, "consultas": lotes.consultas})
+            else:
+                self.responder(404, {"error": "Ruta no encontrada."})
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/predecir":
+                return self.responder(404, {"error": "Ruta no encontrada."})
+            largo = int(self.headers.get("Content-Length", 0))
+            try:
+                cuerpo = json.loads(self.rfile.read(largo) or b"{}")
+            except json.JSONDecodeError:
+                return self.responder(400, {"error": "JSON inválido."})
+            if not isinstance(cuerpo, dict):
+                return self.responder(400, {"error": "El cuerpo debe ser un objeto JSON."})
+            escuela = str(cuerpo.get("escuela") or "").strip()
+            observacion = cuerpo.get("observacion")
+            self.predecir(normalizar_consulta(escuela) if escuela else "", cuerpo.get("puntaje"),
+                          None if observacion is None else str(observacion))
+
+    return Manejador
+
+
+def iniciar_servicio(host="127.0.0.1", puerto=8000):
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = os.path.join(os.path.dirname(ruta_actual), "resultados")
+
+    por_escuela, resumen, indice, lotes = preparar_servicio(ruta_resultados)
+    servidor = ServidorPrediccion((host, puerto), crear_manejador(por_escuela, resumen, indice, lotes))
+    print(f"🚀 Servicio de predicción en http://{host}:{puerto} (Ctrl+C para detener)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Servicio detenido.")
+    finally:
+        servidor.server_close()
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de predicción de puntajes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    args = parser.parse_args()
+
+    iniciar_servicio(args.host, args.puerto)
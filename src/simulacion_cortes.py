@@ -0,0 +1,150 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from almacenamiento import cargar_tabla
+from prediccion import cargar_artefactos, puntuar_lote, resumir_por_escuela
+from instrumentacion import medir, instrumentar, agregar_argumentos, configurar_desde_args
+
+# ✅ Simulación Monte Carlo del puntaje de corte 2026-II por escuela.
+#
+#    Para cada escuela y cada simulación:
+#      1. se remuestrea (con reemplazo) el conjunto de postulantes del último proceso,
+#         con su PUNTAJE_PREDICTO;
+#      2. a cada uno se le suma un residuo (PUNTAJE real − predicho) tomado de los
+#         residuos de prueba de esa escuela (o de todas, si tiene pocos);
+#      3. el corte es el puntaje del último de las VACANTES_ESTIMADAS mejores.
+#    Todas las simulaciones de una escuela salen de una matriz (simulaciones × postulantes)
+#    y np.partition por fila, por bloques para acotar memoria. Las escuelas se reparten
+#    entre procesos; cada escuela tiene su propia semilla, así el resultado no depende
+#    de cuántos procesos se usen.
+#
+#    Salidas: `resultados/simulacion_cortes_2026II.csv` (cuantiles por escuela) y
+#    `resultados/simulacion_cortes_2026II.npz` (los cortes simulados, para consultar
+#    la probabilidad de que el corte supere un puntaje).
+
+N_SIMULACIONES = 5_000
+CUANTILES = [5, 25, 50, 75, 95]
+MIN_RESIDUOS = 30
+ELEMENTOS_POR_BLOQUE = 4_000_000  # simulaciones × postulantes por bloque (~32 MB en float64)
+
+
+def simular_escuela(puntajes, residuos, vacantes, n_simulaciones, semilla):
+    """Cortes simulados de una escuela (vector de largo `n_simulaciones`)."""
+    azar = np.random.default_rng(semilla)
+    n = len(puntajes)
+    posicion = n - vacantes  # 🔹 el corte es el estadístico de orden n − vacantes (ascendente)
+    cortes = np.empty(n_simulaciones)
+    por_bloque = max(1, ELEMENTOS_POR_BLOQUE // n)
+    for inicio in range(0, n_simulaciones, por_bloque):
+        k = min(por_bloque, n_simulaciones - inicio)
+        simulados = puntajes[azar.integers(0, n, size=(k, n))] + residuos[azar.integers(0, len(residuos), size=(k, n))]
+        cortes[inicio:inicio + k] = np.partition(simulados, posicion, axis=1)[:, posicion]
+    return np.clip(cortes, 0, 2000)
+
+
+def simular_grupo(tareas):
+    """Simula varias escuelas en un proceso del pool: [(escuela, puntajes, residuos, vacantes, n, semilla)]."""
+    return {escuela: simular_escuela(*resto) for escuela, *resto in tareas}
+
+
+def residuos_por_escuela(modelo, X_cols, ruta_resultados):
+    """Residuos (real − predicho) del conjunto de prueba, agrupados por escuela."""
+    test_df = cargar_tabla(ruta_resultados, "test")
+    residuos = test_df["PUNTAJE"].to_numpy() - modelo.predict(test_df[X_cols])
+    escuelas = test_df["ESCUELA PROFESIONAL"].astype(str).to_numpy()
+    orden = np.argsort(escuelas, kind="stable")
+    nombres, inicios = np.unique(escuelas[orden], return_index=True)
+    return dict(zip(nombres, np.split(residuos[orden], inicios[1:]))), residuos
+
+
+@instrumentar("simular")
+def simular_cortes(n_simulaciones=N_SIMULACIONES, n_workers=None, semilla=42, ruta_resultados=None):
+    # ---------- 1. RUTAS Y ARTEFACTOS ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = ruta_resultados or os.path.join(os.path.dirname(ruta_actual), "resultados")
+    modelo, X_cols, transformadores = cargar_artefactos(ruta_resultados)
+
+    # ---------- 2. POSTULANTES DEL ÚLTIMO PROCESO Y RESIDUOS ----------
+    with medir("simular.preparar") as m:
+        df = cargar_tabla(ruta_resultados, "datos_limpios")
+        proceso_base = sorted(df["PROCESO"].unique())[-1]
+        df_pred = puntuar_lote(df[df["PROCESO"] == proceso_base], modelo, X_cols, transformadores)
+        vacantes = resumir_por_escuela(df_pred).set_index("ESCUELA PROFESIONAL")["VACANTES_ESTIMADAS"]
+        residuos, todos_residuos = residuos_por_escuela(modelo, X_cols, ruta_resultados)
+        m["filas"] = len(df_pred)
+
+    # ✅ Una semilla independiente por escuela (en orden alfabético)
+    escuelas = sorted(str(e) for e in vacantes.index)
+    semillas = np.random.SeedSequence(semilla).spawn(len(escuelas))
+    puntajes = df_pred.groupby(df_pred["ESCUELA PROFESIONAL"].astype(str))["PUNTAJE_PREDICTO"]
+    tareas = []
+    for escuela, semilla_escuela in zip(escuelas, semillas):
+        propios = residuos.get(escuela, np.empty(0))
+        tareas.append((escuela, puntajes.get_group(escuela).to_numpy(dtype="float64"),
+                       propios if len(propios) >= MIN_RESIDUOS else todos_residuos,
+                       int(vacantes[escuela]), n_simulaciones, semilla_escuela))
+    print(f"🎲 Simulando {n_simulaciones} cortes para {len(tareas)} escuelas (proceso base {proceso_base})...")
+
+    # ---------- 3. SIMULACIÓN (escuelas repartidas entre procesos) ----------
+    n_workers = n_workers or os.cpu_count() or 1
+    with medir("simular.cortes", escuelas=len(tareas), simulaciones=n_simulaciones, workers=n_workers):
+        if n_workers > 1:
+            # 🔹 Grupos intercalados: las escuelas grandes no caen todas en el mismo proceso
+            grupos = [tareas[i::n_workers] for i in range(n_workers)]
+            cortes = {}
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                for parcial in pool.map(simular_grupo, grupos):
+                    cortes.update(parcial)
+        else:
+            cortes = simular_grupo(tareas)
+
+    # ---------- 4. CUANTILES POR ESCUELA ----------
+    matriz = np.vstack([cortes[e] for e in escuelas])
+    resumen = pd.DataFrame(np.percentile(matriz, CUANTILES, axis=1).T,
+                           columns=[f"CORTE_P{q}" for q in CUANTILES], index=pd.Index(escuelas, name="ESCUELA PROFESIONAL"))
+    resumen.insert(0, "CORTE_PROMEDIO", matriz.mean(axis=1))
+    resumen.insert(0, "VACANTES_ESTIMADAS", [int(vacantes[e]) for e in escuelas])
+    resumen.insert(0, "POSTULANTES", [len(t[1]) for t in tareas])
+    resumen = resumen.reset_index()
+
+    ruta_csv = os.path.join(ruta_resultados, "simulacion_cortes_2026II.csv")
+    ruta_npz = os.path.join(ruta_resultados, "simulacion_cortes_2026II.npz")
+    resumen.to_csv(ruta_csv, index=False, encoding="utf-8-sig")
+    np.savez_compressed(ruta_npz, escuelas=np.array(escuelas), cortes=matriz)
+    print(f"💾 Cuantiles por escuela: {ruta_csv}")
+    print(f"💾 Cortes simulados: {ruta_npz}")
+    return resumen
+
+
+def probabilidad_supera(escuela, puntaje, ruta_resultados=None):
+    """Probabilidad simulada de que el corte de `escuela` quede por encima de `puntaje`."""
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = ruta_resultados or os.path.join(os.path.dirname(ruta_actual), "resultados")
+    with np.load(os.path.join(ruta_resultados, "simulacion_cortes_2026II.npz")) as datos:
+        fila = np.flatnonzero(datos["escuelas"] == escuela)
+        if not len(fila):
+            raise ValueError(f"Escuela sin simulación: {escuela}")
+        return float((datos["cortes"][fila[0]] > puntaje).mean())
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación Monte Carlo del puntaje de corte 2026-II por escuela.")
+    parser.add_argument("--simulaciones", type=int, default=N_SIMULACIONES)
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--escuela", help="consultar sin volver a simular: probabilidad de que el corte supere --puntaje")
+    parser.add_argument("--puntaje", type=float, help="puntaje para --escuela")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    if args.escuela:
+        if args.puntaje is None:
+            parser.error("--escuela necesita --puntaje")
+        escuela = args.escuela.strip().upper()
+        print(f"📈 P(corte de {escuela} > {args.puntaje}) = {probabilidad_supera(escuela, args.puntaje):.1%}")
+    else:
+        print(simular_cortes(args.simulaciones, args.workers, args.semilla).to_string(index=False))
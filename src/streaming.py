@@ -0,0 +1,118 @@
+import os
+import argparse
+import joblib
+import numpy as np
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from cargar_datos import iterar_procesos
+from limpieza_datos import limpiar_particion, cargar_memo_texto, guardar_memo_texto
+from agregados_escuela import AgregadosEscuela
+from almacenamiento import cargar_tabla, guardar_tabla, FORMATO_POR_DEFECTO, FORMATOS
+
+# ✅ Modo streaming: carga, limpieza y codificación partición por partición (un PROCESO
+#    a la vez). Lo único que se acumula entre particiones son las clases de los
+#    codificadores y los agregados por escuela (agregados_escuela.py), así que el pico de memoria queda
+#    acotado por la partición más grande y no por todo el historial.
+#
+#    Salidas en `resultados/particiones/`:
+#      limpios/<PROCESO>.parquet       (filas y columnas de datos_limpios de ese proceso)
+#      transformados/<PROCESO>.parquet (filas y columnas de datos_transformados de ese proceso)
+#    y `resultados/transformadores.pkl`, igual que transformacion.py.
+#    Diferencias con limpieza_datos.py + transformacion.py: los tipos son siempre los
+#    por defecto (no aplica esquema_compacto, ni --compacto ni --proyectar) y no arma
+#    `historial_postulantes.parquet` (necesita todos los procesos juntos).
+
+
+def mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def procesar_en_streaming(n_workers=1, formato=FORMATO_POR_DEFECTO):
+    # ---------- 1. RUTAS DEL PROYECTO ----------
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_raiz = os.path.dirname(ruta_actual)
+    ruta_resultados = os.path.join(ruta_raiz, "resultados")
+    ruta_limpios = os.path.join(ruta_resultados, "particiones", "limpios")
+    ruta_transformados = os.path.join(ruta_resultados, "particiones", "transformados")
+    ruta_memo = os.path.join(ruta_resultados, "cache_texto.json")
+
+    # ---------- 2. CARGA + LIMPIEZA POR PROCESO ----------
+    # ✅ En la misma pasada se acumulan las clases y las estadísticas por escuela
+    print("🌊 Paso 1: carga y limpieza por proceso...")
+    memo = cargar_memo_texto(ruta_memo)
+    agregados = AgregadosEscuela(ruta_resultados)
+    clases_escuela, clases_obs = set(), set()
+    procesos = []
+    pico_mb = 0.0
+
+    for proceso, df in iterar_procesos(n_workers):
+        pico_mb = max(pico_mb, mb(df))
+        df = limpiar_particion(df, memo)
+        guardar_tabla(df, ruta_limpios, proceso, formato)
+
+        agregados.actualizar(df)
+        clases_escuela.update(df["ESCUELA PROFESIONAL"].unique())
+        clases_obs.update(df["OBSERVACION"].unique())
+        procesos.append(proceso)
+        print(f"   • {proceso}: {len(df)} registros limpios ({mb(df):.1f} MB)")
+    guardar_memo_texto(ruta_memo, memo)
+
+    if not procesos:
+        raise FileNotFoundError("No se encontraron procesos en datos_admision.")
+
+    # ---------- 3. CODIFICADORES Y PROMEDIOS ----------
+    # ✅ LabelEncoder ordena las clases: ajustarlo con los valores únicos
+    #    da lo mismo que ajustarlo con la columna completa.
+    le_escuela = LabelEncoder().fit(np.array(sorted(clases_escuela), dtype=object))
+    le_obs = LabelEncoder().fit(np.array(sorted(clases_obs), dtype=object))
+    agregados.conservar(procesos)
+    agregados.guardar()
+    promedios = agregados.promedios()
+
+    def derivar(df):
+        df["ESCUELA_COD"] = le_escuela.transform(df["ESCUELA PROFESIONAL"])
+        df["OBSERVACION_COD"] = le_obs.transform(df["OBSERVACION"])
+        df["PROMEDIO_ESCUELA"] = df["ESCUELA PROFESIONAL"].map(promedios).astype("float64")
+        df["DIFERENCIA_PROMEDIO"] = df["PUNTAJE"] - df["PROMEDIO_ESCUELA"]
+        return df
+
+    # ---------- 4. AJUSTE DEL ESCALADOR (partial_fit por proceso) ----------
+    print("🌊 Paso 2: ajuste del escalador por partes...")
+    columnas_a_normalizar = ["PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
+    scaler = MinMaxScaler()
+    for proceso in procesos:
+        df = derivar(cargar_tabla(ruta_limpios, proceso))
+        scaler.partial_fit(df[columnas_a_normalizar])
+
+    # ---------- 5. CODIFICACIÓN Y ESCALADO POR PROCESO ----------
+    print("🌊 Paso 3: codificación y escalado por proceso...")
+    total = 0
+    for proceso in procesos:
+        df = derivar(cargar_tabla(ruta_limpios, proceso))
+        df[columnas_a_normalizar] = scaler.transform(df[columnas_a_normalizar])
+        guardar_tabla(df, ruta_transformados, proceso, formato)
+        pico_mb = max(pico_mb, mb(df))
+        total += len(df)
+
+    # ---------- 6. GUARDAR TRANSFORMADORES ----------
+    transformadores = {"le_escuela": le_escuela, "le_obs": le_obs, "scaler": scaler}
+    ruta_transformadores = os.path.join(ruta_resultados, "transformadores.pkl")
+    joblib.dump(transformadores, ruta_transformadores)
+
+    print(f"\n✅ Streaming completado: {len(procesos)} procesos, {total} registros transformados.")
+    print(f"📏 Partición más grande en memoria: {pico_mb:.1f} MB")
+    print(f"💾 Particiones en: {os.path.dirname(ruta_limpios)}")
+    print(f"🧠 Transformadores guardados en: {ruta_transformadores}")
+
+    return procesos
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga, limpia y codifica los datos un PROCESO a la vez.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para la lectura de archivos (0 = todos los núcleos)")
+    parser.add_argument("--formato", choices=FORMATOS, default=FORMATO_POR_DEFECTO,
+                        help="formato de las particiones")
+    args = parser.parse_args()
+
+    procesar_en_streaming(n_workers=args.workers, formato=args.formato)
@@ -1,22 +1,36 @@
-import pandas as pd
 import os
+import argparse
 import joblib
 from sklearn.preprocessing import LabelEncoder, MinMaxScaler
 from sklearn.model_selection import train_test_split
-
-
-def transformar_datos():
+import instrumentacion
+from instrumentacion import medir, instrumentar
+from almacenamiento import cargar_tabla, guardar_tabla, FORMATO_POR_DEFECTO, FORMATOS
+from agregados_escuela import AgregadosEscuela
+from historial_postulantes import HistorialPostulantes
+import esquema_compacto
+
+
+@instrumentar("transformar")
+def transformar_datos(formato=FORMATO_POR_DEFECTO, df=None, ruta_resultados=None):
+    """
+    Codifica, genera variables derivadas, escala y divide los datos limpios.
+
+    df: DataFrame limpio ya en memoria (si es None se lee de `resultados/`).
+    ruta_resultados: carpeta de entrada y salida (por defecto, `resultados/`).
+    """
     # ---------- 1. RUTAS DEL PROYECTO ----------
     ruta_actual = os.path.dirname(os.path.abspath(__file__))
     ruta_raiz = os.path.dirname(ruta_actual)
-    ruta_resultados = os.path.join(ruta_raiz, "resultados")
-    ruta_entrada = os.path.join(ruta_resultados, "datos_limpios.csv")
-
-    if not os.path.exists(ruta_entrada):
-        raise FileNotFoundError(f"No se encontró el archivo limpio: {ruta_entrada}")
-
-    print(f"📂 Cargando datos limpios desde: {ruta_entrada}")
-    df = pd.read_csv(ruta_entrada, encoding="utf-8-sig")
+    ruta_resultados = ruta_resultados or os.path.join(ruta_raiz, "resultados")
+
+    if df is None:
+        print(f"📂 Cargando datos limpios desde: {ruta_resultados}")
+        with medir("transformar.leer_entrada") as m:
+            df = cargar_tabla(ruta_resultados, "datos_limpios")
+            m["filas"] = len(df)
+    else:
+        df = df.copy()  # 🔹 no modificar el DataFrame de la etapa anterior
     print(f"Registros cargados: {len(df)}")
 
     # ---------- 2. CODIFICACIÓN DE VARIABLES CATEGÓRICAS ----------
@@ -26,24 +40,39 @@ def transformar_datos():
     le_escuela = LabelEncoder()
     le_obs = LabelEncoder()
 
-    df["ESCUELA_COD"] = le_escuela.fit_transform(df["ESCUELA PROFESIONAL"])
-    df["OBSERVACION_COD"] = le_obs.fit_transform(df["OBSERVACION"])
+    with medir("transformar.codificar", filas=len(df)):
+        df["ESCUELA_COD"] = le_escuela.fit_transform(df["ESCUELA PROFESIONAL"])
+        df["OBSERVACION_COD"] = le_obs.fit_transform(df["OBSERVACION"])
 
     # ---------- 3. GENERACIÓN DE VARIABLES DERIVADAS ----------
     print("🧮 Generando variables derivadas...")
 
-    # Promedio histórico de puntaje por escuela
-    df["PROMEDIO_ESCUELA"] = df.groupby("ESCUELA PROFESIONAL")["PUNTAJE"].transform("mean")
-
-    # Diferencia entre el puntaje individual y el promedio de su escuela
-    df["DIFERENCIA_PROMEDIO"] = df["PUNTAJE"] - df["PROMEDIO_ESCUELA"]
+    with medir("transformar.promedio_escuela", filas=len(df)) as m:
+        # Promedio histórico de puntaje por escuela (agregados persistentes: solo se
+        # suman los procesos nuevos o cambiados, y prediccion.py lee los mismos)
+        agregados = AgregadosEscuela(ruta_resultados)
+        m["procesos_actualizados"] = agregados.actualizar(df, completo=True)
+        agregados.guardar()
+        df["PROMEDIO_ESCUELA"] = df["ESCUELA PROFESIONAL"].map(agregados.promedios()).astype("float64")
+
+        # Diferencia entre el puntaje individual y el promedio de su escuela
+        df["DIFERENCIA_PROMEDIO"] = df["PUNTAJE"] - df["PROMEDIO_ESCUELA"]
+
+    with medir("transformar.historial", filas=len(df)) as m:
+        # Historial de intentos por CODIGO (historial_postulantes.py). Sus variables no se
+        # agregan a las tablas: el modelo no las usa porque al predecir (servicio_prediccion,
+        # streaming) no siempre hay CODIGO
+        historial = HistorialPostulantes.construir(df)
+        historial.guardar(ruta_resultados)
+        m["postulantes"] = len(historial.indice)
 
     # ---------- 4. NORMALIZACIÓN DE VARIABLES NUMÉRICAS ----------
     print("📏 Normalizando variables numéricas...")
 
     scaler = MinMaxScaler()
     columnas_a_normalizar = ["PROMEDIO_ESCUELA", "DIFERENCIA_PROMEDIO"]
-    df[columnas_a_normalizar] = scaler.fit_transform(df[columnas_a_normalizar])
+    with medir("transformar.escalar", filas=len(df)):
+        df[columnas_a_normalizar] = scaler.fit_transform(df[columnas_a_normalizar])
 
     # ---------- 5. GUARDAR TRANSFORMADORES PARA FUTURAS PREDICCIONES ----------
     print("💾 Guardando transformadores (encoders y scaler)...")
@@ -57,27 +86,44 @@ def transformar_datos():
     print(f"🧠 Transformadores guardados en: {ruta_transformadores}")
 
     # ---------- 6. DIVISIÓN DEL CONJUNTO DE DATOS ----------
+    df = esquema_compacto.compactar_etapa(df, "transformar")
     print("✂️ Dividiendo conjunto de entrenamiento y prueba...")
     train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, shuffle=True)
 
     # ---------- 7. GUARDAR RESULTADOS ----------
-    ruta_transformado = os.path.join(ruta_resultados, "datos_transformados.csv")
-    ruta_train = os.path.join(ruta_resultados, "train.csv")
-    ruta_test = os.path.join(ruta_resultados, "test.csv")
-
-    df.to_csv(ruta_transformado, index=False, encoding="utf-8-sig")
-    train_df.to_csv(ruta_train, index=False, encoding="utf-8-sig")
-    test_df.to_csv(ruta_test, index=False, encoding="utf-8-sig")
+    with medir("transformar.guardar", filas=len(df)):
+        ruta_transformado = guardar_tabla(df, ruta_resultados, "datos_transformados", formato)
+        ruta_train = guardar_tabla(train_df, ruta_resultados, "train", formato)
+        ruta_test = guardar_tabla(test_df, ruta_resultados, "test", formato)
 
     print(f"\n✅ Transformación completada exitosamente.")
-    print(f"💾 Archivo principal guardado en: {ruta_transformado}")
-    print(f"💾 Entrenamiento: {ruta_train}")
-    print(f"💾 Prueba: {ruta_test}")
+    print(f"💾 Archivo principal guardado en: {', '.join(ruta_transformado)}")
+    print(f"💾 Entrenamiento: {', '.join(ruta_train)}")
+    print(f"💾 Prueba: {', '.join(ruta_test)}")
     print(f"\nColumnas finales: {list(df.columns)}")
 
     return df, train_df, test_df
 
 
+# ---------- LÍNEA DE COMANDOS ----------
+def agregar_argumentos(parser):
+    """--formato de las tablas transformadas, más instrumentación y esquema compacto."""
+    parser.add_argument("--formato", choices=FORMATOS, default=FORMATO_POR_DEFECTO,
+                        help="formato de salida de datos_transformados, train y test")
+    instrumentacion.agregar_argumentos(parser)
+    esquema_compacto.agregar_argumentos(parser)
+
+
+def configurar_desde_args(args):
+    instrumentacion.configurar_desde_args(args)
+    esquema_compacto.configurar_desde_args(args)
+
+
 # ---------- EJECUCIÓN DIRECTA ----------
 if __name__ == "__main__":
-    transformar_datos()
+    parser = argparse.ArgumentParser(description="Codifica, escala y divide los datos limpios.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+
+    transformar_datos(formato=args.formato)
@@ -0,0 +1,208 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from collections import Counter
+from reglas_ingesta import normalizar_condicion
+from agregados_escuela import ESCALA
+
+# ✅ Validación de esquema con cuarentena (reemplaza los filtros implícitos de limpieza_datos.py).
+#
+#    - REGLAS_VALIDACION: regla por columna → máscara de filas rechazadas, calculada
+#      sobre la columna completa (sin bucles por fila). Se evalúan una sola vez sobre
+#      todas las partes ya concatenadas (no archivo por archivo) y cada fila rechazada
+#      lleva el código de la PRIMERA regla que incumple.
+#    - Duplicados (CODIGO, PROCESO): entre las filas válidas se conserva la primera;
+#      un mismo CODIGO puede venir en dos archivos del proceso.
+#    - Líneas que el parser de CSV no pudo leer (cantidad de campos distinta): antes
+#      se saltaban en silencio (on_bad_lines='skip'); ahora también van a la cuarentena.
+#
+#    Las filas rechazadas se agregan a `resultados/cuarentena.csv` en cuanto se validan
+#    (en streaming.py, una vez por PROCESO), con ARCHIVO, MOTIVO y FILA (posición entre
+#    las filas leídas del archivo) o LINEA (línea del CSV que no se pudo leer).
+#    `resultados/cuarentena_resumen.csv` guarda cuántas filas perdió cada archivo y por qué.
+
+NOMBRE_CUARENTENA = "cuarentena.csv"
+NOMBRE_RESUMEN = "cuarentena_resumen.csv"
+COLUMNAS_DATOS = ["CODIGO", "APELLIDOS Y NOMBRES", "ESCUELA PROFESIONAL", "PUNTAJE", "MERITOE.P", "OBSERVACION"]
+COLUMNAS_CUARENTENA = ["ARCHIVO", "PROCESO", "FILA", "LINEA", "MOTIVO", "DETALLE"] + COLUMNAS_DATOS
+
+PUNTAJE_MINIMO, PUNTAJE_MAXIMO = 0, 2000
+# Observaciones conocidas (texto normalizado como en reglas_ingesta.py; "" = sin observación)
+OBSERVACIONES_CONOCIDAS = ["", "AUSENTE", "ANULADO"]
+PATRON_OBSERVACION = "ALCANZO|VACANTE|NO INGRESO|EXONER"  # mismas familias que normalizar_texto
+
+
+def codigo_invalido(serie):
+    if pd.api.types.is_integer_dtype(serie):
+        return (serie < 0).to_numpy()
+    numeros = pd.to_numeric(serie, errors="coerce")
+    return ~(numeros.notna() & (numeros >= 0) & (numeros % 1 == 0)).to_numpy() & serie.notna().to_numpy()
+
+
+def puntaje_no_numerico(serie):
+    return (pd.to_numeric(serie, errors="coerce").isna() & serie.notna()).to_numpy()
+
+
+def puntaje_fuera_de_rango(serie):
+    numeros = pd.to_numeric(serie, errors="coerce")
+    return ((numeros < PUNTAJE_MINIMO) | (numeros > PUNTAJE_MAXIMO)).to_numpy()
+
+
+def puntaje_demasiado_preciso(serie):
+    # 🔹 Más decimales de los que admite la escala de agregados_escuela.py (suma exacta en enteros)
+    escalados = pd.to_numeric(serie, errors="coerce").to_numpy(dtype="float64") * ESCALA
+    return np.abs(escalados - np.rint(escalados)) > 1e-6  # NaN da False: lo rechazan las reglas anteriores
+
+
+def observacion_desconocida(serie):
+    # 🔹 Pocos valores distintos: se evalúan los únicos y se vuelven a mapear a cada fila
+    codigos, unicos = pd.factorize(serie)
+    texto = normalizar_condicion(pd.Series(unicos, dtype=object))
+    conocida = (texto.isin(OBSERVACIONES_CONOCIDAS) | texto.str.contains(PATRON_OBSERVACION, regex=True)).to_numpy()
+    # factorize marca los nulos con -1, que apunta al último elemento (nulo = sin observación, conocida)
+    return ~np.append(conocida, True)[codigos]
+
+
+REGLAS_VALIDACION = [
+    dict(motivo="CODIGO_VACIO", columna="CODIGO", rechaza=lambda s: s.isna().to_numpy()),
+    dict(motivo="CODIGO_FORMATO", columna="CODIGO", rechaza=codigo_invalido),  # entero no negativo
+    dict(motivo="PUNTAJE_VACIO", columna="PUNTAJE", rechaza=lambda s: s.isna().to_numpy()),
+    dict(motivo="PUNTAJE_NO_NUMERICO", columna="PUNTAJE", rechaza=puntaje_no_numerico),
+    dict(motivo="PUNTAJE_FUERA_DE_RANGO", columna="PUNTAJE", rechaza=puntaje_fuera_de_rango),
+    dict(motivo="PUNTAJE_DEMASIADO_PRECISO", columna="PUNTAJE", rechaza=puntaje_demasiado_preciso),
+    dict(motivo="OBSERVACION_DESCONOCIDA", columna="OBSERVACION", rechaza=observacion_desconocida),
+]
+MOTIVO_DUPLICADO = "DUPLICADO"
+MOTIVO_LINEA = "LINEA_MAL_FORMADA"
+MOTIVOS = np.array([""] + [regla["motivo"] for regla in REGLAS_VALIDACION] + [MOTIVO_DUPLICADO], dtype=object)
+
+
+def lineas_invalidas(avisos):
+    """[(línea, detalle)] a partir de los ParserWarning de read_csv(on_bad_lines='warn')."""
+    return [[int(linea), detalle.strip()]
+            for aviso in avisos for linea, detalle in re.findall(r"Skipping line (\d+): (.*)", str(aviso.message))]
+
+
+def motivos_rechazo(df):
+    """
+    Posición en MOTIVOS de la primera regla que incumple cada fila (0 = válida), en una sola pasada.
+
+    Se usan códigos enteros y no texto: con ~160 mil filas casi todas válidas,
+    armar un arreglo de strings costaría más que evaluar las reglas.
+    """
+    codigos = np.zeros(len(df), dtype=np.int8)
+    # 🔹 En orden inverso: la primera regla que se cumple es la última en escribir
+    for i in range(len(REGLAS_VALIDACION), 0, -1):
+        regla = REGLAS_VALIDACION[i - 1]
+        codigos[regla["rechaza"](df[regla["columna"]])] = i
+    return codigos
+
+
+class Cuarentena:
+    """`resultados/cuarentena.csv` (se le agregan filas a medida que se validan) y los conteos por archivo."""
+
+    def __init__(self, ruta_resultados):
+        os.makedirs(ruta_resultados, exist_ok=True)
+        self.ruta = os.path.join(ruta_resultados, NOMBRE_CUARENTENA)
+        self.ruta_resumen = os.path.join(ruta_resultados, NOMBRE_RESUMEN)
+        self.conteos = {}  # archivo → Counter(motivo)
+        self._archivo = open(self.ruta, "w", encoding="utf-8-sig", newline="")
+        pd.DataFrame(columns=COLUMNAS_CUARENTENA).to_csv(self._archivo, index=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+    def agregar(self, filas, archivos, posiciones, motivos, lineas=()):
+        """
+        Escribe filas rechazadas y líneas ilegibles.
+
+        archivos, posiciones, motivos: ARCHIVO, FILA y MOTIVO de cada una de `filas`.
+        lineas: [(archivo, proceso, línea, detalle)]
+        """
+        partes = []
+        if len(filas):
+            partes.append(filas.reindex(columns=COLUMNAS_DATOS + ["PROCESO"])
+                               .assign(ARCHIVO=archivos, FILA=posiciones, MOTIVO=motivos))
+        if len(lineas):
+            partes.append(pd.DataFrame(lineas, columns=["ARCHIVO", "PROCESO", "LINEA", "DETALLE"])
+                            .assign(MOTIVO=MOTIVO_LINEA))
+        if not partes:
+            return
+        salida = pd.concat(partes, ignore_index=True).reindex(columns=COLUMNAS_CUARENTENA)
+        for (archivo, motivo), n in Counter(zip(salida["ARCHIVO"], salida["MOTIVO"])).items():
+            self.conteos.setdefault(archivo, Counter())[motivo] += n
+        salida.astype({"FILA": "Int64", "LINEA": "Int64"}).to_csv(self._archivo, header=False, index=False)
+        self._archivo.flush()
+
+    def resumen(self):
+        """Filas rechazadas por archivo y motivo (solo archivos con rechazos)."""
+        filas = [{"ARCHIVO": archivo, "MOTIVO": motivo, "FILAS": n}
+                 for archivo, conteo in self.conteos.items() for motivo, n in conteo.items()]
+        return pd.DataFrame(filas, columns=["ARCHIVO", "MOTIVO", "FILAS"])
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.close()
+            self.resumen().to_csv(self.ruta_resumen, index=False, encoding="utf-8-sig")
+
+
+def separar(partes, tareas, cuarentena):
+    """
+    Concatena las partes, valida todas sus filas a la vez y devuelve solo las válidas.
+
+    partes y tareas van en el mismo orden: la parte i salió del archivo tareas[i].
+    Las rechazadas (reglas, duplicados y líneas ilegibles) se escriben en `cuarentena`.
+    """
+    archivos = [f"{carpeta}/{os.path.basename(ruta_archivo)}" for carpeta, ruta_archivo in tareas]
+    lineas = [(archivos[i], tareas[i][0], linea, detalle)
+              for i, parte in enumerate(partes) for linea, detalle in parte.attrs.get("lineas_invalidas", [])]
+
+    df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUMNAS_DATOS + ["PROCESO"])
+    # 🔹 Archivo de origen y FILA dentro de él, a partir del largo de cada parte
+    largos = np.array([len(p) for p in partes], dtype=np.int64)
+    origen = np.repeat(np.arange(len(partes)), largos)
+    posicion = np.arange(len(df)) - np.repeat(np.cumsum(largos) - largos, largos)
+
+    # ✅ Reglas por columna y, entre las filas que las pasan, duplicados (se conserva el primero)
+    motivos = motivos_rechazo(df)
+    valida = motivos == 0
+    # 🔹 Un archivo con algún CODIGO no numérico deja la columna como texto: "1" ≠ 1 al buscar duplicados
+    codigos = df["CODIGO"] if pd.api.types.is_numeric_dtype(df["CODIGO"]) else pd.to_numeric(df["CODIGO"], errors="coerce")
+    claves = pd.DataFrame({"CODIGO": codigos, "PROCESO": df["PROCESO"]})
+    duplicada = claves.duplicated(keep="first").to_numpy() & valida
+    if duplicada.any():
+        # Solo entre válidas: una fila rechazada no cuenta como "la primera" de su CODIGO
+        duplicada[:] = False
+        duplicada[valida] = claves[valida].duplicated(keep="first").to_numpy()
+        motivos[duplicada] = len(MOTIVOS) - 1
+
+    rechazada = motivos != 0
+    cuarentena.agregar(df[rechazada], [archivos[i] for i in origen[rechazada]], posicion[rechazada],
+                       MOTIVOS[motivos[rechazada]], lineas)
+
+    # ✅ Las filas que quedan ya cumplen los tipos: PUNTAJE numérico y CODIGO entero
+    df = df.assign(CODIGO=codigos, PUNTAJE=pd.to_numeric(df["PUNTAJE"], errors="coerce"))
+    if rechazada.any():
+        df = df[~rechazada]
+        df.index = pd.RangeIndex(len(df))
+    if pd.api.types.is_float_dtype(df["CODIGO"]):
+        df["CODIGO"] = df["CODIGO"].astype("int64")
+    return df
+
+
+def reportar(cuarentena):
+    """Imprime los rechazos por motivo y devuelve {motivo: filas} y {archivo: {motivo: filas}}."""
+    por_motivo = Counter()
+    for conteo in cuarentena.conteos.values():
+        por_motivo.update(conteo)
+    por_archivo = {archivo: dict(conteo) for archivo, conteo in cuarentena.conteos.items() if conteo}
+    if por_motivo:
+        print(f"🚫 Filas en cuarentena: {sum(por_motivo.values())} de {len(por_archivo)} archivos ("
+              + ", ".join(f"{motivo} {n}" for motivo, n in por_motivo.most_common()) + ")")
+    else:
+        print("✅ Validación de esquema: ninguna fila rechazada.")
+    return dict(por_motivo), por_archivo
@@ -1,59 +1,235 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import matplotlib
+
+# ✅ Dos modos:
+#    - interactivo (por defecto): los tres gráficos de siempre, con plt.show() después de cada uno.
+#    - por lotes (--lote): sin pantalla (backend Agg), cada figura en un proceso del pool,
+#      y se omiten las figuras cuyos datos no cambiaron desde la última vez
+#      (huellas en `resultados/graficos/huellas.json`).
+#    Con --por-escuela / --por-proceso se generan además gráficos en masa desde
+#    datos_limpios: `resultados/graficos/escuelas/` y `resultados/graficos/procesos/`.
+#    Con muchos puntos, el predicho vs real pasa de scatter a hexbin (densidad).
+
+# 🔸 Subir este número si cambia el dibujo de alguna figura (invalida las huellas)
+VERSION_GRAFICOS = 1
+UMBRAL_PUNTOS = 20_000
+DPI_LOTE = 120
+
+
+# ---------- FIGURAS ----------
+# Cada función recibe los datos ya leídos y la ruta de salida: así puede correr en un proceso aparte.
+def figura_metrica(df_resultados, ruta_salida, metrica, color, titulo, dpi=300, ylim=None):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(df_resultados["Modelo"], df_resultados[metrica], color=color)
+    ax.set_title(titulo, fontsize=14)
+    ax.set_xlabel("Modelo")
+    ax.set_ylabel(metrica.replace("R2", "R²"))
+    if ylim:
+        ax.set_ylim(*ylim)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    fig.savefig(ruta_salida, dpi=dpi)
+    return fig
+
+
+def figura_pred_vs_real(df_pred, ruta_salida, dpi=300, umbral=UMBRAL_PUNTOS):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 6))
+    if len(df_pred) > umbral:
+        # 🔹 Densidad: el costo ya no depende de la cantidad de filas de prueba
+        hb = ax.hexbin(df_pred["REAL"], df_pred["PRED_XGB"], gridsize=80, bins="log", cmap="Greens", mincnt=1)
+        fig.colorbar(hb, ax=ax, label="Postulantes (escala log)")
+        ax.set_title(f"Predicho vs Real (XGBoost, {len(df_pred)} puntos)", fontsize=14)
+    else:
+        ax.scatter(df_pred["REAL"], df_pred["PRED_XGB"], alpha=0.4, color="green")
+        ax.set_title("Predicho vs Real (XGBoost)", fontsize=14)
+    ax.set_xlabel("Puntaje Real")
+    ax.set_ylabel("Puntaje Predicho")
+    ax.plot([df_pred["REAL"].min(), df_pred["REAL"].max()],
+            [df_pred["REAL"].min(), df_pred["REAL"].max()],
+            color="red", linestyle="--", label="Línea ideal")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(ruta_salida, dpi=dpi)
+    return fig
+
+
+def figura_escuela(df_escuela, ruta_salida, escuela, dpi=DPI_LOTE):
+    """Distribución de PUNTAJE por proceso y puntaje del último ingresante (corte)."""
+    import matplotlib.pyplot as plt
+    procesos = sorted(df_escuela["PROCESO"].unique())
+    puntajes = [df_escuela.loc[df_escuela["PROCESO"] == p, "PUNTAJE"].to_numpy() for p in procesos]
+    ingresa = df_escuela["OBSERVACION"].str.contains("ALCANZO|VACANTE", na=False)
+    cortes = df_escuela[ingresa].groupby("PROCESO", observed=True)["PUNTAJE"].min().reindex(procesos)
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.boxplot(puntajes, showfliers=False)
+    ax.plot(range(1, len(procesos) + 1), cortes.to_numpy(), color="red", marker="o", label="Último ingresante")
+    ax.set_xticks(range(1, len(procesos) + 1), procesos)
+    ax.set_title(escuela, fontsize=12)
+    ax.set_xlabel("Proceso")
+    ax.set_ylabel("Puntaje")
+    ax.legend()
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    fig.savefig(ruta_salida, dpi=dpi)
+    return fig
+
+
+def figura_proceso(df_proceso, ruta_salida, proceso, dpi=DPI_LOTE):
+    """Histograma de PUNTAJE del proceso: ingresantes y resto."""
+    import matplotlib.pyplot as plt
+    ingresa = df_proceso["OBSERVACION"].str.contains("ALCANZO|VACANTE", na=False).to_numpy()
+    bordes = np.linspace(0, 2000, 81)
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.hist([df_proceso["PUNTAJE"].to_numpy()[~ingresa], df_proceso["PUNTAJE"].to_numpy()[ingresa]],
+            bins=bordes, stacked=True, color=["lightgray", "steelblue"], label=["No ingresó", "Ingresó"])
+    ax.set_title(f"Distribución de puntajes {proceso} ({len(df_proceso)} postulantes)", fontsize=12)
+    ax.set_xlabel("Puntaje")
+    ax.set_ylabel("Postulantes")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(ruta_salida, dpi=dpi)
+    return fig
+
+
+# ---------- LOTES ----------
+def usar_backend_sin_pantalla():
+    """Backend no interactivo: se llama en cada proceso del pool antes de dibujar."""
+    matplotlib.use("Agg")
+
+
+def dibujar(tarea):
+    """Dibuja una figura en el proceso actual y la cierra (no queda memoria por figura)."""
+    import matplotlib.pyplot as plt
+    funcion, datos, ruta_salida, opciones = tarea
+    os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+    plt.close(funcion(datos, ruta_salida, **opciones))
+    return ruta_salida
+
+
+def huella_datos(datos, opciones):
+    h = hashlib.sha256(f"{VERSION_GRAFICOS}|{sorted(opciones.items())}".encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(datos, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def nombre_archivo(texto):
+    return "".join(c if c.isalnum() or c in " -_." else "_" for c in str(texto)).strip() + ".png"
+
+
+def tareas_principales(ruta_resultados, dpi):
+    df_resultados = pd.read_csv(os.path.join(ruta_resultados, "resultados_modelos.csv"))
+    df_pred = pd.read_csv(os.path.join(ruta_resultados, "predicciones_modelos.csv"))
+    return [
+        (figura_metrica, df_resultados, os.path.join(ruta_resultados, "grafico_r2.png"),
+         dict(metrica="R2", color="skyblue", titulo="Comparación de R² entre Modelos", dpi=dpi, ylim=(0, 1.05))),
+        (figura_metrica, df_resultados, os.path.join(ruta_resultados, "grafico_rmse.png"),
+         dict(metrica="RMSE", color="salmon", titulo="Comparación de RMSE entre Modelos", dpi=dpi)),
+        (figura_pred_vs_real, df_pred[["REAL", "PRED_XGB"]], os.path.join(ruta_resultados, "grafico_pred_vs_real.png"),
+         dict(dpi=dpi)),
+    ]
+
+
+def tareas_en_masa(ruta_resultados, por_escuela, por_proceso):
+    from almacenamiento import cargar_tabla
+    df = cargar_tabla(ruta_resultados, "datos_limpios")[["ESCUELA PROFESIONAL", "PROCESO", "PUNTAJE", "OBSERVACION"]]
+    df = df.astype({"ESCUELA PROFESIONAL": str, "PROCESO": str, "OBSERVACION": str})
+    ruta_graficos = os.path.join(ruta_resultados, "graficos")
+    tareas = []
+    # 🔹 Un groupby reparte las filas una sola vez; cada figura recibe solo las suyas
+    if por_escuela:
+        for escuela, df_escuela in df.groupby("ESCUELA PROFESIONAL", sort=True):
+            tareas.append((figura_escuela, df_escuela, os.path.join(ruta_graficos, "escuelas", nombre_archivo(escuela)),
+                           dict(escuela=escuela)))
+    if por_proceso:
+        for proceso, df_proceso in df.groupby("PROCESO", sort=True):
+            tareas.append((figura_proceso, df_proceso, os.path.join(ruta_graficos, "procesos", nombre_archivo(proceso)),
+                           dict(proceso=proceso)))
+    return tareas
+
+
+def visualizar_en_lote(n_workers=None, por_escuela=False, por_proceso=False, forzar=False, ruta_resultados=None):
+    """Genera las figuras sin pantalla, en paralelo, omitiendo las que no cambiaron."""
+    usar_backend_sin_pantalla()
+    ruta_actual = os.path.dirname(os.path.abspath(__file__))
+    ruta_resultados = ruta_resultados or os.path.join(os.path.dirname(ruta_actual), "resultados")
+    ruta_huellas = os.path.join(ruta_resultados, "graficos", "huellas.json")
+
+    tareas = tareas_principales(ruta_resultados, dpi=300) + tareas_en_masa(ruta_resultados, por_escuela, por_proceso)
+
+    huellas = {}
+    if os.path.exists(ruta_huellas) and not forzar:
+        with open(ruta_huellas, encoding="utf-8") as f:
+            huellas = json.load(f)
+
+    # ✅ Solo se dibuja lo que cambió (o cuyo PNG ya no existe)
+    pendientes, nuevas = [], {}
+    for tarea in tareas:
+        funcion, datos, ruta_salida, opciones = tarea
+        clave = os.path.relpath(ruta_salida, ruta_resultados)
+        nuevas[clave] = huella_datos(datos, opciones)
+        if huellas.get(clave) != nuevas[clave] or not os.path.exists(ruta_salida):
+            pendientes.append(tarea)
+    print(f"🖼️ {len(tareas)} figuras: {len(pendientes)} por dibujar, {len(tareas) - len(pendientes)} sin cambios.")
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers > 1 and len(pendientes) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=usar_backend_sin_pantalla) as pool:
+            list(pool.map(dibujar, pendientes, chunksize=max(1, len(pendientes) // (n_workers * 4))))
+    else:
+        for tarea in pendientes:
+            dibujar(tarea)
+
+    os.makedirs(os.path.dirname(ruta_huellas), exist_ok=True)
+    with open(ruta_huellas, "w", encoding="utf-8") as f:
+        json.dump({**huellas, **nuevas}, f, ensure_ascii=False, indent=1)
+    print(f"✅ Gráficos guardados en la carpeta 'resultados' (huellas en {ruta_huellas}).")
+    return [t[2] for t in pendientes]
+
 
 def visualizar_resultados():
+    import matplotlib.pyplot as plt
+
     # --- Rutas ---
     ruta_actual = os.path.dirname(os.path.abspath(__file__))
     ruta_raiz = os.path.dirname(ruta_actual)
     ruta_resultados = os.path.join(ruta_raiz, "resultados")
 
-    # --- Cargar resultados ---
-    resultados_path = os.path.join(ruta_resultados, "resultados_modelos.csv")
-    predicciones_path = os.path.join(ruta_resultados, "predicciones_modelos.csv")
-
-    df_resultados = pd.read_csv(resultados_path)
-    df_pred = pd.read_csv(predicciones_path)
-
-    # --- 1. Comparación de métricas ---
-    plt.figure(figsize=(8, 5))
-    plt.bar(df_resultados["Modelo"], df_resultados["R2"], color="skyblue")
-    plt.title("Comparación de R² entre Modelos", fontsize=14)
-    plt.xlabel("Modelo")
-    plt.ylabel("R²")
-    plt.ylim(0, 1.05)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.savefig(os.path.join(ruta_resultados, "grafico_r2.png"), dpi=300)
-    plt.show()
-
-    # --- 2. Comparación de RMSE ---
-    plt.figure(figsize=(8, 5))
-    plt.bar(df_resultados["Modelo"], df_resultados["RMSE"], color="salmon")
-    plt.title("Comparación de RMSE entre Modelos", fontsize=14)
-    plt.xlabel("Modelo")
-    plt.ylabel("RMSE")
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.savefig(os.path.join(ruta_resultados, "grafico_rmse.png"), dpi=300)
-    plt.show()
-
-    # --- 3. Predicho vs Real (mejor modelo) ---
-    plt.figure(figsize=(8, 6))
-    plt.scatter(df_pred["REAL"], df_pred["PRED_XGB"], alpha=0.4, color="green")
-    plt.title("Predicho vs Real (XGBoost)", fontsize=14)
-    plt.xlabel("Puntaje Real")
-    plt.ylabel("Puntaje Predicho")
-    plt.plot([df_pred["REAL"].min(), df_pred["REAL"].max()],
-             [df_pred["REAL"].min(), df_pred["REAL"].max()],
-             color="red", linestyle="--", label="Línea ideal")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join(ruta_resultados, "grafico_pred_vs_real.png"), dpi=300)
-    plt.show()
+    # --- 1 a 3. Métricas y predicho vs real, mostrando cada figura ---
+    for funcion, datos, ruta_salida, opciones in tareas_principales(ruta_resultados, dpi=300):
+        funcion(datos, ruta_salida, **opciones)
+        plt.show()
 
     print("✅ Gráficos generados y guardados en la carpeta 'resultados'.")
 
 
+# ---------- LÍNEA DE COMANDOS ----------
+def agregar_argumentos(parser):
+    """--lote y sus opciones (--workers, --por-escuela, --por-proceso, --forzar)."""
+    parser.add_argument("--lote", action="store_true",
+                        help="sin pantalla y en paralelo, omitiendo figuras cuyos datos no cambiaron")
+    parser.add_argument("--workers", type=int, default=None, help="procesos para dibujar (por defecto, todos los núcleos)")
+    parser.add_argument("--por-escuela", action="store_true", help="(con --lote) un gráfico por escuela")
+    parser.add_argument("--por-proceso", action="store_true", help="(con --lote) un gráfico por proceso")
+    parser.add_argument("--forzar", action="store_true", help="(con --lote) redibujar todo")
+
+
+# ---------- EJECUCIÓN DIRECTA ----------
 if __name__ == "__main__":
-    visualizar_resultados()
+    parser = argparse.ArgumentParser(description="Gráficos de evaluación de modelos y de puntajes.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    if args.lote:
+        visualizar_en_lote(args.workers, args.por_escuela, args.por_proceso, args.forzar)
+    else:
+        visualizar_resultados()